@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crm_system.settings')
+# Async views for the read-heavy pages, see customers/async_views.py
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+# Persistent connections are per thread, and async requests do not keep to
+# one thread; use PgBouncer for pooling under ASGI instead
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,26 @@
+"""
+Per-connection database tuning, applied from the ``connection_created``
+signal (connected in ``CustomersConfig.ready``).
+
+SQLite runs in WAL mode so readers keep reading while an import writes, and
+``busy_timeout`` makes a second writer wait for the lock instead of failing
+with "database is locked".
+"""
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # Durable at checkpoints; with WAL a crash can only lose the last commits
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    # Negative means KiB: 20 MB of page cache per connection
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
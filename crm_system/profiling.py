@@ -0,0 +1,134 @@
+"""
+Opt-in per-request profiler.
+
+Enabled with ``REQUEST_PROFILING = True`` in settings. For every request it
+records the number of SQL queries, their total time, repeated queries,
+template render time and wall time, reports them in a ``Server-Timing``
+header and keeps the most recent entries in an in-memory log that staff can
+view at ``/profiling/``.
+"""
+import contextvars
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import Template as DjangoTemplate
+
+
+LOG_SIZE = getattr(settings, 'REQUEST_PROFILING_LOG_SIZE', 200)
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_log = deque(maxlen=LOG_SIZE)
+_log_lock = threading.Lock()
+_patch_lock = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.status = None
+        self.queries = []
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self.started = time.perf_counter()
+        self._rendering = 0
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def duplicates(self):
+        counts = Counter(self.queries)
+        return sum(count - 1 for count in counts.values() if count > 1)
+
+    def as_dict(self):
+        return {
+            'method': self.method,
+            'path': self.path,
+            'status': self.status,
+            'queries': self.query_count,
+            'duplicates': self.duplicates,
+            'db_ms': round(self.db_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+        }
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries, {self.duplicates} duplicates"',
+            f'tpl;dur={self.template_time * 1000:.2f}',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ])
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.db_time += time.perf_counter() - start
+        profile.queries.append((sql, str(params)))
+
+
+def _patch_template_render():
+    # Only the outermost render of each template is timed, so includes
+    # and nested renders are not counted twice
+    with _patch_lock:
+        if getattr(DjangoTemplate.render, '_profiled', False):
+            return
+        original = DjangoTemplate.render
+
+        def render(self, context=None, request=None):
+            profile = _current.get()
+            if profile is None:
+                return original(self, context, request)
+            profile._rendering += 1
+            start = time.perf_counter()
+            try:
+                return original(self, context, request)
+            finally:
+                profile._rendering -= 1
+                if not profile._rendering:
+                    profile.template_time += time.perf_counter() - start
+
+        render._profiled = True
+        DjangoTemplate.render = render
+
+
+class RequestProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _patch_template_render()
+
+    def __call__(self, request):
+        profile = RequestProfile(request.method, request.get_full_path())
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_record_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        profile.total_time = time.perf_counter() - profile.started
+        profile.status = response.status_code
+        response['Server-Timing'] = profile.server_timing()
+        with _log_lock:
+            _log.append(profile.as_dict())
+        return response
+
+
+def recent_profiles():
+    """Most recent request profiles, newest first."""
+    with _log_lock:
+        return list(reversed(_log))
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
+from decouple import config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -50,6 +54,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL/template/wall-time profiling, see crm_system/profiling.py
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+if REQUEST_PROFILING:
+    MIDDLEWARE.insert(0, 'crm_system.profiling.RequestProfilerMiddleware')
+
+# Serve the read-heavy pages with async views (customers/async_views.py);
+# crm_system/asgi.py turns this on by default
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
 ROOT_URLCONF = 'crm_system.urls'
 
 TEMPLATES = [
@@ -74,12 +87,37 @@ WSGI_APPLICATION = 'crm_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default (tuned per connection in crm_system/db.py); set
+# DB_ENGINE=postgres and the DB_* variables to use PostgreSQL instead.
+# Connections are kept for DB_CONN_MAX_AGE seconds rather than reopened on
+# every request.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='crm_system'),
+            'USER': config('DB_USER', default='crm_system'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # Needed when connecting through PgBouncer in transaction pooling mode
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_POOLER', default=False, cast=bool),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
 
 
 # Password validation
@@ -124,6 +162,13 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Generated exports, cached on disk by customers/artifacts.py; kept out of the source tree
+ARTIFACT_CACHE_DIR = config('ARTIFACT_CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'crm_artifact_cache'))
+ARTIFACT_CACHE_MAX_BYTES = config('ARTIFACT_CACHE_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+
+# Processes that validate bulk import rows (customers/importer.py); 1 validates in-process
+IMPORT_VALIDATION_PROCESSES = config('IMPORT_VALIDATION_PROCESSES', default=os.cpu_count() or 1, cast=int)
+
 # Login URL
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
@@ -0,0 +1,29 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def query_budget(max_queries, using='default'):
+    """
+    Fail the enclosing test if the block runs more than ``max_queries`` queries.
+
+        with query_budget(5):
+            self.client.get(reverse('customer_list'))
+    """
+    with CaptureQueriesContext(connections[using]) as captured:
+        yield captured
+
+    if len(captured) <= max_queries:
+        return
+    statements = [query['sql'] for query in captured.captured_queries]
+    repeated = [(sql, count) for sql, count in Counter(statements).items() if count > 1]
+    lines = [f'{len(captured)} queries executed, budget is {max_queries}.']
+    if repeated:
+        lines.append('Repeated queries:')
+        lines += [f'  {count}x {sql}' for sql, count in repeated]
+    lines.append('Queries:')
+    lines += [f'  {i}. {sql}' for i, sql in enumerate(statements, start=1)]
+    raise AssertionError('\n'.join(lines))
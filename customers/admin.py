@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Customer, UserProfile
+from .models import Customer, UserProfile, ImportJob, DashboardStat
 
 
 @admin.register(Customer)
@@ -32,4 +32,18 @@ class CustomerAdmin(admin.ModelAdmin):
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'phone']
-    search_fields = ['user__username', 'user__email', 'phone']
\ No newline at end of file
+    search_fields = ['user__username', 'user__email', 'phone']
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'state', 'mode', 'rows_processed', 'rows_created', 'rows_updated', 'rows_failed', 'created_by', 'created_at']
+    list_filter = ['state', 'mode']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+@admin.register(DashboardStat)
+class DashboardStatAdmin(admin.ModelAdmin):
+    list_display = ['dimension', 'key', 'count']
+    list_filter = ['dimension']
+    search_fields = ['key']
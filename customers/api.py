@@ -0,0 +1,318 @@
+"""
+JSON API for customers.
+
+``GET api/customers/`` pages over customers with the same keyset cursors as
+the customer list, or best match first for a search with
+``?sort=relevance``; ``?fields=`` picks the columns, which are read with
+``.values()`` so no model instances are built. ``POST api/customers/batch/``
+creates, updates and deletes any number of customers (up to
+``MAX_BATCH_SIZE``) in one transaction, all or nothing. ``GET
+api/customers/changes/?since=`` streams what changed after a cursor as
+newline-delimited JSON (see ``customers.changes``).
+
+Requests authenticate with the session (CSRF is enforced for writes) or with
+HTTP Basic credentials.
+"""
+import base64
+import binascii
+import json
+from functools import wraps
+
+from django.contrib.auth import authenticate
+from django.core.exceptions import RequestDataTooBig
+from django.db import IntegrityError, transaction
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from . import changes, stats
+from .bulk_actions import delete_customers
+from .cache import RELEVANCE, ranked_search_ids
+from .forms import CustomerAPIForm
+from .models import Customer
+from .pagination import id_list_page, keyset_page
+from .search import search_customers
+from .storage import image_storage
+from .streaming import stream_response
+
+
+WRITABLE_FIELDS = CustomerAPIForm._meta.fields
+API_FIELDS = ['id'] + WRITABLE_FIELDS + ['image', 'created_by', 'created_at', 'updated_at']
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_SIZE = 5000
+DEFAULT_FEED_LIMIT = 10000
+MAX_FEED_LIMIT = 100000
+
+
+def _error(status, detail, **extra):
+    return JsonResponse({'detail': detail, **extra}, status=status)
+
+
+def _basic_auth_user(request):
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    scheme, _, credentials = header.partition(' ')
+    if scheme.lower() != 'basic' or not credentials:
+        return None
+    try:
+        username, _, password = base64.b64decode(credentials).decode().partition(':')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return authenticate(request, username=username, password=password)
+
+
+def api_view(view):
+    """Authenticate an API request, answering 401/403 in JSON instead of redirecting."""
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        user = _basic_auth_user(request)
+        if user is not None:
+            request.user = user
+        elif not request.user.is_authenticated:
+            return _error(401, 'Authentication credentials were not provided.')
+        elif request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            # Session-authenticated writes still need the CSRF token
+            check = CsrfViewMiddleware(lambda request: None)
+            check.process_request(request)
+            if check.process_view(request, None, (), {}) is not None:
+                return _error(403, 'CSRF token missing or incorrect.')
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def _requested_fields(request):
+    """Return the ``?fields=`` list, or ``None`` if it names unknown fields."""
+    param = request.GET.get('fields', '')
+    fields = [field.strip() for field in param.split(',') if field.strip()] or API_FIELDS
+    if any(field not in API_FIELDS for field in fields):
+        return None
+    return list(dict.fromkeys(fields))
+
+
+def _limit(request, default, maximum):
+    """Return the ``?limit=`` clamped to ``1..maximum``, or ``None`` if it is not a number."""
+    try:
+        return min(max(int(request.GET.get('limit', default)), 1), maximum)
+    except ValueError:
+        return None
+
+
+def _serialize(row, fields):
+    data = {field: row[field] for field in fields}
+    if 'image' in data:
+        data['image'] = image_storage().url(data['image']) if data['image'] else None
+    return data
+
+
+# Customer Collection
+@api_view
+@require_GET
+def customer_collection(request):
+    fields = _requested_fields(request)
+    if fields is None:
+        return _error(400, f"Unknown field. Choose from: {', '.join(API_FIELDS)}")
+    limit = _limit(request, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    if limit is None:
+        return _error(400, 'limit must be an integer.')
+
+    search_query = request.GET.get('search', '')
+    # The cursor is built from (created_at, id), so fetch them even when not requested
+    columns = list(dict.fromkeys(fields + ['id', 'created_at']))
+    if search_query and request.GET.get('sort') == RELEVANCE:
+        # Best match first, paged by offset over the ranked ids
+        ids, _ = ranked_search_ids(search_query)
+        page = id_list_page(Customer.objects.values(*columns), ids, request.GET.get('cursor'), per_page=limit)
+    else:
+        customers = search_customers(search_query)
+        page = keyset_page(customers.values(*columns), request.GET.get('cursor'), per_page=limit)
+
+    return JsonResponse({
+        'results': [_serialize(row, fields) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+# Customer Detail
+@api_view
+@require_GET
+def customer_item(request, pk):
+    fields = _requested_fields(request)
+    if fields is None:
+        return _error(400, f"Unknown field. Choose from: {', '.join(API_FIELDS)}")
+    row = Customer.objects.filter(pk=pk).values(*fields).first()
+    if row is None:
+        return _error(404, 'Not found.')
+    return JsonResponse(_serialize(row, fields))
+
+
+def _change_lines(cursor, fields, limit):
+    last = cursor
+    count = 0
+    for change in changes.iter_changes(cursor, fields, limit):
+        if change['op'] == changes.UPSERT:
+            change['data'] = _serialize(change['data'], fields)
+        last = (change['seq'], change['id'])
+        count += 1
+        yield json.dumps(change, cls=DjangoJSONEncoder) + '\n'
+    # Pass this cursor as ?since= next time; more means the limit cut the feed short
+    yield json.dumps({'cursor': changes.format_cursor(*last), 'more': count == limit}) + '\n'
+
+
+# Customer Change Feed
+@api_view
+@require_GET
+def customer_changes(request):
+    fields = _requested_fields(request)
+    if fields is None:
+        return _error(400, f"Unknown field. Choose from: {', '.join(API_FIELDS)}")
+    limit = _limit(request, DEFAULT_FEED_LIMIT, MAX_FEED_LIMIT)
+    if limit is None:
+        return _error(400, 'limit must be an integer.')
+    cursor = changes.parse_cursor(request.GET.get('since'))
+    if cursor is None:
+        return _error(400, 'since must be a cursor from an earlier response.')
+    return stream_response(request, _change_lines(cursor, fields, limit), content_type='application/x-ndjson')
+
+
+def _is_id(value):
+    # JSON true/false decode to bool, which is a subclass of int
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _parse_batch(body):
+    try:
+        payload = json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        return None, 'Request body is not valid JSON.'
+    if not isinstance(payload, dict):
+        return None, 'Request body must be an object.'
+
+    batch = {
+        'create': payload.get('create', []),
+        'update': payload.get('update', []),
+        'delete': payload.get('delete', []),
+    }
+    if not all(isinstance(items, list) for items in batch.values()):
+        return None, 'create, update and delete must be lists.'
+    if not all(isinstance(item, dict) for item in batch['create'] + batch['update']):
+        return None, 'create and update entries must be objects.'
+    if not all(_is_id(item.get('id')) for item in batch['update']):
+        return None, 'Every update entry needs an integer id.'
+    if not all(_is_id(pk) for pk in batch['delete']):
+        return None, 'delete must be a list of integer ids.'
+    ids = [item['id'] for item in batch['update']] + batch['delete']
+    if len(ids) != len(set(ids)):
+        return None, 'An id may appear only once across update and delete.'
+    if sum(len(items) for items in batch.values()) > MAX_BATCH_SIZE:
+        return None, f'A batch may hold at most {MAX_BATCH_SIZE} records.'
+    return batch, None
+
+
+def _validate(batch, user):
+    """
+    Build the customers to write, or collect per-record errors.
+
+    Returns ``(new_customers, changed, errors)``; ``changed`` holds
+    ``(old_snapshot, customer)`` pairs for the stats counters.
+    """
+    errors = {}
+    update_ids = [item['id'] for item in batch['update']]
+    existing = Customer.objects.in_bulk(update_ids + batch['delete'])
+
+    new_customers = []
+    for index, item in enumerate(batch['create']):
+        form = CustomerAPIForm(item, instance=Customer(created_by=user))
+        if form.is_valid():
+            form.instance.normalize_contacts()
+            new_customers.append(form.instance)
+        else:
+            errors[f'create.{index}'] = form.errors.get_json_data()
+
+    changed = []
+    now = timezone.now()
+    for item in batch['update']:
+        customer = existing.get(item['id'])
+        if customer is None:
+            errors[f"update.{item['id']}"] = {'id': [{'message': 'Not found.', 'code': 'not_found'}]}
+            continue
+        old = stats.snapshot(customer)
+        # Partial update: fields left out keep their current value
+        data = {field: getattr(customer, field) for field in WRITABLE_FIELDS}
+        data.update({field: value for field, value in item.items() if field in WRITABLE_FIELDS})
+        form = CustomerAPIForm(data, instance=customer)
+        if form.is_valid():
+            customer.normalize_contacts()
+            customer.updated_at = now
+            changed.append((old, customer))
+        else:
+            errors[f"update.{item['id']}"] = form.errors.get_json_data()
+
+    for pk in batch['delete']:
+        if pk not in existing:
+            errors[f'delete.{pk}'] = {'id': [{'message': 'Not found.', 'code': 'not_found'}]}
+
+    # One query for email uniqueness across the whole batch
+    emails = {}
+    for key, customer in [(f'create.{i}', c) for i, c in enumerate(new_customers)] + \
+            [(f'update.{c.pk}', c) for _, c in changed]:
+        emails.setdefault(customer.email_normalized, []).append(key)
+    taken = set(
+        Customer.objects.filter(email_normalized__in=list(emails))
+        .exclude(pk__in=update_ids + batch['delete'])
+        .order_by().values_list('email_normalized', flat=True)
+    )
+    for email, keys in emails.items():
+        if email in taken or len(keys) > 1:
+            for key in keys:
+                errors.setdefault(key, {})['email'] = [
+                    {'message': 'Customer with this Email already exists.', 'code': 'unique'}
+                ]
+    return new_customers, changed, errors
+
+
+# Customer Batch Create/Update/Delete
+@api_view
+@require_POST
+def customer_batch(request):
+    try:
+        body = request.body
+    except RequestDataTooBig:
+        return _error(413, 'Request body is too large; split the batch.')
+    batch, problem = _parse_batch(body)
+    if problem:
+        return _error(400, problem)
+
+    new_customers, changed, errors = _validate(batch, request.user)
+    if errors:
+        return _error(400, 'Nothing was saved; fix the listed records.', errors=errors)
+
+    try:
+        with transaction.atomic():
+            if batch['delete']:
+                # Set-based, like the list's bulk delete: one GROUP BY for the
+                # stats and one insert for the tombstones instead of per-row signals
+                delete_customers(Customer.objects.filter(pk__in=batch['delete']))
+            changes.stamp([customer for _, customer in changed] + new_customers)
+            if changed:
+                Customer.objects.bulk_update(
+                    [customer for _, customer in changed],
+                    WRITABLE_FIELDS + ['email_normalized', 'phone_normalized', 'name_key', 'updated_at', 'change_seq'],
+                    batch_size=1000,
+                )
+                stats.record_customers_changed(changed)
+            if new_customers:
+                Customer.objects.bulk_create(new_customers, batch_size=1000)
+                stats.record_customers_created(new_customers)
+    except IntegrityError as e:
+        return _error(409, f'Nothing was saved: {e}')
+
+    return JsonResponse({
+        'created': [customer.pk for customer in new_customers],
+        'updated': [customer.pk for _, customer in changed],
+        'deleted': batch['delete'],
+    })
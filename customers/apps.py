@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CustomersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'customers'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from crm_system.db import configure_connection
+        from . import signals  # noqa: F401
+
+        connection_created.connect(configure_connection)
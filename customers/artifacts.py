@@ -0,0 +1,135 @@
+"""
+On-disk cache for generated export files.
+
+An artifact is stored under a hash of its kind and key, and the key carries
+a data version (see ``data_version``), so a changed customer makes a new
+file instead of invalidating an old one. Stale files age out: a file's
+modification time is bumped on every hit, and whenever the directory
+grows past ``ARTIFACT_CACHE_MAX_BYTES`` the least recently used files are
+removed. Files are written to a temporary name and renamed into place, so
+concurrent requests never see half a file.
+
+Hits and misses are counted per kind in ``ArtifactCacheStat`` (shown on
+the profiling page), so regeneration can be checked against data changes.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max
+
+from .models import ArtifactCacheStat
+
+
+TEMP_PREFIX = '.tmp-'
+
+
+def data_version(queryset):
+    """
+    Version of the customers in ``queryset``: ``(max change_seq, count)``.
+
+    Any write to a customer in the set raises the first, and a delete (or
+    a customer leaving the set) lowers the second.
+    """
+    version = queryset.order_by().aggregate(seq=Max('change_seq'), total=Count('id'))
+    return [version['seq'] or 0, version['total']]
+
+
+def _record(kind, hit):
+    field = 'hits' if hit else 'misses'
+    counter = ArtifactCacheStat.objects.filter(kind=kind)
+    if counter.update(**{field: F(field) + 1}):
+        return
+    try:
+        with transaction.atomic():
+            ArtifactCacheStat.objects.create(kind=kind, **{field: 1})
+    except IntegrityError:
+        # Another process created the row first
+        counter.update(**{field: F(field) + 1})
+
+
+class ArtifactCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def path(self, kind, key, suffix=''):
+        digest = hashlib.sha256(json.dumps([kind, key], default=str).encode()).hexdigest()
+        return self.directory / kind / f'{digest}{suffix}'
+
+    def open(self, kind, key, build, suffix=''):
+        """
+        Return ``(file, hit)``: the artifact opened for reading, built with
+        ``build()`` (which returns a rewound file object) on a miss.
+        """
+        path = self.path(kind, key, suffix)
+        try:
+            artifact = open(path, 'rb')
+        except FileNotFoundError:
+            pass
+        else:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Evicted by another process; the open file is still readable
+                pass
+            _record(kind, hit=True)
+            return artifact, True
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = build()
+        try:
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=TEMP_PREFIX, delete=False) as tmp:
+                shutil.copyfileobj(content, tmp)
+            os.replace(tmp.name, path)
+        finally:
+            content.close()
+        artifact = open(path, 'rb')
+        _record(kind, hit=False)
+        self.evict()
+        return artifact, False
+
+    def _entries(self):
+        if not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.rglob('*'):
+            if path.is_file() and not path.name.startswith(TEMP_PREFIX):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def usage(self):
+        """Return ``(files, bytes)`` currently cached."""
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def clear(self):
+        """Remove every cached file, keeping the directory itself."""
+        for kind_dir in self.directory.glob('*'):
+            shutil.rmtree(kind_dir, ignore_errors=True)
+
+    def evict(self):
+        """Remove the least recently used files until the cache fits ``max_bytes``."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                # Gone already, or still open for download on Windows
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+artifact_cache = ArtifactCache(settings.ARTIFACT_CACHE_DIR, settings.ARTIFACT_CACHE_MAX_BYTES)
@@ -0,0 +1,205 @@
+"""
+Async versions of the read-heavy views and of login/logout, served when
+``ASYNC_VIEWS`` is on (the default under ``crm_system/asgi.py``).
+
+They use the async ORM, so a request no longer holds a worker thread for
+its whole lifetime. Django 4.2 still runs each ORM call on the request's one
+sync thread, so the queries of a view are awaited one after another. Django 4.2's ``login_required``, ``condition`` and
+``cache_control`` only wrap sync views, hence the async decorators below.
+``request.user`` and the session still load with blocking queries, so the
+decorators resolve them once in a thread before the view and template run.
+"""
+import datetime
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import redirect, render, resolve_url
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import RELEVANCE, cached_search_ids, change_version, ranked_search_ids
+from .conditional import (
+    customer_etag, customer_last_modified, customer_list_etag, drop_validators_on_variant_fallback,
+)
+from .facets import facet_context, facet_counts, filter_customers, list_query, selected_facets
+from .models import Customer
+from .pagination import AT_LEAST, EXACT, aapproximate_count, aid_list_page, akeyset_page
+from .search import search_customers, search_users
+from .stats import aget_dashboard_stats
+
+
+async def _auser(request):
+    def load():
+        # Evaluates the lazy user, which loads the session on the way
+        request.user.is_authenticated
+        return request.user
+    return await sync_to_async(load)()
+
+
+def alogin_required(view, login_url='login'):
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        user = await _auser(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), resolve_url(login_url))
+        return await view(request, *args, **kwargs)
+    return inner
+
+
+def acache_control(**kwargs):
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **view_kwargs):
+            response = await view(request, *args, **view_kwargs)
+            patch_cache_control(response, **kwargs)
+            return response
+        return inner
+    return decorator
+
+
+def acondition(etag_func=None, last_modified_func=None):
+    """Async ``django.views.decorators.http.condition``."""
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            def validators():
+                # The validators query the ORM and the message storage; run both in one hop
+                etag = etag_func(request, *args, **kwargs) if etag_func else None
+                last_modified = last_modified_func(request, *args, **kwargs) if last_modified_func else None
+                return etag, last_modified
+
+            etag, last_modified = await sync_to_async(validators)()
+            etag = quote_etag(etag) if etag is not None else None
+            if last_modified:
+                if not timezone.is_aware(last_modified):
+                    last_modified = timezone.make_aware(last_modified, datetime.timezone.utc)
+                last_modified = int(last_modified.timestamp())
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return inner
+    return decorator
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+# Dashboard View
+@alogin_required
+async def dashboard(request):
+    context = await aget_dashboard_stats()
+    context['recent_customers'] = await _alist(Customer.objects.all()[:5])
+    return render(request, 'customers/dashboard.html', context)
+
+
+# Customer List View
+@alogin_required
+@acache_control(private=True, no_cache=True)
+@drop_validators_on_variant_fallback
+@acondition(etag_func=customer_list_etag)
+async def customer_list(request):
+    search_query = request.GET.get('search', '')
+    cursor = request.GET.get('cursor')
+    selected = selected_facets(request.GET)
+    sort = RELEVANCE if search_query and request.GET.get('sort') == RELEVANCE else ''
+    # Read once: the search and facet caches are both keyed on it
+    version = await sync_to_async(change_version)()
+
+    ids = None
+    if search_query and not selected and not sort:
+        ids = await sync_to_async(cached_search_ids)(search_query, version)
+    if sort:
+        ids, complete = await sync_to_async(ranked_search_ids)(search_query, selected, version)
+        page_obj = await aid_list_page(Customer.objects.all(), ids, cursor, per_page=10)
+        total_count, total_accuracy = len(ids), EXACT if complete else AT_LEAST
+    elif ids is not None:
+        page_obj = await aid_list_page(Customer.objects.all(), ids, cursor, per_page=10)
+        total_count, total_accuracy = len(ids), EXACT
+    else:
+        customers = filter_customers(search_customers(search_query), selected)
+        page_obj = await akeyset_page(customers, cursor, per_page=10)
+        total_count, total_accuracy = await aapproximate_count(customers)
+    counts = await sync_to_async(facet_counts)(search_query, selected, version)
+
+    context = {
+        'page_obj': page_obj,
+        'search_query': search_query,
+        'facets': facet_context(selected, counts),
+        'selected_facets': selected,
+        'sort': sort,
+        'list_query': list_query(search_query, selected, sort),
+        'total_count': total_count,
+        'total_accuracy': total_accuracy,
+    }
+    return render(request, 'customers/customer_list.html', context)
+
+
+# Customer Detail View
+@alogin_required
+@acache_control(private=True, no_cache=True)
+@drop_validators_on_variant_fallback
+@acondition(etag_func=customer_etag, last_modified_func=customer_last_modified)
+async def customer_detail(request, pk):
+    try:
+        customer = await Customer.objects.select_related('created_by').aget(pk=pk)
+    except Customer.DoesNotExist:
+        raise Http404('No Customer matches the given query.')
+    context = {'customer': customer}
+    return render(request, 'customers/customer_detail.html', context)
+
+
+# User List View
+@alogin_required
+async def user_list(request):
+    search_query = request.GET.get('search', '')
+    cursor = request.GET.get('cursor')
+
+    users = search_users(search_query)
+    page_obj = await akeyset_page(users, cursor, per_page=25, field='date_joined')
+
+    context = {'page_obj': page_obj, 'search_query': search_query}
+    return render(request, 'customers/user_list.html', context)
+
+
+# Login View
+async def login_view(request):
+    user = await _auser(request)
+    if user.is_authenticated:
+        return redirect('dashboard')
+
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        password = request.POST.get('password')
+        # Django 4.2 has no aauthenticate/alogin; both touch the database and session
+        user = await sync_to_async(authenticate)(request, username=username, password=password)
+
+        if user is not None:
+            await sync_to_async(login)(request, user)
+            messages.success(request, f'Welcome back, {user.first_name}!')
+            return redirect('dashboard')
+        else:
+            messages.error(request, 'Invalid username or password.')
+
+    return render(request, 'customers/login.html')
+
+
+# Logout View
+@alogin_required
+async def logout_view(request):
+    await sync_to_async(logout)(request)
+    messages.success(request, 'You have been logged out successfully!')
+    return redirect('login')
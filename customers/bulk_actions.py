@@ -0,0 +1,55 @@
+"""
+Set-based bulk actions for the customer list.
+
+Each action is a single ``UPDATE`` or ``DELETE`` over a queryset, run in a
+transaction. The dashboard counters are moved with one GROUP BY per
+dimension beforehand instead of row by row, and deletes leave their change
+feed tombstones in batches. ``queryset.delete()`` is not used: Customer has
+``post_delete`` receivers, so Django would load every row and signal each
+one.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import changes, stats
+from .models import Customer, DuplicateCluster
+
+
+DELETE = 'delete'
+REASSIGN = 'reassign'
+SET_FIELDS = 'set_fields'
+ACTION_CHOICES = [
+    (DELETE, 'Delete'),
+    (REASSIGN, 'Reassign owner'),
+    (SET_FIELDS, 'Set city / state / country / company'),
+]
+SETTABLE_FIELDS = ['city', 'state', 'country', 'company']
+
+
+def delete_customers(queryset):
+    """Delete every customer in ``queryset`` and return how many were deleted."""
+    with transaction.atomic():
+        stats.record_queryset_deleted(queryset)
+        changes.record_queryset_deleted(queryset)
+        # The only relation to Customer; its rows must go first
+        DuplicateCluster.customers.through.objects.filter(customer__in=queryset).delete()
+        return queryset._raw_delete(queryset.db)
+
+
+def update_customers(queryset, values):
+    """Write ``values`` (``{field: value}``) to every customer in ``queryset``."""
+    with transaction.atomic():
+        stats.record_queryset_changed(queryset, values)
+        # update() skips auto_now, so stamp the rows ourselves
+        count = queryset.update(updated_at=timezone.now(), change_seq=changes.next_sequence(), **values)
+    return count
+
+
+def run_bulk_action(action, queryset, owner=None, values=None):
+    """Apply ``action`` to ``queryset`` and return the number of customers affected."""
+    queryset = queryset.order_by()
+    if action == DELETE:
+        return delete_customers(queryset)
+    if action == REASSIGN:
+        return update_customers(queryset, {'created_by_id': owner.pk if owner else None})
+    return update_customers(queryset, values)
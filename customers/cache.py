@@ -0,0 +1,134 @@
+"""
+In-process LRU cache for customer search results.
+
+Each entry holds the ordered primary keys matching one normalized search,
+so paging through a search is a primary key lookup instead of re-running
+the filter. Searches matching more than ``SEARCH_CACHE_MAX_IDS`` customers
+are remembered as ``OVERSIZED`` and paged with the keyset query.
+``ranked_search_ids`` does the same for searches sorted by relevance.
+
+Entries are keyed under the committed ``ChangeCounter`` value, which every
+customer write moves (see ``customers.changes``), so a write in any process
+makes the old entries unreachable; they age out of the LRU or expire after
+``SEARCH_CACHE_TTL`` seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from .models import ChangeCounter, Customer
+from .search import search_customers
+
+
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 60
+# Searches matching more rows than this cache OVERSIZED instead of their ids
+SEARCH_CACHE_MAX_IDS = 10000
+OVERSIZED = 'oversized'
+# ?sort= value that orders a search by relevance instead of newest first
+RELEVANCE = 'relevance'
+
+
+class LRUCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+search_result_cache = LRUCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+
+
+def normalize_query(search_query):
+    return ' '.join(search_query.lower().split())
+
+
+def change_version():
+    """The committed ``ChangeCounter`` value; read it before the data it versions."""
+    return ChangeCounter.objects.values_list('value', flat=True).first() or 0
+
+
+def cached_search_ids(search_query, version=None):
+    """
+    Return the ordered ids matching ``search_query``, or ``None`` when the
+    search matches too many customers to be worth caching.
+
+    Pass ``version`` when the request has already read ``change_version()``.
+    """
+    if version is None:
+        version = change_version()
+    search_query = normalize_query(search_query)
+    key = (version, search_query)
+    ids = search_result_cache.get(key)
+    if ids is not None:
+        return None if ids is OVERSIZED else ids
+
+    ids = list(
+        search_customers(search_query)
+        .order_by('-created_at', '-id')
+        .values_list('pk', flat=True)[:SEARCH_CACHE_MAX_IDS + 1]
+    )
+    if len(ids) > SEARCH_CACHE_MAX_IDS:
+        # Remembered too, so later pages of a broad search go straight to
+        # the keyset query instead of fetching the ids again
+        search_result_cache.set(key, OVERSIZED)
+        return None
+    ids = tuple(ids)
+    search_result_cache.set(key, ids)
+    return ids
+
+
+def ranked_search_ids(search_query, selected=None, version=None):
+    """
+    Return ``(ids, complete)``: the ids of the customers matching
+    ``search_query`` (and the facet filters ``selected``), best match first.
+
+    Relevance has no cursor to page by, so unlike ``cached_search_ids`` a
+    broad search keeps its best ``SEARCH_CACHE_MAX_IDS`` matches;
+    ``complete`` is False when more customers matched.
+    """
+    if version is None:
+        version = change_version()
+    selected = selected or {}
+    search_query = normalize_query(search_query)
+    key = (version, RELEVANCE, search_query, tuple(sorted(selected.items())))
+    entry = search_result_cache.get(key)
+    if entry is not None:
+        return entry
+
+    customers = search_customers(search_query, Customer.objects.filter(**selected), ranked=True)
+    if not customers.ordered:
+        # Email and phone lookups are not ranked
+        customers = customers.order_by('-created_at', '-id')
+    ids = tuple(customers.values_list('pk', flat=True)[:SEARCH_CACHE_MAX_IDS + 1])
+    entry = (ids[:SEARCH_CACHE_MAX_IDS], len(ids) <= SEARCH_CACHE_MAX_IDS)
+    search_result_cache.set(key, entry)
+    return entry
@@ -0,0 +1,139 @@
+"""
+Validators for conditional GET on customer and user pages.
+
+The functions here back ``django.views.decorators.http.condition`` and run
+before the view, so a matching ``If-None-Match`` / ``If-Modified-Since``
+gets a 304 without touching the template. Pages render the logged-in user's
+name and may carry a CSRF token, so every ETag includes the user and the
+CSRF secret; pages with pending flash messages are never validated, so the
+messages are still shown.
+
+The validators do not look at image variants. A page rendered while a
+variant was still being generated embeds the full-size original instead, so
+``drop_validators_on_variant_fallback`` strips its ETag and Last-Modified:
+the client cannot revalidate it and fetches the page again next time.
+"""
+import asyncio
+import hashlib
+from functools import wraps
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.db.models import Max
+from django.middleware.csrf import get_token
+
+from .images import collect_missing_variants
+from .models import Customer, DashboardStat
+from .stats import CREATOR, CUSTOMERS
+
+
+def _drop_validators(response, missing):
+    if missing:
+        for header in ('ETag', 'Last-Modified'):
+            if response.has_header(header):
+                del response[header]
+    return response
+
+
+def drop_validators_on_variant_fallback(view):
+    """Put outside ``condition``: it adds the headers after the view returns."""
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def ainner(request, *args, **kwargs):
+            with collect_missing_variants() as missing:
+                response = await view(request, *args, **kwargs)
+            return _drop_validators(response, missing)
+        return ainner
+
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        with collect_missing_variants() as missing:
+            response = view(request, *args, **kwargs)
+        return _drop_validators(response, missing)
+    return inner
+
+
+def _etag(request, *parts):
+    # get_token() creates the CSRF secret now if the client has none yet, so the
+    # first response and the requests that follow it hash the same secret
+    get_token(request)
+    user = (request.user.pk, request.user.get_full_name(), request.META['CSRF_COOKIE'])
+    raw = '|'.join(str(part) for part in user + parts)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _cached(request, key, compute):
+    # condition() asks for the ETag and Last-Modified separately; share the query
+    cache = request.__dict__.setdefault('_conditional_cache', {})
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def _has_messages(request):
+    return len(get_messages(request)) > 0
+
+
+def _stat(dimension, key):
+    return (
+        DashboardStat.objects.filter(dimension=dimension, key=key)
+        .values_list('count', flat=True).first()
+    )
+
+
+def _customer_version(request, pk):
+    return _cached(request, ('customer', pk), lambda: (
+        Customer.objects.filter(pk=pk)
+        .values_list('updated_at', 'created_by__username', 'created_by__first_name', 'created_by__last_name')
+        .first()
+    ))
+
+
+def customer_last_modified(request, pk):
+    if _has_messages(request):
+        return None
+    version = _customer_version(request, pk)
+    return version[0] if version else None
+
+
+def customer_etag(request, pk):
+    if _has_messages(request):
+        return None
+    version = _customer_version(request, pk)
+    if version is None:
+        return None
+    return _etag(request, 'customer', pk, *version)
+
+
+def customer_list_etag(request):
+    if _has_messages(request):
+        return None
+    last_modified = Customer.objects.aggregate(last=Max('updated_at'))['last']
+    # Deletes do not move max(updated_at), but they change the counter. For
+    # the same reason the list sends no Last-Modified: If-Modified-Since
+    # alone would revalidate a list that has lost rows
+    total = _stat(CUSTOMERS, '')
+    return _etag(
+        request, 'customer_list', request.GET.urlencode(),
+        last_modified.isoformat() if last_modified else '', total,
+    )
+
+
+def user_etag(request, pk):
+    if _has_messages(request):
+        return None
+    # Users carry no modification timestamp, so hash the rendered fields
+    values = (
+        User.objects.filter(pk=pk)
+        .values_list(
+            'username', 'first_name', 'last_name', 'email', 'is_active', 'is_superuser',
+            'is_staff', 'date_joined', 'last_login',
+            'profile__phone', 'profile__address', 'profile__profile_image',
+        )
+        .first()
+    )
+    if values is None:
+        return None
+    # A missing profile renders like an empty one
+    values = ['' if value is None else value for value in values]
+    return _etag(request, 'user', pk, _stat(CREATOR, str(pk)), *values)
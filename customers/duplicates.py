@@ -0,0 +1,269 @@
+"""
+Duplicate customer detection.
+
+Comparing every customer with every other one is O(n²), so customers are
+first grouped into blocks that share a cheap key:
+
+* ``phone`` - the normalized phone number
+* ``name`` - a phonetic (Soundex) key of first and last name, so typos such
+  as Meera/Mira or Sharma/Sarma land together
+* ``company_city`` - company and city, case-folded
+* ``email`` - legacy rows whose email only differs by case (see migration
+  0010), next to the row that owns the lowercased address
+
+Every kind of block is read in key order, so only one block is in memory at
+a time. Pairs are scored only within a block, and only in the first kind of
+block (in the order above) that the two customers share, which their keys
+decide; no set of scored pairs has to be kept. Blocks larger than
+``MAX_BLOCK_SIZE`` (say, a very common name) only compare neighbours in a
+sliding window. Pairs above the threshold are joined into clusters that are
+stored as ``DuplicateCluster`` rows for review.
+"""
+import hashlib
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .models import Customer, DuplicateCluster
+
+
+DEFAULT_THRESHOLD = 0.6
+MAX_BLOCK_SIZE = 50
+WINDOW = 10
+# Customers loaded per scoring batch
+BATCH_SIZE = 5000
+# Most a name match adds to a pair's score
+NAME_WEIGHT = 0.35
+
+RECORD_FIELDS = [
+    'id', 'first_name', 'last_name', 'email', 'email_normalized', 'phone_normalized', 'name_key',
+    'company', 'city', 'company_key', 'city_key',
+]
+BLOCK_KINDS = ['phone', 'company_city', 'email', 'name']
+
+def _name(record):
+    return f"{record['first_name']} {record['last_name']}".lower().strip()
+
+
+def _name_similarity(a, b):
+    name = _name(a)
+    best = 0.0
+    for other in (_name(b), f"{b['last_name']} {b['first_name']}".lower().strip()):
+        matcher = SequenceMatcher(None, name, other)
+        # The quick ratios are upper bounds; skip the full comparison when they rule it out
+        if matcher.real_quick_ratio() >= 0.8 and matcher.quick_ratio() >= 0.8:
+            best = max(best, matcher.ratio())
+    return best
+
+
+def score_pair(a, b, threshold=0.0):
+    """
+    Return ``(score, reasons)`` for two customer records. Pairs that cannot
+    reach ``threshold`` are returned early, without the name comparison.
+    """
+    score = 0.0
+    reasons = []
+    if a['phone_normalized'] and a['phone_normalized'] == b['phone_normalized']:
+        score += 0.45
+        reasons.append('same phone')
+    email_a, email_b = a['email'].lower(), b['email'].lower()
+    if email_a == email_b:
+        score += 0.5
+        reasons.append('same email')
+    elif email_a.split('@')[0].replace('.', '') == email_b.split('@')[0].replace('.', ''):
+        score += 0.2
+        reasons.append('similar email')
+    if a['company'] and a['city'] and (a['company'].lower(), a['city'].lower()) == (b['company'].lower(), b['city'].lower()):
+        score += 0.25
+        reasons.append('same company and city')
+
+    if score + NAME_WEIGHT < threshold:
+        return score, reasons
+    similarity = _name_similarity(a, b)
+    if similarity >= 0.8:
+        score += NAME_WEIGHT if similarity >= 0.9 else 0.25
+        reasons.append('same name' if similarity == 1 else 'similar name')
+    return min(score, 1.0), reasons
+
+
+def _sorted_groups(rows):
+    """Group consecutive ``(key, id)`` rows, yielding id lists of two or more."""
+    current, ids = None, []
+    for key, pk in rows:
+        if key != current:
+            if len(ids) > 1:
+                yield ids
+            current, ids = key, []
+        ids.append(pk)
+    if len(ids) > 1:
+        yield ids
+
+
+def iter_blocks():
+    """Yield ``(kind, [customer ids])`` for every block of two or more customers."""
+    customers = Customer.objects.order_by()
+
+    phones = (
+        customers.exclude(phone_normalized='').order_by('phone_normalized')
+        .values_list('phone_normalized', 'id').iterator(chunk_size=BATCH_SIZE)
+    )
+    for ids in _sorted_groups(phones):
+        yield 'phone', ids
+
+    company_city = (
+        customers.exclude(company='').exclude(city='')
+        .annotate(company_key=Lower('company'), city_key=Lower('city'))
+        .order_by('company_key', 'city_key')
+        .values_list('company_key', 'city_key', 'id').iterator(chunk_size=BATCH_SIZE)
+    )
+    for ids in _sorted_groups(((company, city), pk) for company, city, pk in company_city):
+        yield 'company_city', ids
+
+    legacy = customers.filter(email_normalized__isnull=True).values_list('id', 'email')
+    for pk, email in legacy.iterator(chunk_size=BATCH_SIZE):
+        owner = customers.filter(email_normalized=email.lower()).values_list('id', flat=True).first()
+        if owner is not None:
+            yield 'email', [owner, pk]
+
+    names = (
+        customers.exclude(name_key='').order_by('name_key')
+        .values_list('name_key', 'id').iterator(chunk_size=BATCH_SIZE)
+    )
+    for ids in _sorted_groups(names):
+        yield 'name', ids
+
+
+def _shares(kind, a, b):
+    """True if records ``a`` and ``b`` fall in the same block of ``kind``."""
+    if kind == 'phone':
+        return bool(a['phone_normalized']) and a['phone_normalized'] == b['phone_normalized']
+    if kind == 'company_city':
+        return (
+            bool(a['company'] and a['city'] and b['company'] and b['city'])
+            and (a['company_key'], a['city_key']) == (b['company_key'], b['city_key'])
+        )
+    if kind == 'email':
+        # A legacy row (no normalized email) next to the owner of its address
+        return any(
+            legacy['email_normalized'] is None and owner['email_normalized'] == legacy['email'].lower()
+            for legacy, owner in ((a, b), (b, a))
+        )
+    return bool(a['name_key']) and a['name_key'] == b['name_key']
+
+
+def _first_shared_kind(a, b):
+    return next((kind for kind in BLOCK_KINDS if _shares(kind, a, b)), None)
+
+
+def _block_pairs(ids, records):
+    if len(ids) <= MAX_BLOCK_SIZE:
+        return combinations(ids, 2)
+    # Sorted neighbourhood: only customers whose names sort close together
+    ids = sorted(ids, key=lambda pk: (_name(records[pk]), pk))
+    return ((a, b) for i, a in enumerate(ids) for b in ids[i + 1:i + WINDOW])
+
+
+def _batches(blocks):
+    batch, size = [], 0
+    for block in blocks:
+        batch.append(block)
+        size += len(block[1])
+        if size >= BATCH_SIZE:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def find_duplicate_pairs(threshold=DEFAULT_THRESHOLD, progress=None):
+    """Return ``{(a_id, b_id): (score, reasons)}`` for pairs scoring ``threshold`` or more."""
+    pairs = {}
+    blocks_seen = compared = 0
+    for batch in _batches(iter_blocks()):
+        ids = {pk for _, block in batch for pk in block}
+        rows = (
+            Customer.objects.filter(pk__in=ids)
+            .annotate(company_key=Lower('company'), city_key=Lower('city'))
+            .values(*RECORD_FIELDS)
+        )
+        records = {row['id']: row for row in rows}
+        for kind, block in batch:
+            block = [pk for pk in block if pk in records]
+            for a, b in _block_pairs(block, records):
+                # Customers sharing several blocks are scored in the first one only
+                if _first_shared_kind(records[a], records[b]) != kind:
+                    continue
+                compared += 1
+                pair = (min(a, b), max(a, b))
+                score, reasons = score_pair(records[a], records[b], threshold)
+                if score >= threshold:
+                    pairs[pair] = (score, reasons)
+        blocks_seen += len(batch)
+        if progress is not None:
+            progress(blocks_seen, compared, len(pairs))
+    return pairs
+
+
+def build_clusters(pairs):
+    """Join pairs into clusters: a list of ``(member ids, score, reasons)``."""
+    parent = {}
+
+    def find(pk):
+        parent.setdefault(pk, pk)
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    for a, b in pairs:
+        parent[find(a)] = find(b)
+
+    members = defaultdict(list)
+    for pk in parent:
+        members[find(pk)].append(pk)
+    clusters = defaultdict(lambda: [0.0, set()])
+    for (a, _), (score, reasons) in pairs.items():
+        cluster = clusters[find(a)]
+        cluster[0] = max(cluster[0], score)
+        cluster[1].update(reasons)
+    return [
+        (sorted(members[root]), round(score, 3), sorted(reasons))
+        for root, (score, reasons) in clusters.items()
+    ]
+
+
+def fingerprint(ids):
+    return hashlib.sha1(','.join(str(pk) for pk in sorted(ids)).encode()).hexdigest()
+
+
+@transaction.atomic
+def save_clusters(clusters):
+    """
+    Replace the open clusters with ``clusters``. Clusters a reviewer
+    dismissed stay dismissed as long as their members are unchanged.
+    """
+    DuplicateCluster.objects.filter(status=DuplicateCluster.OPEN).delete()
+    dismissed = set(
+        DuplicateCluster.objects.filter(status=DuplicateCluster.DISMISSED).values_list('fingerprint', flat=True)
+    )
+    new = [
+        (DuplicateCluster(fingerprint=fingerprint(ids), score=score, reasons=reasons, size=len(ids)), ids)
+        for ids, score, reasons in clusters
+        if fingerprint(ids) not in dismissed
+    ]
+    DuplicateCluster.objects.bulk_create([cluster for cluster, _ in new], batch_size=1000)
+    Membership = DuplicateCluster.customers.through
+    Membership.objects.bulk_create(
+        [Membership(duplicatecluster_id=cluster.pk, customer_id=pk) for cluster, ids in new for pk in ids],
+        batch_size=1000,
+    )
+    return len(new)
+
+
+def detect_duplicates(threshold=DEFAULT_THRESHOLD, progress=None):
+    """Run a full detection pass and store the result; returns the number of open clusters."""
+    pairs = find_duplicate_pairs(threshold, progress)
+    return save_clusters(build_clusters(pairs))
@@ -0,0 +1,203 @@
+"""
+Customer exports (PDF report, CSV and XLSX) and the bulk upload sample.
+
+Rows are read with ``values_list(...).iterator()`` so no model instances are
+built, and output is written to a spooled temporary file that spills to disk
+once it grows past ``SPOOL_MAX_SIZE``. The views cache the PDF, XLSX and
+sample files with ``customers.artifacts``; bump ``EXPORT_VERSION`` or
+``SAMPLE_VERSION`` when their output changes, so cached files are not served.
+"""
+import csv
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+
+import openpyxl
+from openpyxl.styles import Font, PatternFill
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .importer import IMPORT_FIELDS
+
+
+ITERATOR_CHUNK_SIZE = 2000
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Part of the artifact cache keys
+EXPORT_VERSION = 1
+SAMPLE_VERSION = 1
+
+# CSV and XLSX exports use the bulk upload columns, so an export can be
+# edited and uploaded again
+EXPORT_HEADERS = [
+    'First Name', 'Last Name', 'Email', 'Phone', 'Address',
+    'City', 'State', 'Country', 'Postal Code', 'Company', 'Notes'
+]
+
+# Rows per table; small enough that a table fits on one A4 page even
+# below the report heading on the first page
+PDF_ROWS_PER_PAGE = 30
+PDF_HEADERS = ['Name', 'Email', 'Phone', 'Company', 'City']
+PDF_FIELDS = ('first_name', 'last_name', 'email', 'phone', 'company', 'city')
+PDF_COL_WIDTHS = [1.5*inch, 2*inch, 1.5*inch, 1.5*inch, 1.5*inch]
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4e73df')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+
+
+def iter_pdf_rows(queryset):
+    rows = queryset.values_list(*PDF_FIELDS).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    for first_name, last_name, email, phone, company, city in rows:
+        yield [
+            f"{first_name} {last_name}",
+            email,
+            phone or 'N/A',
+            company or 'N/A',
+            city or 'N/A',
+        ]
+
+
+def _pdf_tables(rows):
+    page = []
+    for row in rows:
+        page.append(row)
+        if len(page) == PDF_ROWS_PER_PAGE:
+            yield _pdf_table(page)
+            page = []
+    if page:
+        yield _pdf_table(page)
+
+
+def _pdf_table(rows):
+    table = Table([PDF_HEADERS] + rows, colWidths=PDF_COL_WIDTHS, repeatRows=1)
+    table.setStyle(PDF_TABLE_STYLE)
+    return table
+
+
+def build_customer_pdf(queryset):
+    """Render ``queryset`` as the customer report and return a rewound file."""
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    doc = SimpleDocTemplate(output, pagesize=A4)
+    elements = []
+    
+    # Styles
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#4e73df'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    
+    # Title
+    elements.append(Paragraph("Customer Data Report", title_style))
+    elements.append(Spacer(1, 12))
+    
+    # Date
+    date_str = datetime.now().strftime('%B %d, %Y')
+    elements.append(Paragraph(f"Generated on: {date_str}", styles['Normal']))
+    elements.append(Spacer(1, 20))
+    
+    # One fixed-size table per page instead of a single table that
+    # reportlab has to split over and over again
+    tables = 0
+    for table in _pdf_tables(iter_pdf_rows(queryset)):
+        if tables:
+            elements.append(PageBreak())
+        elements.append(table)
+        tables += 1
+    
+    if not tables:
+        elements.append(Paragraph("No customers found.", styles['Normal']))
+    
+    doc.build(elements)
+    output.seek(0)
+    return output
+
+
+def iter_export_rows(queryset):
+    return queryset.values_list(*IMPORT_FIELDS).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_customer_csv(queryset):
+    """Yield the CSV export line by line."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_HEADERS)
+    for row in iter_export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def build_customer_xlsx(queryset):
+    """Write the XLSX export with a write-only workbook and return a rewound file."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Customers")
+    ws.append(EXPORT_HEADERS)
+    for row in iter_export_rows(queryset):
+        ws.append(row)
+
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+SAMPLE_CUSTOMERS = [
+    ['John', 'Doe', 'john@example.com', '9876543210', '123 Main St', 'New York', 'NY', 'USA', '10001', 'ABC Corp', 'Regular customer'],
+    ['Jane', 'Smith', 'jane@example.com', '9876543211', '45 Park Ave', 'Los Angeles', 'CA', 'USA', '90001', 'XYZ Ltd', 'Premium customer'],
+    ['Robert', 'Brown', 'robert@example.com', '9876543212', '78 Elm St', 'Chicago', 'IL', 'USA', '60601', 'TechSoft', 'Follow up required'],
+    ['Emily', 'Clark', 'emily@example.com', '9876543213', '9 Pine Rd', 'Houston', 'TX', 'USA', '77001', 'CloudNet', 'New lead'],
+    ['Michael', 'Johnson', 'michael@example.com', '9876543214', '56 Oak St', 'Phoenix', 'AZ', 'USA', '85001', 'InnoWorks', 'Important client'],
+    ['Sophia', 'Williams', 'sophia@example.com', '9876543215', '89 Maple Dr', 'Dallas', 'TX', 'USA', '75201', 'BrightTech', 'High priority'],
+    ['David', 'Miller', 'david@example.com', '9876543216', '10 River Rd', 'San Jose', 'CA', 'USA', '95101', 'NextGen', 'Repeat customer'],
+    ['Olivia', 'Davis', 'olivia@example.com', '9876543217', '34 Lake View', 'Austin', 'TX', 'USA', '73301', 'SoftLabs', 'Corporate account'],
+    ['James', 'Wilson', 'james@example.com', '9876543218', '77 Hill St', 'Seattle', 'WA', 'USA', '98101', 'CodeBase', 'Requested demo'],
+    ['Ava', 'Moore', 'ava@example.com', '9876543219', '21 Sunset Blvd', 'Miami', 'FL', 'USA', '33101', 'MediaX', 'Seasonal client'],
+    ['Daniel', 'Taylor', 'daniel@example.com', '9876543220', '90 Cedar St', 'Denver', 'CO', 'USA', '80201', 'SkyTech', 'Cold lead'],
+    ['Mia', 'Anderson', 'mia@example.com', '9876543221', '63 Birch Rd', 'Boston', 'MA', 'USA', '02101', 'DataWave', 'Warm lead'],
+    ['Matthew', 'Thomas', 'matthew@example.com', '9876543222', '88 Broadway', 'Newark', 'NJ', 'USA', '07101', 'WebWorks', 'Contract pending'],
+    ['Isabella', 'Jackson', 'isabella@example.com', '9876543223', '12 Market St', 'San Diego', 'CA', 'USA', '92101', 'DesignPro', 'Design client'],
+    ['Ethan', 'White', 'ethan@example.com', '9876543224', '5 Cross Rd', 'Portland', 'OR', 'USA', '97201', 'AI Labs', 'Startup client'],
+]
+
+
+def build_sample_xlsx():
+    """The bulk upload sample: the upload columns and 15 example customers."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Customers"
+    ws.append(EXPORT_HEADERS)
+    for customer in SAMPLE_CUSTOMERS:
+        ws.append(customer)
+
+    # Style header row
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    wb.save(output)
+    output.seek(0)
+    return output
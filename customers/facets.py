@@ -0,0 +1,113 @@
+"""
+Faceted filters for the customer list.
+
+``?country=``, ``?state=``, ``?city=`` and ``?company=`` narrow the list with
+equality filters, each backed by an index on ``(field, -created_at, -id)``,
+so a filtered page is an index range scan that is already in list order.
+
+Facet counts take one GROUP BY per facet over the customers matching the
+search and the *other* selected facets, so each option shows how many
+customers choosing it would leave. With neither, every facet reads the
+dashboard counters instead of grouping the table, so the unfiltered list
+stays cheap however often customers change. Counts are cached in-process
+under the committed ``ChangeCounter`` value, which every customer write
+moves, so any write (in any process) invalidates them.
+"""
+from django.db.models import Count
+from django.utils.http import urlencode
+
+from .cache import LRUCache, change_version, normalize_query
+from .models import DashboardStat
+from .search import search_customers
+from .stats import CITY, COMPANY, COUNTRY, STATE
+
+
+FACETS = [
+    ('country', 'Country'),
+    ('state', 'State'),
+    ('city', 'City'),
+    ('company', 'Company'),
+]
+FACET_FIELDS = [field for field, _ in FACETS]
+# Fields whose totals the dashboard counters already keep
+STAT_DIMENSIONS = {'country': COUNTRY, 'state': STATE, 'city': CITY, 'company': COMPANY}
+# Options listed per facet, most customers first
+FACET_LIMIT = 20
+FACET_CACHE_SIZE = 256
+FACET_CACHE_TTL = 300
+
+facet_cache = LRUCache(FACET_CACHE_SIZE, FACET_CACHE_TTL)
+
+
+def selected_facets(params, prefix=''):
+    """Return ``{field: value}`` for the facets set in ``params`` (a QueryDict)."""
+    selected = {}
+    for field in FACET_FIELDS:
+        value = params.get(prefix + field, '').strip()
+        if value:
+            selected[field] = value
+    return selected
+
+
+def filter_customers(queryset, selected):
+    return queryset.filter(**selected) if selected else queryset
+
+
+def list_query(search_query, selected, sort=''):
+    """The customer list query string for a search, facet selection and sort, without a cursor."""
+    params = {'search': search_query} if search_query else {}
+    params.update(selected)
+    if sort:
+        params['sort'] = sort
+    return urlencode(params)
+
+
+def _stat_counts(dimension):
+    return list(
+        DashboardStat.objects.filter(dimension=dimension, count__gt=0).exclude(key='')
+        .order_by('-count', 'key').values_list('key', 'count')[:FACET_LIMIT]
+    )
+
+
+def _grouped_counts(field, customers):
+    return list(
+        customers.exclude(**{field: ''}).order_by().values(field)
+        .annotate(total=Count('id')).order_by('-total', field)
+        .values_list(field, 'total')[:FACET_LIMIT]
+    )
+
+
+def _facet_values(field, search_query, selected):
+    others = {name: value for name, value in selected.items() if name != field}
+    customers = filter_customers(search_customers(search_query), others)
+    if not search_query and not others and field in STAT_DIMENSIONS:
+        values = _stat_counts(STAT_DIMENSIONS[field])
+    else:
+        values = _grouped_counts(field, customers)
+
+    # Keep the chosen option listed even when it is not among the most common
+    value = selected.get(field)
+    if value and value not in dict(values):
+        values.append((value, customers.filter(**{field: value}).count()))
+    return tuple(values)
+
+
+def facet_counts(search_query, selected, version=None):
+    """Return ``{field: ((value, count), ...)}`` for every facet."""
+    if version is None:
+        version = change_version()
+    search_query = normalize_query(search_query)
+    key = (version, search_query, tuple(sorted(selected.items())))
+    counts = facet_cache.get(key)
+    if counts is None:
+        counts = {field: _facet_values(field, search_query, selected) for field in FACET_FIELDS}
+        facet_cache.set(key, counts)
+    return counts
+
+
+def facet_context(selected, counts):
+    """The ``facets`` list the customer list template renders."""
+    return [
+        {'field': field, 'label': label, 'values': counts[field], 'selected': selected.get(field, '')}
+        for field, label in FACETS
+    ]
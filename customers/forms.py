@@ -1,7 +1,8 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
-from .models import Customer, UserProfile
+from .bulk_actions import ACTION_CHOICES, REASSIGN, SET_FIELDS, SETTABLE_FIELDS
+from .models import Customer, UserProfile, ImportJob
 
 
 class CustomerForm(forms.ModelForm):
@@ -64,6 +65,19 @@ class CustomerForm(forms.ModelForm):
         }
 
 
+class CustomerAPIForm(forms.ModelForm):
+    """Validates one record of a JSON API batch."""
+
+    class Meta:
+        model = Customer
+        fields = ['first_name', 'last_name', 'email', 'phone', 'address',
+                  'city', 'state', 'country', 'postal_code', 'company', 'notes']
+
+    def validate_unique(self):
+        # Emails are checked for the whole batch in one query, see customers/api.py
+        pass
+
+
 class BulkUploadForm(forms.Form):
     excel_file = forms.FileField(
         label='Upload Excel File',
@@ -73,6 +87,62 @@ class BulkUploadForm(forms.Form):
             'accept': '.xlsx,.xls'
         })
     )
+    mode = forms.ChoiceField(
+        label='Import Mode',
+        choices=ImportJob.MODE_CHOICES,
+        initial='insert',
+        widget=forms.RadioSelect(attrs={'class': 'form-check-input'})
+    )
+
+
+class IdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return [int(pk) for pk in value or []]
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Invalid selection.')
+
+
+class BulkActionForm(forms.Form):
+    SCOPE_CHOICES = [
+        ('selected', 'Selected customers'),
+        ('all', 'All customers matching the search'),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    scope = forms.ChoiceField(choices=SCOPE_CHOICES, initial='selected')
+    selected = IdListField(required=False)
+    search = forms.CharField(required=False)
+    owner = forms.CharField(required=False, help_text='Username; leave blank to unassign')
+    city = forms.CharField(required=False, max_length=100)
+    state = forms.CharField(required=False, max_length=100)
+    country = forms.CharField(required=False, max_length=100)
+    company = forms.CharField(required=False, max_length=200)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('scope') == 'selected' and not cleaned_data.get('selected'):
+            raise forms.ValidationError('Select at least one customer.')
+
+        action = cleaned_data.get('action')
+        if action == REASSIGN:
+            username = cleaned_data.get('owner')
+            cleaned_data['owner'] = None
+            if username:
+                try:
+                    cleaned_data['owner'] = User.objects.get(username=username)
+                except User.DoesNotExist:
+                    self.add_error('owner', f'No user named {username}.')
+        elif action == SET_FIELDS:
+            # Blank inputs leave the field as it is
+            cleaned_data['values'] = {
+                field: cleaned_data[field] for field in SETTABLE_FIELDS if cleaned_data.get(field)
+            }
+            if not cleaned_data['values']:
+                raise forms.ValidationError('Enter at least one value to set.')
+        return cleaned_data
 
 
 class UserRegistrationForm(UserCreationForm):
@@ -0,0 +1,127 @@
+"""
+Resized derivatives of uploaded customer and profile images.
+
+Every source image gets a small square thumbnail for lists and a larger
+detail rendition, each as a recompressed JPEG plus a WebP copy when Pillow
+supports it. Derivatives live under ``derivatives/`` next to the original's
+path in the default storage, so their names can be computed without extra
+columns (the content-addressed image storage would rename them). They are built
+in a thread pool after the upload's transaction commits; until then the
+templates fall back to the original file, and note it with
+``note_missing_variant`` so the page is not given validators (see
+``customers.conditional``).
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, features
+
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_DIR = 'derivatives'
+# name: (size, crop to fill the box instead of fitting inside it)
+VARIANTS = {
+    'thumb': ((96, 96), True),
+    'detail': ((400, 400), False),
+}
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+WEBP_SUPPORTED = features.check('webp')
+MAX_WORKERS = 2
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='image-variants')
+# Variant paths a render fell back from, while collect_missing_variants() is active
+_missing_variants = ContextVar('missing_variants', default=None)
+
+
+def variant_name(name, variant, ext='jpg'):
+    base, _ = os.path.splitext(name)
+    return f"{DERIVATIVES_DIR}/{base}.{variant}.{ext}"
+
+
+def variant_names(name):
+    names = []
+    for variant in VARIANTS:
+        names.append(variant_name(name, variant))
+        if WEBP_SUPPORTED:
+            names.append(variant_name(name, variant, 'webp'))
+    return names
+
+
+def has_variants(name):
+    return all(default_storage.exists(path) for path in variant_names(name))
+
+
+@contextmanager
+def collect_missing_variants():
+    """Yield a list that collects the variants rendered as their original meanwhile."""
+    missing = []
+    token = _missing_variants.set(missing)
+    try:
+        yield missing
+    finally:
+        _missing_variants.reset(token)
+
+
+def note_missing_variant(path):
+    missing = _missing_variants.get()
+    if missing is not None:
+        missing.append(path)
+
+
+def _encode(image, fmt, quality):
+    output = BytesIO()
+    image.save(output, fmt, quality=quality, optimize=True)
+    return ContentFile(output.getvalue())
+
+
+def _store(path, content):
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, content)
+
+
+def generate_variants(name, source_storage=default_storage):
+    """Build every derivative of the image ``name`` in ``source_storage``."""
+    with source_storage.open(name, 'rb') as source:
+        original = Image.open(source)
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'A' in original.getbands() else 'RGB')
+
+    for variant, (size, crop) in VARIANTS.items():
+        if crop:
+            image = ImageOps.fit(original, size, Image.LANCZOS)
+        else:
+            image = original.copy()
+            image.thumbnail(size, Image.LANCZOS)
+
+        if WEBP_SUPPORTED:
+            _store(variant_name(name, variant, 'webp'), _encode(image, 'WEBP', WEBP_QUALITY))
+        # JPEG has no alpha channel
+        _store(variant_name(name, variant), _encode(image.convert('RGB'), 'JPEG', JPEG_QUALITY))
+
+
+def _generate_safely(name, source_storage):
+    try:
+        generate_variants(name, source_storage)
+    except Exception:
+        logger.exception('Could not generate image variants for %s', name)
+
+
+def schedule_variants(field_file):
+    """Queue derivative generation for ``field_file`` once the transaction commits."""
+    if not field_file or has_variants(field_file.name):
+        return
+    name, source_storage = field_file.name, field_file.storage
+    transaction.on_commit(lambda: _executor.submit(_generate_safely, name, source_storage))
@@ -0,0 +1,309 @@
+"""
+Streaming Excel import for customers.
+
+Rows are read lazily from a read-only workbook, validated in chunks and
+written with one ``bulk_create`` per chunk, so memory stays flat no matter
+how large the uploaded file is.
+
+Validation runs every field through the model field's own checks (max
+lengths, email, the phone pattern), the same ones ``CustomerForm`` applies.
+It is CPU-bound, so files of more than one chunk are validated in a pool of
+``IMPORT_VALIDATION_PROCESSES`` processes, a few chunks ahead of the
+writer; results come back in row order.
+"""
+import itertools
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+import openpyxl
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import changes, stats
+from .models import Customer
+from .normalization import normalize_email
+
+
+# Column order of the sample workbook (see download_sample_excel)
+IMPORT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone', 'address',
+    'city', 'state', 'country', 'postal_code', 'company', 'notes',
+]
+REQUIRED_FIELDS = ('first_name', 'last_name', 'email')
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+MAX_REPORTED_RANGES = 1000
+
+# Import modes: plain inserts reject rows whose email already exists,
+# upserts update those customers in place.
+INSERT = 'insert'
+UPSERT = 'upsert'
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors = []
+        # [first, last] row number ranges of failed rows, in row order
+        self.failed_ranges = []
+        self._failed_rows = []
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def processed(self):
+        return self.created + self.updated + self.unchanged + self.skipped + self.failed
+
+    @property
+    def rows_per_second(self):
+        # Running rate until finish() fixes the elapsed time
+        elapsed = self.elapsed or time.monotonic() - self.started
+        if not elapsed:
+            return 0.0
+        return self.processed / elapsed
+
+    def add_error(self, message, row_nums):
+        self.failed += len(row_nums)
+        self._failed_rows.extend(row_nums)
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def end_chunk(self):
+        # Chunks finish in row order, so only rows within a chunk need sorting
+        for row_num in sorted(self._failed_rows):
+            if self.failed_ranges and self.failed_ranges[-1][1] == row_num - 1:
+                self.failed_ranges[-1][1] = row_num
+            else:
+                self.failed_ranges.append([row_num, row_num])
+        self._failed_rows = []
+        self.chunks += 1
+
+    @property
+    def failed_rows(self):
+        """Failed row numbers as text, e.g. ``"4, 9-12"``."""
+        text = ', '.join(
+            str(first) if first == last else f'{first}-{last}'
+            for first, last in self.failed_ranges[:MAX_REPORTED_RANGES]
+        )
+        if len(self.failed_ranges) > MAX_REPORTED_RANGES:
+            text += ', ...'
+        return text
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+        return self
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Phone numbers and postal codes typed as numbers come back as floats
+        value = int(value)
+    return str(value).strip()
+
+
+def iter_rows(excel_file):
+    """Yield ``(row_number, {field: value})`` for every data row."""
+    wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        for row_num, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+            values = [_cell(v) for v in row[:len(IMPORT_FIELDS)]]
+            values += [''] * (len(IMPORT_FIELDS) - len(values))
+            yield row_num, dict(zip(IMPORT_FIELDS, values))
+    finally:
+        wb.close()
+
+
+def iter_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_row(data):
+    """Return ``{field: [messages]}`` for the fields of ``data`` that fail validation."""
+    errors = {}
+    for name in IMPORT_FIELDS:
+        try:
+            Customer._meta.get_field(name).clean(data[name], None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    return errors
+
+
+def validate_chunk(chunk):
+    """Split ``chunk`` into valid rows and ``(row_number, message)`` errors."""
+    valid, errors = [], []
+    for row_num, data in chunk:
+        problems = validate_row(data)
+        if problems:
+            details = '; '.join(f"{field}: {' '.join(messages)}" for field, messages in problems.items())
+            errors.append((row_num, f"Row {row_num}: {details}"))
+        else:
+            valid.append((row_num, data))
+    return valid, errors
+
+
+def _validated_chunks(chunks, processes):
+    """Yield ``validate_chunk`` results for ``chunks``, in order."""
+    chunks = iter(chunks)
+    head = list(itertools.islice(chunks, 2))
+    chunks = itertools.chain(head, chunks)
+    if processes <= 1 or len(head) < 2:
+        # A single chunk is not worth starting processes for
+        for chunk in chunks:
+            yield validate_chunk(chunk)
+        return
+
+    # Not fork: the children would inherit the open database connections.
+    # Spawned processes start bare, so they set Django up before taking work.
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(processes, mp_context=context, initializer=django.setup) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(validate_chunk, chunk))
+            # Bounded read-ahead keeps memory flat on huge files
+            if len(pending) >= processes * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _insert_chunk(chunk, user, result):
+    emails = [normalize_email(data['email']) for _, data in chunk]
+    existing = set(
+        Customer.objects.filter(email_normalized__in=emails).order_by()
+        .values_list('email_normalized', flat=True)
+    )
+
+    customers = []
+    row_nums = []
+    seen = set()
+    for (row_num, data), email in zip(chunk, emails):
+        if email in existing or email in seen:
+            result.add_error(f"Row {row_num}: customer with email {data['email']} already exists", [row_num])
+            continue
+        seen.add(email)
+        customer = Customer(created_by=user, **data)
+        customer.normalize_contacts()
+        customers.append(customer)
+        row_nums.append(row_num)
+
+    if not customers:
+        return
+    try:
+        with transaction.atomic():
+            changes.stamp(customers)
+            Customer.objects.bulk_create(customers)
+            stats.record_customers_created(customers)
+    except IntegrityError as e:
+        result.add_error(f"Rows {chunk[0][0]}-{chunk[-1][0]}: {e}", row_nums)
+        return
+    result.created += len(customers)
+
+
+def _upsert_chunk(chunk, user, result):
+    # Later rows win when the same email (in any case) appears twice in one chunk
+    rows = {}
+    for row_num, data in chunk:
+        email = normalize_email(data['email'])
+        if email in rows:
+            result.skipped += 1
+        rows[email] = (row_num, data)
+
+    existing = {
+        customer.email_normalized: customer
+        for customer in Customer.objects.filter(email_normalized__in=list(rows)).order_by()
+        .only('pk', 'email_normalized', *IMPORT_FIELDS)
+    }
+
+    new_customers = []
+    changed = []
+    row_nums = []
+    now = timezone.now()
+    for email, (row_num, data) in rows.items():
+        customer = existing.get(email)
+        if customer is None:
+            customer = Customer(created_by=user, **data)
+            customer.normalize_contacts()
+            new_customers.append(customer)
+            row_nums.append(row_num)
+            continue
+        if all(getattr(customer, field) == value for field, value in data.items()):
+            result.unchanged += 1
+            continue
+        old = stats.snapshot(customer)
+        for field, value in data.items():
+            setattr(customer, field, value)
+        customer.normalize_contacts()
+        # bulk_update() bypasses auto_now, so stamp the row ourselves
+        customer.updated_at = now
+        changed.append((old, customer))
+        row_nums.append(row_num)
+
+    try:
+        with transaction.atomic():
+            changes.stamp([customer for _, customer in changed] + new_customers)
+            if changed:
+                Customer.objects.bulk_update(
+                    [customer for _, customer in changed],
+                    IMPORT_FIELDS + ['email_normalized', 'phone_normalized', 'name_key', 'updated_at', 'change_seq'],
+                )
+                stats.record_customers_changed(changed)
+            if new_customers:
+                Customer.objects.bulk_create(new_customers)
+                stats.record_customers_created(new_customers)
+    except IntegrityError as e:
+        result.add_error(f"Rows {chunk[0][0]}-{chunk[-1][0]}: {e}", row_nums)
+        return
+    result.updated += len(changed)
+    result.created += len(new_customers)
+
+
+def import_customers(excel_file, user, mode=INSERT, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, processes=None):
+    """
+    Import every row of ``excel_file`` and return an ``ImportResult``.
+
+    ``progress`` is called with the running result after each chunk.
+    ``processes`` defaults to ``settings.IMPORT_VALIDATION_PROCESSES``.
+    """
+    result = ImportResult()
+    write_chunk = _upsert_chunk if mode == UPSERT else _insert_chunk
+    if processes is None:
+        processes = settings.IMPORT_VALIDATION_PROCESSES
+
+    def valid_rows():
+        for row_num, data in iter_rows(excel_file):
+            if not all(data[field] for field in REQUIRED_FIELDS):
+                result.skipped += 1
+                continue
+            yield row_num, data
+
+    chunks = iter_chunks(valid_rows(), chunk_size)
+    for valid, errors in _validated_chunks(chunks, processes):
+        for row_num, message in errors:
+            result.add_error(message, [row_num])
+        if valid:
+            write_chunk(valid, user, result)
+        result.end_chunk()
+        if progress is not None:
+            progress(result)
+
+    return result.finish()
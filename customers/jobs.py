@@ -0,0 +1,93 @@
+"""
+Database-backed queue for bulk import jobs.
+
+Jobs are claimed with a conditional UPDATE (``state=pending`` ->
+``running``), so any number of worker processes can poll the same table
+without two of them picking up the same job.
+"""
+import os
+import socket
+
+from django.utils import timezone
+
+from .importer import import_customers, MAX_REPORTED_ERRORS
+from .models import ImportJob
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_import(excel_file, user, mode='insert'):
+    return ImportJob.objects.create(file=excel_file, mode=mode, created_by=user)
+
+
+def claim_next_job(worker):
+    candidates = (
+        ImportJob.objects.filter(state=ImportJob.PENDING)
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in list(candidates):
+        claimed = ImportJob.objects.filter(pk=pk, state=ImportJob.PENDING).update(
+            state=ImportJob.RUNNING,
+            worker=worker,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return ImportJob.objects.select_related('created_by').get(pk=pk)
+    return None
+
+
+def run_job(job):
+    def progress(result):
+        ImportJob.objects.filter(pk=job.pk).update(
+            rows_processed=result.processed,
+            rows_created=result.created,
+            rows_updated=result.updated,
+            rows_unchanged=result.unchanged,
+            rows_failed=result.failed,
+            rows_per_second=result.rows_per_second,
+            error_sample=result.errors[:MAX_REPORTED_ERRORS],
+            failed_rows=result.failed_rows,
+        )
+
+    try:
+        with job.file.open('rb') as excel_file:
+            result = import_customers(
+                excel_file, job.created_by, mode=job.mode, progress=progress
+            )
+    except Exception as e:
+        ImportJob.objects.filter(pk=job.pk).update(
+            state=ImportJob.FAILED,
+            error_sample=[f"Error processing file: {e}"],
+            finished_at=timezone.now(),
+        )
+    else:
+        progress(result)
+        ImportJob.objects.filter(pk=job.pk).update(
+            state=ImportJob.DONE,
+            finished_at=timezone.now(),
+        )
+    job.refresh_from_db()
+    # The uploaded workbook is only needed until the import has run
+    job.file.delete()
+    return job
+
+
+def requeue_stale_jobs(older_than):
+    """Put back jobs whose worker died while running them."""
+    cutoff = timezone.now() - older_than
+    return ImportJob.objects.filter(
+        state=ImportJob.RUNNING, started_at__lt=cutoff
+    ).update(
+        state=ImportJob.PENDING,
+        worker='',
+        rows_processed=0,
+        rows_created=0,
+        rows_updated=0,
+        rows_unchanged=0,
+        rows_failed=0,
+        rows_per_second=0,
+        failed_rows='',
+    )
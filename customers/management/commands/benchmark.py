@@ -0,0 +1,229 @@
+import json
+import tempfile
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+import openpyxl
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from customers.artifacts import artifact_cache
+from customers.bulk_actions import delete_customers
+from customers.cache import search_result_cache
+from customers.importer import INSERT, import_customers
+from customers.models import Customer
+from customers.pagination import NEXT, encode_cursor
+from customers.seeding import SEED_DOMAIN, seed_customers, seed_users
+
+IMPORT_ROWS = 1000
+
+
+def _consume(response):
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def _get(path):
+    def run(client, context):
+        response = _consume(client.get(path() if callable(path) else path))
+        if response.status_code != 200:
+            raise CommandError(f'{response.status_code} from {response.request["PATH_INFO"]}')
+    return run
+
+
+def _cold_search(client, context):
+    search_result_cache.clear()
+    _get(lambda: reverse('customer_list') + '?search=kumar')(client, context)
+
+
+def _cold_export(path):
+    get = _get(path)
+
+    def run(client, context):
+        artifact_cache.clear()
+        get(client, context)
+    return run
+
+
+def _deep_page(client, context):
+    _get(lambda: reverse('customer_list') + '?cursor=' + context['deep_cursor'])(client, context)
+
+
+def _import(client, context):
+    context['import_round'] += 1
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(['First Name', 'Last Name', 'Email'])
+    for i in range(IMPORT_ROWS):
+        ws.append(['Bench', 'Import', f'bench{i}.{context["import_round"]}@import.{SEED_DOMAIN}'])
+    workbook = BytesIO()
+    wb.save(workbook)
+    workbook.seek(0)
+    import_customers(workbook, context['user'], mode=INSERT)
+
+
+def _cleanup_import(context):
+    delete_customers(Customer.objects.filter(email__endswith=f'@import.{SEED_DOMAIN}'))
+
+
+SCENARIOS = {
+    'dashboard': _get(lambda: reverse('dashboard')),
+    'customer_list': _get(lambda: reverse('customer_list')),
+    'customer_list_deep_page': _deep_page,
+    'search': _cold_search,
+    'search_cached': _get(lambda: reverse('customer_list') + '?search=kumar'),
+    'export_pdf': _cold_export(lambda: reverse('export_pdf') + '?search=kumar'),
+    'export_pdf_cached': _get(lambda: reverse('export_pdf') + '?search=kumar'),
+    'export_csv': _get(lambda: reverse('export_csv')),
+    'export_xlsx': _cold_export(lambda: reverse('export_xlsx') + '?search=kumar'),
+    'export_xlsx_cached': _get(lambda: reverse('export_xlsx') + '?search=kumar'),
+    'bulk_upload': _import,
+    'user_list': _get(lambda: reverse('user_list')),
+    'admin_changelist': _get('/admin/customers/customer/'),
+}
+CLEANUP = {
+    'bulk_upload': _cleanup_import,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the main views and pipelines at several data sizes in a throwaway test '
+        'database, write the results to JSON and compare them with a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000', help='Comma-separated customer counts.')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per scenario; the median is kept.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--only', default='', help=f'Comma-separated scenarios ({", ".join(SCENARIOS)}).')
+        parser.add_argument('--output', default='benchmark.json', help='Where to write the results.')
+        parser.add_argument('--baseline', help='Previous results to compare against.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed slowdown against the baseline before flagging a regression (0.25 = 25%%).',
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        names = [name for name in options['only'].split(',') if name] or list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        # Keep generated exports out of the real artifact cache
+        cache_dir = artifact_cache.directory
+        try:
+            with tempfile.TemporaryDirectory() as benchmark_cache_dir:
+                artifact_cache.directory = Path(benchmark_cache_dir)
+                results = self.run_benchmarks(sizes, names, options)
+        finally:
+            artifact_cache.directory = cache_dir
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def run_benchmarks(self, sizes, names, options):
+        user = User.objects.create_superuser('benchmark', 'benchmark@example.com', None)
+        client = Client()
+        client.force_login(user)
+        creators = seed_users(20, seed=options['seed'])
+        context = {'user': user, 'import_round': 0}
+
+        results = {}
+        seeded = 0
+        for size in sizes:
+            self.stdout.write(f'Seeding {size} customers...')
+            seed_customers(size - seeded, seed=f'{options["seed"]}-{size}', creators=creators)
+            seeded = size
+            middle = Customer.objects.order_by('-created_at', '-id')[size // 2]
+            context['deep_cursor'] = encode_cursor(NEXT, middle)
+
+            results[str(size)] = {}
+            for name in names:
+                results[str(size)][name] = self.measure(name, client, context, options['repeat'])
+                row = results[str(size)][name]
+                self.stdout.write(
+                    f'  {name:<24} {row["latency_ms"]:>10.1f} ms {row["queries"]:>6} queries '
+                    f'{row["peak_memory_kb"]:>10.0f} KB'
+                )
+        return results
+
+    def measure(self, name, client, context, repeat):
+        scenario = SCENARIOS[name]
+        cleanup = CLEANUP.get(name, lambda context: None)
+
+        # Warm-up run, also used to count queries
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            scenario(client, context)
+        cleanup(context)
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scenario(client, context)
+            timings.append((time.perf_counter() - start) * 1000)
+            cleanup(context)
+
+        # tracemalloc slows everything down, so memory gets its own run
+        tracemalloc.start()
+        try:
+            scenario(client, context)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        cleanup(context)
+
+        return {
+            'latency_ms': round(statistics.median(timings), 2),
+            'queries': len(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def compare(self, results, baseline_path, tolerance):
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = []
+        for size, scenarios in results.items():
+            for name, row in scenarios.items():
+                before = baseline.get(size, {}).get(name)
+                if before is None:
+                    continue
+                if row['latency_ms'] > before['latency_ms'] * (1 + tolerance):
+                    regressions.append(
+                        f'{name} @ {size}: {before["latency_ms"]} ms -> {row["latency_ms"]} ms'
+                    )
+                if row['queries'] > before['queries']:
+                    regressions.append(
+                        f'{name} @ {size}: {before["queries"]} -> {row["queries"]} queries'
+                    )
+
+        if regressions:
+            for line in regressions:
+                self.stderr.write(line)
+            raise CommandError(f'{len(regressions)} regressions against {baseline_path}')
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
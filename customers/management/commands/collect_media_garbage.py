@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from customers.images import variant_names
+from customers.models import Customer, UserProfile
+from customers.storage import BLOB_DIR, image_storage
+
+LEGACY_DIRS = ['customer_images', 'profile_images']
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield f"{path}/{name}"
+    for directory in directories:
+        yield from walk(storage, f"{path}/{directory}")
+
+
+class Command(BaseCommand):
+    help = 'Delete stored images (and their derivatives) that no customer or profile references.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list what would be deleted.')
+        parser.add_argument(
+            '--grace-hours', type=int, default=24,
+            help='Keep files younger than this, so uploads still being saved are not collected.',
+        )
+        parser.add_argument(
+            '--legacy', action='store_true',
+            help=f'Also collect files in the pre-hashing upload directories ({", ".join(LEGACY_DIRS)}).',
+        )
+
+    def handle(self, *args, **options):
+        storage = image_storage()
+        referenced = set(
+            Customer.objects.exclude(image='').exclude(image__isnull=True)
+            .values_list('image', flat=True).iterator()
+        )
+        referenced.update(
+            UserProfile.objects.exclude(profile_image='').exclude(profile_image__isnull=True)
+            .values_list('profile_image', flat=True).iterator()
+        )
+
+        directories = [BLOB_DIR] + (LEGACY_DIRS if options['legacy'] else [])
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        deleted = 0
+        kept = 0
+        for directory in directories:
+            if not storage.exists(directory):
+                continue
+            for name in walk(storage, directory):
+                if name in referenced or storage.get_modified_time(name) > cutoff:
+                    kept += 1
+                    continue
+                deleted += 1
+                if options['dry_run']:
+                    self.stdout.write(f'Would delete {name}')
+                    continue
+                storage.delete(name)
+                for derivative in variant_names(name):
+                    default_storage.delete(derivative)
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} unreferenced files, kept {kept}'))
@@ -0,0 +1,172 @@
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+import openpyxl
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from customers.importer import import_customers
+from customers.models import Customer
+from customers.pagination import keyset_page
+from customers.seeding import SEED_DOMAIN, seed_customers
+from customers.stats import get_dashboard_stats
+
+
+def _read():
+    """One customer-list-and-dashboard worth of reads."""
+    page = keyset_page(Customer.objects.all(), per_page=10)
+    list(page)
+    get_dashboard_stats()
+    Customer.objects.filter(city='Pune').count()
+
+
+def _percentile(timings, fraction):
+    timings = sorted(timings)
+    return timings[min(int(len(timings) * fraction), len(timings) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Check that reads keep their speed while a large import writes, using a '
+        'throwaway file-backed copy of the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=10000, help='Customers seeded before the run.')
+        parser.add_argument('--rows', type=int, default=20000, help='Rows in the concurrent import.')
+        parser.add_argument('--readers', type=int, default=4, help='Reader threads.')
+        parser.add_argument('--seconds', type=float, default=3.0, help='Length of the read-only baseline.')
+        parser.add_argument(
+            '--max-slowdown', type=float, default=3.0,
+            help='Fail if p95 read latency during the import exceeds the baseline by this factor.',
+        )
+
+    def handle(self, *args, **options):
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        old_test_name = test_settings.get('NAME')
+        tmpdir = tempfile.mkdtemp()
+        if connection.vendor == 'sqlite':
+            # The default in-memory test database would hide locking entirely
+            test_settings['NAME'] = str(Path(tmpdir) / 'concurrency.sqlite3')
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.run_check(options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = old_test_name
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def run_check(self, options):
+        self.stdout.write(f'Seeding {options["customers"]} customers...')
+        seed_customers(options['customers'], seed='concurrency')
+        user = User.objects.create_user('concurrency-check')
+        workbook = self.build_workbook(options['rows'])
+
+        baseline = self.read_while(options['readers'], threading.Event(), options['seconds'])
+        self.report('Baseline', baseline)
+
+        done = threading.Event()
+        write = {}
+
+        def writer():
+            try:
+                started = time.perf_counter()
+                write['result'] = import_customers(workbook, user)
+                write['elapsed'] = time.perf_counter() - started
+            except Exception as e:
+                write['error'] = e
+            finally:
+                connections['default'].close()
+                done.set()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        during = self.read_while(options['readers'], done)
+        thread.join()
+
+        if 'error' in write:
+            raise CommandError(f'Import failed: {write["error"]}')
+        result = write['result']
+        self.stdout.write(
+            f'Import: {result.created} rows in {write["elapsed"]:.1f}s '
+            f'({result.created / write["elapsed"]:.0f} rows/s), {result.failed} failed'
+        )
+        self.report('During import', during)
+
+        problems = []
+        if baseline['errors'] or during['errors']:
+            problems.append(f'{baseline["errors"] + during["errors"]} reads failed: {during["first_error"]}')
+        if result.failed:
+            problems.append(f'{result.failed} import rows failed')
+        if during['timings'] and baseline['timings']:
+            slowdown = _percentile(during['timings'], 0.95) / _percentile(baseline['timings'], 0.95)
+            self.stdout.write(f'p95 slowdown: {slowdown:.2f}x')
+            if slowdown > options['max_slowdown']:
+                problems.append(f'p95 read latency grew {slowdown:.2f}x (limit {options["max_slowdown"]}x)')
+        if problems:
+            raise CommandError('; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Reads kept up while the import wrote.'))
+
+    def build_workbook(self, rows):
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(['First Name', 'Last Name', 'Email', 'Phone', 'Address', 'City'])
+        for i in range(rows):
+            ws.append(['Load', 'Test', f'load{i}@concurrency.{SEED_DOMAIN}', '', '', 'Pune'])
+        workbook = BytesIO()
+        wb.save(workbook)
+        workbook.seek(0)
+        return workbook
+
+    def read_while(self, readers, stop, seconds=None):
+        """Run ``readers`` threads of reads until ``stop`` is set (or ``seconds`` pass)."""
+        timings, errors = [], []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds if seconds else None
+
+        def reader():
+            try:
+                while not stop.is_set() and (deadline is None or time.perf_counter() < deadline):
+                    started = time.perf_counter()
+                    try:
+                        _read()
+                    except OperationalError as e:
+                        with lock:
+                            errors.append(e)
+                        continue
+                    with lock:
+                        timings.append(time.perf_counter() - started)
+            finally:
+                connections['default'].close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {
+            'timings': timings,
+            'errors': len(errors),
+            'first_error': errors[0] if errors else None,
+            'elapsed': time.perf_counter() - started,
+        }
+
+    def report(self, label, run):
+        timings = run['timings']
+        if not timings:
+            self.stdout.write(f'{label}: no reads completed, {run["errors"]} errors')
+            return
+        self.stdout.write(
+            f'{label}: {len(timings) / run["elapsed"]:.0f} reads/s, '
+            f'p50 {statistics.median(timings) * 1000:.1f} ms, '
+            f'p95 {_percentile(timings, 0.95) * 1000:.1f} ms, {run["errors"]} errors'
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from customers import duplicates
+
+
+class Command(BaseCommand):
+    help = (
+        'Find customers that are probably the same person and store them as '
+        'clusters for review on the duplicates page.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold', type=float, default=duplicates.DEFAULT_THRESHOLD,
+            help='Minimum pair score (0-1) for two customers to be clustered.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(blocks, pairs, matches):
+            self.stdout.write(f'{blocks} blocks, {pairs} pairs scored, {matches} matches')
+
+        pairs = duplicates.find_duplicate_pairs(options['threshold'], progress=progress)
+        clusters = duplicates.build_clusters(pairs)
+        saved = duplicates.save_clusters(clusters)
+        self.stdout.write(self.style.SUCCESS(
+            f'Found {len(clusters)} clusters ({saved} open for review) '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from customers.images import MAX_WORKERS, generate_variants, has_variants
+from customers.models import Customer, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnails and other derivatives for existing customer and profile images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate derivatives that already exist.')
+        parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Number of worker threads.')
+
+    def handle(self, *args, **options):
+        sources = [
+            (Customer, 'image'),
+            (UserProfile, 'profile_image'),
+        ]
+        field_files = []
+        for model, field_name in sources:
+            field = model._meta.get_field(field_name)
+            names = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .order_by().values_list(field_name, flat=True).distinct()
+            )
+            field_files += [(name, field.storage) for name in names.iterator()]
+
+        pending = [
+            (name, storage) for name, storage in field_files
+            if options['force'] or not has_variants(name)
+        ]
+        self.stdout.write(f'{len(pending)} of {len(field_files)} images need derivatives')
+
+        def process(item):
+            name, storage = item
+            try:
+                generate_variants(name, storage)
+            except Exception as e:
+                return f'{name}: {e}'
+            return None
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for error in executor.map(process, pending):
+                if error:
+                    failed += 1
+                    self.stderr.write(error)
+
+        self.stdout.write(self.style.SUCCESS(f'Generated derivatives for {len(pending) - failed} images'))
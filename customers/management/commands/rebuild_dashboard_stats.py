@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from customers.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed dashboard statistics from the customer and user tables.'
+
+    def handle(self, *args, **options):
+        count = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} dashboard statistics'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from customers.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the customer full-text search index from the customer table.'
+
+    def handle(self, *args, **options):
+        if rebuild_search_index():
+            self.stdout.write(self.style.SUCCESS('Customer search index rebuilt'))
+        else:
+            self.stdout.write(self.style.WARNING('This database backend has no search index to rebuild'))
@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from customers.jobs import claim_next_job, requeue_stale_jobs, run_job, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Process queued bulk import jobs. Start several to drain the queue in parallel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait between polls.')
+        parser.add_argument(
+            '--requeue-after', type=int, default=0,
+            help='Requeue jobs left running for more than this many minutes (0 disables).',
+        )
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        self.stdout.write(f'Import worker {worker} started')
+
+        while True:
+            if options['requeue_after']:
+                requeued = requeue_stale_jobs(timedelta(minutes=options['requeue_after']))
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale jobs'))
+
+            job = claim_next_job(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'Running {job}')
+            job = run_job(job)
+            self.stdout.write(self.style.SUCCESS(
+                f'{job}: {job.rows_created} created, {job.rows_updated} updated, '
+                f'{job.rows_unchanged} unchanged, {job.rows_failed} failed '
+                f'({job.rows_per_second:.0f} rows/s)'
+            ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from customers.seeding import clear_seeded_data, seed_customers, seed_users
+
+
+class Command(BaseCommand):
+    help = 'Seed deterministic synthetic customers and users for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=10000, help='Number of customers to create.')
+        parser.add_argument('--users', type=int, default=20, help='Number of users to create as customer owners.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk insert.')
+        parser.add_argument('--clear', action='store_true', help='Delete previously seeded data first.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            customers, users = clear_seeded_data()
+            self.stdout.write(f'Deleted {customers} seeded customers and {users} seeded user rows')
+
+        users = seed_users(options['users'], seed=options['seed'])
+        self.stdout.write(f'Created {len(users)} users')
+
+        def progress(created):
+            self.stdout.write(f'  {created}/{options["customers"]} customers')
+
+        created = seed_customers(
+            options['customers'], seed=options['seed'], creators=users,
+            batch_size=options['batch_size'], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Created {created} customers'))
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE customers_customer_fts USING fts5(
+        first_name, last_name, email, phone, company,
+        content='customers_customer', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER customers_customer_fts_insert AFTER INSERT ON customers_customer BEGIN
+        INSERT INTO customers_customer_fts(rowid, first_name, last_name, email, phone, company)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.phone, new.company);
+    END
+    """,
+    """
+    CREATE TRIGGER customers_customer_fts_delete AFTER DELETE ON customers_customer BEGIN
+        INSERT INTO customers_customer_fts(customers_customer_fts, rowid, first_name, last_name, email, phone, company)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.phone, old.company);
+    END
+    """,
+    """
+    CREATE TRIGGER customers_customer_fts_update AFTER UPDATE OF first_name, last_name, email, phone, company
+    ON customers_customer BEGIN
+        INSERT INTO customers_customer_fts(customers_customer_fts, rowid, first_name, last_name, email, phone, company)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.phone, old.company);
+        INSERT INTO customers_customer_fts(rowid, first_name, last_name, email, phone, company)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.phone, new.company);
+    END
+    """,
+    "INSERT INTO customers_customer_fts(customers_customer_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS customers_customer_fts_update",
+    "DROP TRIGGER IF EXISTS customers_customer_fts_delete",
+    "DROP TRIGGER IF EXISTS customers_customer_fts_insert",
+    "DROP TABLE IF EXISTS customers_customer_fts",
+]
+
+# Must match customers.search.POSTGRES_DOCUMENT so the planner uses the index
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX customers_customer_search_idx ON customers_customer USING gin (
+        to_tsvector('simple',
+            first_name || ' ' || last_name || ' ' || email || ' ' || phone || ' ' || company)
+    )
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS customers_customer_search_idx",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_import_mode'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
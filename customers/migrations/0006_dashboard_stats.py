@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:03
+
+from django.db import migrations, models
+
+
+def build_stats(apps, schema_editor):
+    from customers.stats import rebuild_stats
+    rebuild_stats(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_customer_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=20)),
+                ('key', models.CharField(blank=True, max_length=200)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', '-count'], name='customers_d_dimensi_d0bb46_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardstat',
+            constraint=models.UniqueConstraint(fields=('dimension', 'key'), name='unique_dashboard_stat'),
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
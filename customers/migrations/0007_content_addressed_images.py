@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:07
+
+import customers.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_dashboard_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=customers.storage.image_storage, upload_to='customer_images/'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=customers.storage.image_storage, upload_to='profile_images/'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:40
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    UserProfile = apps.get_model('customers', 'UserProfile')
+    UserProfile.objects.bulk_create(
+        [UserProfile(user_id=pk) for pk in User.objects.filter(profile__isnull=True).values_list('pk', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('customers', '0008_customer_updated_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+        # Keyset pagination of the user directory walks (date_joined, id)
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS customers_user_joined_idx ON auth_user (date_joined, id)',
+            'DROP INDEX IF EXISTS customers_user_joined_idx',
+        ),
+    ]
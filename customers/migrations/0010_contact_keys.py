@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+def fill_contact_keys(apps, schema_editor):
+    from customers.normalization import normalize_email, normalize_phone
+
+    Customer = apps.get_model('customers', 'Customer')
+    seen = set()
+    batch = []
+    for customer in Customer.objects.order_by('created_at', 'id').only('id', 'email', 'phone').iterator(chunk_size=2000):
+        email = normalize_email(customer.email) or None
+        # Older rows may differ only by case; the oldest keeps the key, the
+        # rest get NULL and are rejected on their next save until fixed
+        if email in seen:
+            email = None
+        elif email:
+            seen.add(email)
+        customer.email_normalized = email
+        customer.phone_normalized = normalize_phone(customer.phone)
+        batch.append(customer)
+        if len(batch) >= 2000:
+            Customer.objects.bulk_update(batch, ['email_normalized', 'phone_normalized'])
+            batch = []
+    if batch:
+        Customer.objects.bulk_update(batch, ['email_normalized', 'phone_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0009_user_profiles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=16),
+        ),
+        migrations.RunPython(fill_contact_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customer',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def build_stats(apps, schema_editor):
+    from customers.stats import rebuild_stats
+    rebuild_stats(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0016_import_rows_per_second'),
+    ]
+
+    operations = [
+        # Adds the company counters the customer list's company facet reads
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
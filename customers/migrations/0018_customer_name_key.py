@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+def fill_name_keys(apps, schema_editor):
+    from customers.normalization import normalize_name
+
+    Customer = apps.get_model('customers', 'Customer')
+    batch = []
+    for customer in Customer.objects.only('id', 'first_name', 'last_name').iterator(chunk_size=2000):
+        customer.name_key = normalize_name(customer.first_name, customer.last_name)
+        batch.append(customer)
+        if len(batch) >= 2000:
+            Customer.objects.bulk_update(batch, ['name_key'])
+            batch = []
+    if batch:
+        Customer.objects.bulk_update(batch, ['name_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0017_company_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='name_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=9),
+        ),
+        migrations.RunPython(fill_name_keys, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
+from .normalization import normalize_name, normalize_email, normalize_phone
+from .storage import image_storage
 
 class Customer(models.Model):
     first_name = models.CharField(max_length=100)
@@ -19,17 +23,39 @@ class Customer(models.Model):
     state = models.CharField(max_length=100, blank=True)
     country = models.CharField(max_length=100, blank=True)
     postal_code = models.CharField(max_length=20, blank=True)
-    image = models.ImageField(upload_to='customer_images/', blank=True, null=True)
+    image = models.ImageField(upload_to='customer_images/', storage=image_storage, blank=True, null=True)
     company = models.CharField(max_length=200, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='customers_created')
+    # Lookup keys derived from email and phone in save(); see customers/normalization.py.
+    # email_normalized makes email unique regardless of case.
+    email_normalized = models.CharField(max_length=254, unique=True, null=True, editable=False)
+    phone_normalized = models.CharField(max_length=16, blank=True, db_index=True, editable=False)
+    name_key = models.CharField(max_length=9, blank=True, db_index=True, editable=False)
+    # Bumped by every write, for the change feed; see customers/changes.py
+    change_seq = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
         verbose_name = 'Customer'
         verbose_name_plural = 'Customers'
+        indexes = [
+            # Backs the default ordering and keyset pagination
+            models.Index(fields=['-created_at', '-id'], name='customer_created_idx'),
+            # max(updated_at) for conditional GET on the list
+            models.Index(fields=['updated_at'], name='customer_updated_idx'),
+            # Change feed cursor
+            models.Index(fields=['change_seq', 'id'], name='customer_change_idx'),
+            # Facet filters on the customer list, each in list order
+            models.Index(fields=['country', '-created_at', '-id'], name='customer_country_idx'),
+            models.Index(fields=['state', '-created_at', '-id'], name='customer_state_idx'),
+            models.Index(fields=['city', '-created_at', '-id'], name='customer_city_idx'),
+            models.Index(fields=['company', '-created_at', '-id'], name='customer_company_idx'),
+            # Covers the region facet counts, which group by state and city within a country
+            models.Index(fields=['country', 'state', 'city'], name='customer_region_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -37,12 +63,170 @@ class Customer(models.Model):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+    def normalize_contacts(self):
+        """Refresh the lookup keys; bulk_create()/bulk_update() callers must call it themselves."""
+        self.email_normalized = normalize_email(self.email) or None
+        self.phone_normalized = normalize_phone(self.phone)
+        self.name_key = normalize_name(self.first_name, self.last_name)
+
+    def save(self, *args, **kwargs):
+        self.normalize_contacts()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'change_seq'}
+            if {'email', 'phone'} & update_fields:
+                update_fields |= {'email_normalized', 'phone_normalized'}
+            if {'first_name', 'last_name'} & update_fields:
+                update_fields.add('name_key')
+            kwargs['update_fields'] = update_fields
+        # The counter stays locked until commit, so sequence order is commit order
+        with transaction.atomic(using=kwargs.get('using')):
+            self.change_seq = ChangeCounter.reserve()
+            super().save(*args, **kwargs)
+
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude=exclude)
+        if exclude and 'email' in exclude:
+            return
+        duplicates = Customer.objects.filter(email_normalized=normalize_email(self.email)).exclude(pk=self.pk)
+        if duplicates.exists():
+            raise ValidationError({'email': 'Customer with this Email already exists.'})
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     phone = models.CharField(max_length=17, blank=True)
     address = models.TextField(blank=True)
-    profile_image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    profile_image = models.ImageField(upload_to='profile_images/', storage=image_storage, blank=True, null=True)
     
     def __str__(self):
-        return f"{self.user.username}'s profile"
\ No newline at end of file
+        return f"{self.user.username}'s profile"
+
+class ImportJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATE_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    MODE_CHOICES = [
+        ('insert', 'Add new customers only'),
+        ('upsert', 'Add new and update existing customers (matched by email)'),
+    ]
+
+    file = models.FileField(upload_to='imports/')
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default=PENDING)
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='insert')
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_created = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    rows_unchanged = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    rows_per_second = models.FloatField(default=0)
+    error_sample = models.JSONField(default=list, blank=True)
+    # Row numbers of every failed row as ranges, e.g. "4, 9-12"
+    failed_rows = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='import_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['state', 'created_at'])]
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.state})"
+
+    @property
+    def is_finished(self):
+        return self.state in (self.DONE, self.FAILED)
+
+
+class DashboardStat(models.Model):
+    """Precomputed dashboard figure, maintained by ``customers.stats``."""
+    dimension = models.CharField(max_length=20)
+    key = models.CharField(max_length=200, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key'], name='unique_dashboard_stat'),
+        ]
+        indexes = [models.Index(fields=['dimension', '-count'])]
+
+    def __str__(self):
+        return f"{self.dimension}:{self.key} = {self.count}"
+
+
+class DuplicateCluster(models.Model):
+    """Customers that look like the same person, found by ``customers.duplicates``."""
+    OPEN = 'open'
+    DISMISSED = 'dismissed'
+    STATUS_CHOICES = [
+        (OPEN, 'Open'),
+        (DISMISSED, 'Not duplicates'),
+    ]
+
+    # Hash of the sorted member ids; keeps a dismissed cluster from coming back
+    fingerprint = models.CharField(max_length=40, unique=True)
+    customers = models.ManyToManyField(Customer, related_name='duplicate_clusters')
+    size = models.PositiveIntegerField(default=0)
+    score = models.FloatField()
+    reasons = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=OPEN)
+    created_at = models.DateTimeField(auto_now_add=True)
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-score', 'id']
+        indexes = [models.Index(fields=['status', '-score', 'id'])]
+
+    def __str__(self):
+        return f"Duplicate cluster #{self.pk} ({self.size} customers, score {self.score:.2f})"
+
+
+class ChangeCounter(models.Model):
+    """Single-row counter that hands out ``Customer.change_seq`` values."""
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def reserve(cls):
+        """
+        Return the next sequence number. Call it inside the transaction that
+        writes the change: the counter row stays locked until that commits.
+        """
+        if not cls.objects.filter(pk=1).update(value=F('value') + 1):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(value=F('value') + 1)
+        return cls.objects.values_list('value', flat=True).get(pk=1)
+
+
+class CustomerTombstone(models.Model):
+    """Left behind by a deleted customer so the change feed can report it."""
+    customer_id = models.BigIntegerField()
+    email = models.EmailField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['change_seq', 'customer_id'], name='tombstone_change_idx')]
+
+    def __str__(self):
+        return f"Deleted customer #{self.customer_id}"
+
+
+class ArtifactCacheStat(models.Model):
+    """Hit and miss counts of the export cache, see ``customers.artifacts``."""
+    kind = models.CharField(max_length=50, unique=True)
+    hits = models.BigIntegerField(default=0)
+    misses = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.kind}: {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,85 @@
+"""
+Canonical forms of customer contact details.
+
+``Customer`` keeps ``email_normalized`` (lowercased, unique) and
+``phone_normalized`` (E.164) next to the values as typed, so exact lookups,
+such as a caller-ID search, are index seeks. ``name_key``, a phonetic key of
+the name, lets duplicate detection read customers grouped by name in index
+order.
+"""
+import re
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+
+# Customer.phone_regex only accepts Indian mobile numbers
+DEFAULT_COUNTRY_CODE = '91'
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone):
+    """
+    Return ``phone`` in E.164 form (``+919876543210``), or ``''`` if it
+    does not look like a phone number.
+    """
+    phone = (phone or '').strip()
+    digits = re.sub(r'\D', '', phone)
+    if phone.startswith('+'):
+        return f'+{digits}' if 8 <= len(digits) <= 15 else ''
+    if phone.startswith('00') and 10 <= len(digits) <= 17:
+        return f'+{digits[2:]}'
+    if len(digits) == 10:
+        return f'+{DEFAULT_COUNTRY_CODE}{digits}'
+    if len(digits) == 11 and digits.startswith('0'):
+        return f'+{DEFAULT_COUNTRY_CODE}{digits[1:]}'
+    if len(digits) == 12 and digits.startswith(DEFAULT_COUNTRY_CODE):
+        return f'+{digits}'
+    return ''
+
+
+def is_email(value):
+    try:
+        validate_email(value.strip())
+    except ValidationError:
+        return False
+    return True
+
+
+def is_phone(value):
+    """True for a complete phone number, punctuation allowed."""
+    return bool(re.fullmatch(r'[\d\s()+.-]+', value.strip())) and bool(normalize_phone(value))
+
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+    'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+}
+
+
+def soundex(name):
+    letters = [c for c in name.lower() if c.isalpha()]
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code; vowels do
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def normalize_name(first_name, last_name):
+    """Return the Soundex codes of both names, e.g. ``M600-S650``."""
+    # Sorted, so swapped first and last names share a block
+    codes = sorted(code for code in (soundex(first_name), soundex(last_name)) if code)
+    return '-'.join(codes)
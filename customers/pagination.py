@@ -0,0 +1,232 @@
+"""
+Cursor pagination for the customer and user lists.
+
+``keyset_page`` pages over ``(<timestamp field>, id)``, ``created_at`` by
+default: every page is fetched with an index range scan from the last row
+of the previous page, so deep pages cost the same as the first one. ``id_list_page`` pages over an already
+known, ordered list of ids (a cached search result). Cursors are signed,
+opaque tokens. The ``a``-prefixed functions are the async versions used by
+the ASGI views.
+"""
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.db import connection
+from django.db.models import Q
+
+
+CURSOR_SALT = 'customers.pagination'
+APPROXIMATE_COUNT_LIMIT = 1000
+# How approximate_count() arrived at its number
+EXACT = 'exact'
+ESTIMATE = 'estimate'
+AT_LEAST = 'at_least'
+NEXT = 'n'
+PREVIOUS = 'p'
+OFFSET = 'o'
+
+
+def encode_cursor(direction, obj, field='created_at'):
+    # Rows of a .values() queryset page just like model instances
+    if isinstance(obj, dict):
+        value, pk = obj[field], obj['id']
+    else:
+        value, pk = getattr(obj, field), obj.pk
+    return signing.dumps([direction, value.isoformat(), pk], salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    """Return ``(direction, timestamp, pk)``, or ``None`` for a bad cursor."""
+    try:
+        direction, timestamp, pk = signing.loads(cursor, salt=CURSOR_SALT)
+        if direction not in (NEXT, PREVIOUS):
+            return None
+        return direction, datetime.fromisoformat(timestamp), int(pk)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def encode_offset_cursor(offset):
+    return signing.dumps([OFFSET, offset], salt=CURSOR_SALT)
+
+
+def decode_offset_cursor(cursor):
+    try:
+        direction, offset = signing.loads(cursor, salt=CURSOR_SALT)
+        if direction != OFFSET:
+            return 0
+        return max(int(offset), 0)
+    except (signing.BadSignature, TypeError, ValueError):
+        return 0
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, field='created_at'):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.field = field
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def next_cursor(self):
+        if self.has_next:
+            return encode_cursor(NEXT, self.object_list[-1], self.field)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous:
+            return encode_cursor(PREVIOUS, self.object_list[0], self.field)
+        return None
+
+
+def _keyset_query(queryset, cursor, per_page, field):
+    """Return ``(sliced queryset, direction)`` for the page at ``cursor``."""
+    position = decode_cursor(cursor) if cursor else None
+    queryset = queryset.order_by(f'-{field}', '-id')
+
+    if position is None:
+        return queryset[:per_page + 1], None
+
+    direction, timestamp, pk = position
+    if direction == PREVIOUS:
+        # Walk backwards from the cursor; _keyset_result() flips the rows back
+        queryset = queryset.filter(
+            Q(**{f'{field}__gte': timestamp}),
+            Q(**{f'{field}__gt': timestamp}) | Q(id__gt=pk),
+        ).order_by(field, 'id')
+    else:
+        queryset = queryset.filter(
+            Q(**{f'{field}__lte': timestamp}),
+            Q(**{f'{field}__lt': timestamp}) | Q(id__lt=pk),
+        )
+    return queryset[:per_page + 1], direction
+
+
+def _keyset_result(rows, direction, per_page, field):
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == PREVIOUS:
+        rows.reverse()
+        return KeysetPage(rows, has_next=True, has_previous=more, field=field)
+    return KeysetPage(rows, has_next=more, has_previous=direction is not None, field=field)
+
+
+def keyset_page(queryset, cursor=None, per_page=10, field='created_at'):
+    """
+    Return the page of ``queryset`` after (or before) ``cursor``, newest
+    ``field`` first.
+    """
+    queryset, direction = _keyset_query(queryset, cursor, per_page, field)
+    return _keyset_result(list(queryset), direction, per_page, field)
+
+
+async def akeyset_page(queryset, cursor=None, per_page=10, field='created_at'):
+    """Async version of ``keyset_page``."""
+    queryset, direction = _keyset_query(queryset, cursor, per_page, field)
+    return _keyset_result([row async for row in queryset], direction, per_page, field)
+
+
+class IdListPage:
+    def __init__(self, object_list, offset, per_page, total):
+        self.object_list = object_list
+        self.has_next = offset + per_page < total
+        self.has_previous = offset > 0
+        self._offset = offset
+        self._per_page = per_page
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def next_cursor(self):
+        if self.has_next:
+            return encode_offset_cursor(self._offset + self._per_page)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous:
+            return encode_offset_cursor(max(self._offset - self._per_page, 0))
+        return None
+
+
+def _id_list_offset(ids, cursor):
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    return 0 if offset >= len(ids) else offset
+
+
+def _rows_by_pk(rows):
+    # Rows of a .values() queryset are dicts that carry their id
+    return {row['id'] if isinstance(row, dict) else row.pk: row for row in rows}
+
+
+def id_list_page(queryset, ids, cursor=None, per_page=10):
+    """Return the page of ``ids`` at ``cursor``, loaded by primary key."""
+    offset = _id_list_offset(ids, cursor)
+    page_ids = ids[offset:offset + per_page]
+    objects = _rows_by_pk(queryset.filter(pk__in=page_ids))
+    rows = [objects[pk] for pk in page_ids if pk in objects]
+    return IdListPage(rows, offset, per_page, len(ids))
+
+
+async def aid_list_page(queryset, ids, cursor=None, per_page=10):
+    """Async version of ``id_list_page``."""
+    offset = _id_list_offset(ids, cursor)
+    page_ids = ids[offset:offset + per_page]
+    objects = _rows_by_pk([row async for row in queryset.filter(pk__in=page_ids)])
+    rows = [objects[pk] for pk in page_ids if pk in objects]
+    return IdListPage(rows, offset, per_page, len(ids))
+
+
+def approximate_count(queryset, limit=APPROXIMATE_COUNT_LIMIT):
+    """
+    Return ``(count, accuracy)`` without counting the whole table.
+
+    PostgreSQL's planner statistics are used for unfiltered querysets
+    (``ESTIMATE``, which may be above or below the real count); otherwise
+    counting stops after ``limit`` rows (``AT_LEAST`` when it did).
+    """
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        estimate = _planner_estimate(queryset.model)
+        if estimate is not None:
+            return estimate, ESTIMATE
+    return _capped(queryset.order_by()[:limit + 1].count(), limit)
+
+
+async def aapproximate_count(queryset, limit=APPROXIMATE_COUNT_LIMIT):
+    """Async version of ``approximate_count``."""
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        # Raw cursors have no async API yet
+        estimate = await sync_to_async(_planner_estimate)(queryset.model)
+        if estimate is not None:
+            return estimate, ESTIMATE
+    return _capped(await queryset.order_by()[:limit + 1].acount(), limit)
+
+
+def _planner_estimate(model):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row and row[0] >= 0:
+        return row[0]
+    return None
+
+
+def _capped(count, limit):
+    if count > limit:
+        return limit, AT_LEAST
+    return count, EXACT
@@ -0,0 +1,185 @@
+"""
+Customer and user directory search.
+
+SQLite uses an FTS5 index (``customers_customer_fts``) kept in sync by
+triggers, PostgreSQL a GIN index over ``to_tsvector``; both are created in
+migration 0004. SQLite drops the triggers whenever a migration rebuilds the
+customer table, so ``ensure_search_index`` restores them after every
+migrate. Other backends fall back to ``icontains`` matching. Complete
+email addresses and phone numbers skip the text index and match the
+normalized lookup keys exactly. The user
+directory is small enough for plain ``icontains``.
+"""
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.models import BooleanField, Count, FloatField, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from .models import Customer
+from .normalization import is_email, is_phone, normalize_email, normalize_phone
+
+
+SEARCH_FIELDS = ['first_name', 'last_name', 'email', 'phone', 'company']
+FTS_TABLE = 'customers_customer_fts'
+SQLITE_TRIGGERS = {
+    'customers_customer_fts_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS customers_customer_fts_insert AFTER INSERT ON customers_customer BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, email, phone, company)
+            VALUES (new.id, new.first_name, new.last_name, new.email, new.phone, new.company);
+        END
+    """,
+    'customers_customer_fts_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS customers_customer_fts_delete AFTER DELETE ON customers_customer BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name, email, phone, company)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.phone, old.company);
+        END
+    """,
+    'customers_customer_fts_update': f"""
+        CREATE TRIGGER IF NOT EXISTS customers_customer_fts_update
+        AFTER UPDATE OF first_name, last_name, email, phone, company ON customers_customer BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name, email, phone, company)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.phone, old.company);
+            INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, email, phone, company)
+            VALUES (new.id, new.first_name, new.last_name, new.email, new.phone, new.company);
+        END
+    """,
+}
+POSTGRES_DOCUMENT = (
+    "to_tsvector('simple', "
+    "first_name || ' ' || last_name || ' ' || email || ' ' || phone || ' ' || company)"
+)
+
+
+def search_terms(search_query):
+    return re.findall(r'\w+', search_query.lower())
+
+
+def _sqlite_match(terms):
+    # Every term must match, as a prefix of some indexed token
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _postgres_match(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _icontains(queryset, search_query):
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__icontains': search_query})
+    return queryset.filter(condition)
+
+
+def search_customers(search_query, queryset=None, ranked=False):
+    """
+    Filter customers the way the customer list search box does.
+
+    With ``ranked=True`` the result is ordered by relevance instead of the
+    default ``-created_at``.
+    """
+    if queryset is None:
+        queryset = Customer.objects.all()
+    if not search_query:
+        return queryset
+
+    # A complete email or phone number is an index seek on its lookup key
+    if is_email(search_query):
+        return queryset.filter(email_normalized=normalize_email(search_query))
+    if is_phone(search_query):
+        return queryset.filter(phone_normalized=normalize_phone(search_query))
+
+    terms = search_terms(search_query)
+    if not terms:
+        return _icontains(queryset, search_query)
+
+    if connection.vendor == 'sqlite':
+        match = _sqlite_match(terms)
+        queryset = queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        ))
+        if ranked:
+            # bm25() is lower for better matches
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"AND rowid = customers_customer.id",
+                [match],
+                output_field=FloatField(),
+            )).order_by('search_rank', '-created_at')
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        match = _postgres_match(terms)
+        queryset = queryset.filter(RawSQL(
+            f"{POSTGRES_DOCUMENT} @@ to_tsquery('simple', %s)", [match],
+            output_field=BooleanField(),
+        ))
+        if ranked:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', %s))", [match],
+                output_field=FloatField(),
+            )).order_by('-search_rank', '-created_at')
+        return queryset
+
+    return _icontains(queryset, search_query)
+
+
+def search_users(search_query):
+    """
+    Filter the user directory, with each user's profile joined in and the
+    number of customers they created annotated as ``customer_count``.
+    """
+    # Counted per row of the page through the created_by index, instead of
+    # grouping the whole customer table
+    customer_count = (
+        Customer.objects.filter(created_by=OuterRef('pk'))
+        .order_by().values('created_by').annotate(count=Count('pk')).values('count')
+    )
+    users = User.objects.select_related('profile').annotate(
+        customer_count=Coalesce(Subquery(customer_count), 0),
+    )
+    if search_query:
+        users = users.filter(
+            Q(username__icontains=search_query) |
+            Q(first_name__icontains=search_query) |
+            Q(last_name__icontains=search_query) |
+            Q(email__icontains=search_query)
+        )
+    return users
+
+
+def _sqlite_rebuild(cursor):
+    for sql in SQLITE_TRIGGERS.values():
+        cursor.execute(sql)
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def ensure_search_index(using='default'):
+    """Restore missing SQLite triggers and reindex; return True if anything was missing."""
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            [f'{FTS_TABLE}%'],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing or set(SQLITE_TRIGGERS) <= existing:
+            return False
+        _sqlite_rebuild(cursor)
+    return True
+
+
+def rebuild_search_index():
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            _sqlite_rebuild(cursor)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+            return True
+        if connection.vendor == 'postgresql':
+            cursor.execute("REINDEX INDEX customers_customer_search_idx")
+            return True
+    return False
@@ -0,0 +1,115 @@
+"""
+Deterministic synthetic data for load testing and benchmarks.
+
+The same seed always produces the same customers and users. Rows are
+written with ``bulk_create`` and the dashboard counters are rebuilt once at
+the end instead of per row. Seeded customers are cleared with the set-based
+bulk delete, which moves the counters itself.
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from . import changes
+from .bulk_actions import delete_customers
+from .models import Customer, UserProfile
+from .stats import rebuild_stats
+
+
+SEED_DOMAIN = 'seed.example.com'
+SEED_USERNAME_PREFIX = 'seed_user_'
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Akash', 'Ananya', 'Arjun', 'Bhavna', 'Daniel', 'Deepa', 'Emily', 'Farhan',
+    'Gauri', 'Harish', 'Isabella', 'Ishaan', 'James', 'Jane', 'John', 'Kavya', 'Lakshmi', 'Manoj',
+    'Meera', 'Michael', 'Nikhil', 'Olivia', 'Pooja', 'Priya', 'Rahul', 'Riya', 'Rohan', 'Sanjay',
+    'Sneha', 'Sophia', 'Suresh', 'Tanvi', 'Varun', 'Vikram', 'William', 'Yash', 'Zara', 'Neha',
+]
+LAST_NAMES = [
+    'Anil', 'Brown', 'Chopra', 'Das', 'Davis', 'Gupta', 'Iyer', 'Johnson', 'Joseph', 'Kapoor',
+    'Khan', 'Kumar', 'Menon', 'Miller', 'Mishra', 'Nair', 'Patel', 'Pillai', 'Rao', 'Reddy',
+    'Shah', 'Sharma', 'Singh', 'Smith', 'Taylor', 'Thomas', 'Varghese', 'Verma', 'Wilson', 'Yadav',
+]
+LOCATIONS = [
+    ('India', 'Kerala', 'Kochi'), ('India', 'Kerala', 'Thiruvananthapuram'), ('India', 'Karnataka', 'Bengaluru'),
+    ('India', 'Maharashtra', 'Mumbai'), ('India', 'Maharashtra', 'Pune'), ('India', 'Tamil Nadu', 'Chennai'),
+    ('India', 'Delhi', 'New Delhi'), ('India', 'Telangana', 'Hyderabad'), ('USA', 'NY', 'New York'),
+    ('USA', 'CA', 'Los Angeles'), ('USA', 'TX', 'Austin'), ('UK', 'England', 'London'),
+]
+COMPANY_WORDS = ['Tech', 'Soft', 'Data', 'Cloud', 'Net', 'Labs', 'Works', 'Systems', 'Media', 'Logistics']
+STREETS = ['Main St', 'MG Road', 'Park Ave', 'Market Rd', 'Lake View', 'Hill St', 'Church Rd', 'Station Rd']
+
+
+def _phone(rng):
+    number = f"{rng.choice('6789')}{rng.randrange(10 ** 9):09d}"
+    return f"+91{number}" if rng.random() < 0.5 else number
+
+
+@transaction.atomic
+def seed_users(count, seed=0, batch_size=1000):
+    rng = random.Random(f'users-{seed}')
+    # One unusable password hash, shared, keeps seeding fast
+    password = make_password(None)
+    users = []
+    for i in range(count):
+        users.append(User(
+            username=f'{SEED_USERNAME_PREFIX}{seed}_{i}',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            email=f'user{i}.{seed}@{SEED_DOMAIN}',
+            password=password,
+        ))
+    User.objects.bulk_create(users, batch_size=batch_size)
+    users = list(User.objects.filter(username__startswith=f'{SEED_USERNAME_PREFIX}{seed}_'))
+    UserProfile.objects.bulk_create([UserProfile(user=user) for user in users], batch_size=batch_size)
+    return users
+
+
+def seed_customers(count, seed=0, creators=None, batch_size=2000, progress=None):
+    rng = random.Random(f'customers-{seed}')
+    creators = list(creators or [None])
+    companies = [
+        f"{rng.choice(LAST_NAMES)} {rng.choice(COMPANY_WORDS)}" for _ in range(max(count // 50, 10))
+    ]
+
+    created = 0
+    while created < count:
+        batch = []
+        for i in range(created, min(created + batch_size, count)):
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = rng.choice(LAST_NAMES)
+            country, state, city = rng.choice(LOCATIONS)
+            batch.append(Customer(
+                first_name=first_name,
+                last_name=last_name,
+                email=f'{first_name.lower()}.{last_name.lower()}.{i}.{seed}@{SEED_DOMAIN}',
+                phone=_phone(rng) if rng.random() < 0.9 else '',
+                address=f'{rng.randrange(1, 500)} {rng.choice(STREETS)}',
+                city=city,
+                state=state,
+                country=country,
+                postal_code=f'{rng.randrange(100000, 999999)}',
+                company=rng.choice(companies) if rng.random() < 0.8 else '',
+                notes='',
+                created_by=rng.choice(creators),
+            ))
+            batch[-1].normalize_contacts()
+        with transaction.atomic():
+            changes.stamp(batch)
+            Customer.objects.bulk_create(batch)
+        created += len(batch)
+        if progress is not None:
+            progress(created)
+
+    rebuild_stats()
+    return created
+
+
+@transaction.atomic
+def clear_seeded_data():
+    customers = delete_customers(Customer.objects.filter(email__endswith=f'@{SEED_DOMAIN}'))
+    # A few users, so their per-row signals are cheap
+    users, _ = User.objects.filter(username__startswith=SEED_USERNAME_PREFIX).delete()
+    return customers, users
@@ -0,0 +1,80 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import changes, images, search, stats
+from .models import Customer, UserProfile
+
+
+@receiver(post_init, sender=Customer)
+def remember_stat_keys(sender, instance, **kwargs):
+    instance._stat_snapshot = stats.snapshot(instance)
+
+
+@receiver(post_save, sender=Customer)
+def update_customer_stats(sender, instance, created, raw=False, **kwargs):
+    if raw or stats.is_deferred():
+        return
+    if created:
+        stats.record_customers_created([instance])
+    else:
+        stats.record_customers_changed([(instance._stat_snapshot, instance)])
+    instance._stat_snapshot = stats.snapshot(instance)
+
+
+@receiver(post_delete, sender=Customer)
+def remove_customer_stats(sender, instance, **kwargs):
+    if not stats.is_deferred():
+        stats.record_customers_deleted([instance])
+
+
+@receiver(post_delete, sender=Customer)
+def leave_customer_tombstone(sender, instance, **kwargs):
+    if not stats.is_deferred():
+        changes.record_deleted(instance)
+
+
+@receiver(post_save, sender=User)
+def count_new_user(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.record_users(1)
+
+
+@receiver(post_save, sender=User)
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    # Created up front so the read paths never have to write one
+    if created and not raw:
+        UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(pre_delete, sender=User)
+def stamp_orphaned_customers(sender, instance, **kwargs):
+    # created_by is then set to NULL with an UPDATE that sends no signals, so
+    # give those customers a sequence number for the change feed here; it
+    # commits with the delete
+    instance.customers_created.update(change_seq=changes.next_sequence(), updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=User)
+def remove_user_stats(sender, instance, **kwargs):
+    stats.record_users(-1)
+    stats.record_user_deleted(instance.pk)
+
+
+@receiver(post_save, sender=Customer)
+def build_customer_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.schedule_variants(instance.image)
+
+
+@receiver(post_save, sender=UserProfile)
+def build_profile_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.schedule_variants(instance.profile_image)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using='default', **kwargs):
+    if sender.name == 'customers':
+        search.ensure_search_index(using)
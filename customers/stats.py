@@ -0,0 +1,283 @@
+"""
+Denormalized dashboard statistics.
+
+Counts live in ``DashboardStat`` rows keyed by ``(dimension, key)`` and are
+adjusted incrementally: by signals for single saves and deletes (see
+``customers.signals``), by the bulk importer for ``bulk_create`` /
+``bulk_update`` and, with one GROUP BY per dimension, by the set-based bulk
+actions. ``rebuild_stats`` recomputes everything from scratch.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DashboardStat
+
+
+CUSTOMERS = 'customers'
+USERS = 'users'
+COUNTRY = 'country'
+STATE = 'state'
+CITY = 'city'
+COMPANY = 'company'
+DAY = 'day'
+CREATOR = 'creator'
+
+# Dimensions that follow a field which can change after creation
+TRACKED_FIELDS = {
+    COUNTRY: 'country',
+    STATE: 'state',
+    CITY: 'city',
+    COMPANY: 'company',
+    CREATOR: 'created_by_id',
+}
+
+
+# Set while a bulk action records its own deltas, see deferred()
+_deferred = ContextVar('customers_stats_deferred', default=False)
+
+
+def _key(value):
+    return '' if value is None else str(value)
+
+
+@contextmanager
+def deferred():
+    """
+    Make the per-row signal handlers leave the counters (and the change
+    feed's tombstones) alone, for callers that record the whole change
+    set-based.
+    """
+    token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+
+def is_deferred():
+    return _deferred.get()
+
+
+def snapshot(customer):
+    """
+    Return ``{dimension: key}`` for the tracked fields of ``customer``.
+
+    Deferred fields are left out, since reading them would cost a query.
+    """
+    deferred = customer.get_deferred_fields()
+    return {
+        dimension: _key(getattr(customer, field))
+        for dimension, field in TRACKED_FIELDS.items()
+        if field not in deferred
+    }
+
+
+def customer_keys(customer):
+    """Return the ``(dimension, key)`` pairs ``customer`` is counted under."""
+    keys = [(CUSTOMERS, '')]
+    keys += [(dimension, _key(getattr(customer, field))) for dimension, field in TRACKED_FIELDS.items()]
+    if customer.created_at:
+        keys.append((DAY, timezone.localdate(customer.created_at).isoformat()))
+    return keys
+
+
+def apply_deltas(deltas):
+    """Add each ``{(dimension, key): delta}`` to its counter row."""
+    with transaction.atomic():
+        for (dimension, key), delta in deltas.items():
+            if not delta:
+                continue
+            counter = DashboardStat.objects.filter(dimension=dimension, key=key)
+            if counter.update(count=F('count') + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    DashboardStat.objects.create(dimension=dimension, key=key, count=delta)
+            except IntegrityError:
+                # Another process created the row first
+                counter.update(count=F('count') + delta)
+
+
+def record_customers_created(customers):
+    deltas = Counter()
+    for customer in customers:
+        deltas.update(customer_keys(customer))
+    apply_deltas(deltas)
+
+
+def record_customers_deleted(customers):
+    deltas = Counter()
+    for customer in customers:
+        deltas.subtract(customer_keys(customer))
+    apply_deltas(deltas)
+
+
+def record_customers_changed(pairs):
+    """
+    Move counts for ``(old, customer)`` pairs, where ``old`` is a (possibly
+    partial) snapshot taken before the change.
+    """
+    deltas = Counter()
+    for old, customer in pairs:
+        for dimension, old_key in old.items():
+            new_key = _key(getattr(customer, TRACKED_FIELDS[dimension]))
+            if new_key != old_key:
+                deltas[(dimension, old_key)] -= 1
+                deltas[(dimension, new_key)] += 1
+    apply_deltas(deltas)
+
+
+def _group_counts(customers):
+    """Yield ``((dimension, key), count)`` for ``customers``, one GROUP BY per dimension."""
+    customers = customers.order_by()
+    for dimension, field in TRACKED_FIELDS.items():
+        for row in customers.values(field).annotate(total=Count('id')):
+            yield (dimension, _key(row[field])), row['total']
+    for row in customers.annotate(day=TruncDate('created_at')).values('day').annotate(total=Count('id')):
+        yield (DAY, row['day'].isoformat()), row['total']
+
+
+def record_queryset_deleted(queryset):
+    """Subtract every customer in ``queryset``; call it before deleting them."""
+    deltas = Counter({(CUSTOMERS, ''): -queryset.order_by().count()})
+    for key, total in _group_counts(queryset):
+        deltas[key] -= total
+    apply_deltas(deltas)
+
+
+def record_queryset_changed(queryset, values):
+    """
+    Move the customers in ``queryset`` to the keys of ``values``
+    (``{field: new_value}``); call it before the update.
+    """
+    deltas = Counter()
+    customers = queryset.order_by()
+    for dimension, field in TRACKED_FIELDS.items():
+        if field not in values:
+            continue
+        for row in customers.values(field).annotate(total=Count('id')):
+            deltas[(dimension, _key(row[field]))] -= row['total']
+            deltas[(dimension, _key(values[field]))] += row['total']
+    apply_deltas(deltas)
+
+
+def record_users(delta):
+    apply_deltas({(USERS, ''): delta})
+
+
+def record_user_deleted(user_pk):
+    # The user's customers are set to created_by=NULL without any signals
+    key = str(user_pk)
+    stat = DashboardStat.objects.filter(dimension=CREATOR, key=key).first()
+    if stat is not None:
+        apply_deltas({(CREATOR, key): -stat.count, (CREATOR, ''): stat.count})
+
+
+@transaction.atomic
+def rebuild_stats(apps=django_apps):
+    """
+    Recompute every counter with one GROUP BY per dimension.
+
+    ``apps`` lets migrations pass their historical app registry.
+    """
+    customer_model = apps.get_model('customers', 'Customer')
+    user_model = apps.get_model('auth', 'User')
+    stat_model = apps.get_model('customers', 'DashboardStat')
+    stat_model.objects.all().delete()
+
+    stats = [
+        stat_model(dimension=CUSTOMERS, key='', count=customer_model.objects.count()),
+        stat_model(dimension=USERS, key='', count=user_model.objects.count()),
+    ]
+    for (dimension, key), total in _group_counts(customer_model.objects.all()):
+        stats.append(stat_model(dimension=dimension, key=key, count=total))
+
+    stat_model.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
+
+
+def _dashboard_querysets(top, first_day):
+    """The independent dashboard queries, by name."""
+    def top_keys(dimension):
+        return (
+            DashboardStat.objects.filter(dimension=dimension, count__gt=0)
+            .order_by('-count', 'key')
+            .values_list('key', 'count')[:top]
+        )
+
+    return {
+        'totals': (
+            DashboardStat.objects.filter(dimension__in=[CUSTOMERS, USERS], key='')
+            .values_list('dimension', 'count')
+        ),
+        COUNTRY: top_keys(COUNTRY),
+        STATE: top_keys(STATE),
+        CITY: top_keys(CITY),
+        CREATOR: top_keys(CREATOR),
+        DAY: (
+            DashboardStat.objects.filter(dimension=DAY, key__gte=first_day.isoformat())
+            .values_list('key', 'count')
+        ),
+    }
+
+
+def _creator_ids(creators):
+    return [int(key) for key, _ in creators if key]
+
+
+def _build_dashboard(rows, users, today, days, weeks):
+    totals = dict(rows['totals'])
+    per_day = dict(rows[DAY])
+    daily = []
+    for offset in range(days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        daily.append((day, per_day.get(day.isoformat(), 0)))
+    weekly = []
+    for week in range(weeks - 1, -1, -1):
+        start = today - timedelta(days=week * 7 + 6)
+        total = sum(per_day.get((start + timedelta(days=i)).isoformat(), 0) for i in range(7))
+        weekly.append((start, total))
+
+    top_creators = []
+    for key, count in rows[CREATOR]:
+        user = users.get(int(key)) if key else None
+        top_creators.append((user.get_full_name() or user.username if user else '', count))
+
+    return {
+        'total_customers': totals.get(CUSTOMERS, 0),
+        'total_users': totals.get(USERS, 0),
+        'top_countries': list(rows[COUNTRY]),
+        'top_states': list(rows[STATE]),
+        'top_cities': list(rows[CITY]),
+        'customers_per_day': daily,
+        'customers_per_week': weekly,
+        'top_creators': top_creators,
+    }
+
+
+def get_dashboard_stats(top=5, days=14, weeks=8):
+    today = timezone.localdate()
+    querysets = _dashboard_querysets(top, today - timedelta(days=weeks * 7 - 1))
+    rows = {name: list(queryset) for name, queryset in querysets.items()}
+    users = User.objects.in_bulk(_creator_ids(rows[CREATOR]))
+    return _build_dashboard(rows, users, today, days, weeks)
+
+
+async def aget_dashboard_stats(top=5, days=14, weeks=8):
+    """
+    Async version of ``get_dashboard_stats``.
+
+    Django 4.2 runs every async ORM call on the request's one sync thread, so
+    the queries could not overlap anyway; they run together in a single hop.
+    """
+    return await sync_to_async(get_dashboard_stats)(top, days, weeks)
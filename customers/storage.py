@@ -0,0 +1,90 @@
+"""
+Content-addressed storage for uploaded images.
+
+Files are named after the SHA-256 of their bytes (``images/ab/abcd….png``),
+whatever field or upload path they came from, so identical uploads share a
+single blob and a blob's URL never changes content. Unreferenced blobs are
+removed by the ``collect_media_garbage`` command.
+"""
+import hashlib
+import os
+
+from django.core.files import locks
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.utils._os import safe_makedirs
+from django.utils.deconstruct import deconstructible
+
+
+BLOB_DIR = 'images'
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def blob_name(digest, original_name):
+    ext = os.path.splitext(original_name)[1].lower()
+    return f"{BLOB_DIR}/{digest[:2]}/{digest}{ext}"
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content in _save(), never suffixed
+        return name
+
+    def _touch(self, name):
+        # A blob that is referenced again counts as new, so collect_media_garbage's
+        # grace period covers it until the referencing row is saved
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def _save(self, name, content):
+        name = blob_name(content_hash(content), name)
+        if self.exists(name):
+            self._touch(name)
+            return name
+
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            safe_makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        # Unlike FileSystemStorage._save(), a name that exists already is not
+        # retried (get_available_name() would return it again, forever)
+        try:
+            if hasattr(content, 'temporary_file_path'):
+                file_move_safe(content.temporary_file_path(), full_path)
+            else:
+                with open(full_path, 'xb') as blob:
+                    locks.lock(blob, locks.LOCK_EX)
+                    try:
+                        for chunk in content.chunks():
+                            blob.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+                    finally:
+                        locks.unlock(blob)
+        except FileExistsError:
+            # Saved concurrently by another request; the bytes are identical
+            self._touch(name)
+            return name
+
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        self._ensure_location_group_id(full_path)
+        return name
+
+_image_storage = ContentAddressedStorage()
+
+
+def image_storage():
+    return _image_storage
@@ -0,0 +1,51 @@
+"""
+Streaming responses that stream under both WSGI and ASGI.
+
+Under ASGI, Django 4.2 reads a synchronous ``StreamingHttpResponse``
+iterator to the end with ``sync_to_async(list)`` before sending a byte, so
+an export or change feed would be held in memory whole. ``stream_response``
+hands ASGI an async iterator instead, which pulls ``STREAM_BATCH_SIZE``
+items at a time from the sync iterator in a thread. The calls are thread
+sensitive, so every batch runs in the same thread and the ORM's
+``iterator()`` cursor stays on its connection. WSGI keeps the sync iterator.
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+
+STREAM_BATCH_SIZE = 500
+
+
+def _next_batch(iterator, size):
+    return list(islice(iterator, size))
+
+
+def _close(iterator):
+    close = getattr(iterator, 'close', None)
+    if close is not None:
+        close()
+
+
+async def aiter_in_thread(iterator, batch_size=STREAM_BATCH_SIZE):
+    """Yield the items of the sync ``iterator``, reading batches in a thread."""
+    iterator = iter(iterator)
+    try:
+        while True:
+            batch = await sync_to_async(_next_batch)(iterator, batch_size)
+            if not batch:
+                return
+            for item in batch:
+                yield item
+    finally:
+        # Also when the client went away, so the generator's cursor is released
+        await sync_to_async(_close)(iterator)
+
+
+def stream_response(request, iterator, **kwargs):
+    """A ``StreamingHttpResponse`` over ``iterator`` that is not buffered under ASGI."""
+    if isinstance(request, ASGIRequest):
+        iterator = aiter_in_thread(iterator)
+    return StreamingHttpResponse(iterator, **kwargs)
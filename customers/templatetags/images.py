@@ -0,0 +1,31 @@
+from django import template
+from django.core.files.storage import default_storage
+
+from customers.images import WEBP_SUPPORTED, note_missing_variant, variant_name
+
+
+register = template.Library()
+
+
+@register.filter
+def image_variant(field_file, variant):
+    """URL of the JPEG ``variant`` of an image, or of the original until it exists."""
+    if not field_file:
+        return ''
+    path = variant_name(field_file.name, variant)
+    if default_storage.exists(path):
+        return default_storage.url(path)
+    note_missing_variant(path)
+    return field_file.url
+
+
+@register.filter
+def image_variant_webp(field_file, variant):
+    """URL of the WebP ``variant`` of an image, or an empty string."""
+    if not field_file or not WEBP_SUPPORTED:
+        return ''
+    path = variant_name(field_file.name, variant, 'webp')
+    if default_storage.exists(path):
+        return default_storage.url(path)
+    note_missing_variant(path)
+    return ''
@@ -0,0 +1,18 @@
+"""The customer URLs as served with ``ASYNC_VIEWS`` on."""
+from django.urls import path
+
+from customers import async_views, urls
+
+ASYNC_VIEWS = {
+    'dashboard': async_views.dashboard,
+    'customer_list': async_views.customer_list,
+    'customer_detail': async_views.customer_detail,
+    'user_list': async_views.user_list,
+    'login': async_views.login_view,
+    'logout': async_views.logout_view,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS.get(pattern.name, pattern.callback), name=pattern.name)
+    for pattern in urls.urlpatterns
+]
@@ -0,0 +1,113 @@
+import base64
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers.models import Customer, CustomerTombstone, DashboardStat
+
+from .utils import make_customers
+
+
+BASIC_AUTH = 'Basic ' + base64.b64encode(b'api:password').decode()
+
+
+class CustomerAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('api', 'api@example.com', 'password')
+        self.client.force_login(self.user)
+
+    def batch(self, payload, client=None, **extra):
+        return (client or self.client).post(
+            reverse('api_customer_batch'), json.dumps(payload), content_type='application/json', **extra,
+        )
+
+    def test_authentication(self):
+        client = Client()
+        self.assertEqual(client.get(reverse('api_customer_collection')).status_code, 401)
+        self.assertEqual(client.get(reverse('api_customer_collection'), HTTP_AUTHORIZATION=BASIC_AUTH).status_code, 200)
+
+        session_client = Client(enforce_csrf_checks=True)
+        session_client.force_login(self.user)
+        self.assertEqual(self.batch({}, client=session_client).status_code, 403)
+        basic_client = Client(enforce_csrf_checks=True)
+        self.assertEqual(self.batch({}, client=basic_client, HTTP_AUTHORIZATION=BASIC_AUTH).status_code, 200)
+
+    def test_sparse_fields_and_cursor(self):
+        make_customers(25)
+        with self.assertNumQueries(3):
+            body = self.client.get(reverse('api_customer_collection'), {'fields': 'id,email', 'limit': 10}).json()
+        self.assertEqual(set(body['results'][0]), {'id', 'email'})
+        seen = [row['id'] for row in body['results']]
+        while body['next']:
+            body = self.client.get(
+                reverse('api_customer_collection'), {'fields': 'id', 'limit': 10, 'cursor': body['next']},
+            ).json()
+            seen += [row['id'] for row in body['results']]
+        self.assertEqual(seen, list(Customer.objects.values_list('pk', flat=True)))
+
+        customer = Customer.objects.get(email='customer3@example.com')
+        response = self.client.get(reverse('api_customer_item', args=[customer.pk]), {'fields': 'email,image'})
+        self.assertEqual(response.json(), {'email': 'customer3@example.com', 'image': None})
+        self.assertEqual(self.client.get(reverse('api_customer_collection'), {'fields': 'password'}).status_code, 400)
+
+    def test_batch_writes(self):
+        response = self.batch({'create': [
+            {'first_name': 'First', 'last_name': 'Last', 'email': f'customer{i}@example.com', 'city': 'Pune'}
+            for i in range(20)
+        ]})
+        self.assertEqual(response.status_code, 200, response.content)
+        ids = response.json()['created']
+        self.assertEqual(DashboardStat.objects.get(dimension='city', key='Pune').count, 20)
+
+        response = self.batch({'update': [{'id': ids[0], 'city': 'Goa'}], 'delete': ids[1:5]})
+        self.assertEqual(response.status_code, 200, response.content)
+        updated = Customer.objects.get(pk=ids[0])
+        # Fields left out keep their value
+        self.assertEqual((updated.city, updated.first_name), ('Goa', 'First'))
+        self.assertEqual(Customer.objects.count(), 16)
+        self.assertEqual(CustomerTombstone.objects.filter(customer_id__in=ids[1:5]).count(), 4)
+        self.assertEqual(DashboardStat.objects.get(dimension='city', key='Pune').count, 15)
+
+    def test_invalid_batch_saves_nothing(self):
+        existing = make_customers(2)
+        response = self.batch({
+            'create': [
+                {'first_name': 'Taken', 'last_name': 'Email', 'email': 'customer0@example.com'},
+                {'first_name': 'New', 'last_name': 'Customer', 'email': 'new@example.com'},
+            ],
+            'update': [{'id': existing[1].pk, 'phone': 'not a phone'}],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'create.0', f'update.{existing[1].pk}'})
+        self.assertFalse(Customer.objects.filter(email='new@example.com').exists())
+
+    def test_malformed_batches(self):
+        # The pk a JSON true would pass for
+        customer = Customer.objects.create(pk=1, first_name='First', last_name='Last', email='first@example.com')
+        change_seq = customer.change_seq
+        for payload in (
+            [],
+            {'create': {}},
+            {'update': [{'city': 'Goa'}]},
+            {'update': [{'id': '1'}]},
+            {'update': [{'id': True}]},
+            {'delete': [False]},
+            {'delete': [customer.pk], 'update': [{'id': customer.pk}]},
+        ):
+            self.assertEqual(self.batch(payload).status_code, 400, payload)
+        # true is not customer 1
+        customer.refresh_from_db()
+        self.assertEqual(customer.change_seq, change_seq)
+
+    def test_batch_delete_queries_do_not_grow_with_rows(self):
+        def delete_queries(count, start):
+            ids = [customer.pk for customer in make_customers(count, start=start)]
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.batch({'delete': ids}).status_code, 200)
+            return len(captured)
+
+        self.assertEqual(delete_queries(5, 0), delete_queries(50, 5))
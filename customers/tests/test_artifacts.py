@@ -0,0 +1,103 @@
+import os
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from customers.artifacts import ArtifactCache, artifact_cache, data_version
+from customers.models import ArtifactCacheStat, Customer
+
+from .utils import make_customers
+
+
+def temp_directory(test):
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return Path(directory.name)
+
+
+class ExportCacheTests(TestCase):
+    def setUp(self):
+        directory, artifact_cache.directory = artifact_cache.directory, temp_directory(self)
+        self.addCleanup(setattr, artifact_cache, 'directory', directory)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.customers = make_customers(5, country='India')
+
+    def download(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        return response['X-Artifact-Cache'], b''.join(response.streaming_content)
+
+    def test_second_download_is_a_hit(self):
+        for name in ['export_xlsx', 'export_pdf', 'download_sample_excel']:
+            first, first_body = self.download(name, country='India')
+            second, second_body = self.download(name, country='India')
+            self.assertEqual((first, second), ('miss', 'hit'), name)
+            self.assertEqual(first_body, second_body)
+        # Another filter is another artifact
+        self.assertEqual(self.download('export_xlsx')[0], 'miss')
+
+    def test_update_and_delete_change_the_version(self):
+        customers = Customer.objects.filter(country='India')
+        version = data_version(customers)
+        self.download('export_xlsx', country='India')
+
+        self.customers[0].city = 'Pune'
+        self.customers[0].save()
+        self.assertNotEqual(data_version(customers), version)
+        self.assertEqual(self.download('export_xlsx', country='India')[0], 'miss')
+
+        version = data_version(customers)
+        self.customers[1].delete()
+        self.assertNotEqual(data_version(customers), version)
+        self.assertEqual(self.download('export_xlsx', country='India')[0], 'miss')
+        self.assertEqual(self.download('export_xlsx', country='India')[0], 'hit')
+
+    def test_counters(self):
+        self.download('export_xlsx', country='India')
+        self.download('export_xlsx', country='India')
+        self.download('export_xlsx', country='India')
+        self.download('download_sample_excel')
+        self.assertEqual(
+            sorted(ArtifactCacheStat.objects.values_list('kind', 'hits', 'misses')),
+            [('sample', 0, 1), ('xlsx', 2, 1)],
+        )
+        response = self.client.get(reverse('profiling_log'))
+        self.assertContains(response, 'Export Cache')
+        self.assertContains(response, '<td>xlsx</td>')
+
+
+class EvictionTests(TestCase):
+    def setUp(self):
+        self.cache = ArtifactCache(temp_directory(self), max_bytes=300)
+
+    def add(self, key, age):
+        artifact, _ = self.cache.open('kind', key, lambda: BytesIO(b'x' * 100))
+        artifact.close()
+        then = time.time() - age
+        os.utime(self.cache.path('kind', key), (then, then))
+
+    def test_least_recently_used_removed_first(self):
+        self.add(0, age=300)
+        self.add(1, age=200)
+        self.add(2, age=100)
+        self.cache.max_bytes = 250
+
+        # A hit refreshes 0, so 1 is now the oldest
+        artifact, hit = self.cache.open('kind', 0, build=None)
+        artifact.close()
+        self.assertTrue(hit)
+        self.add(3, age=0)
+
+        self.assertEqual(self.cache.usage(), (2, 200))
+        remaining = [key for key in range(4) if self.cache.path('kind', key).exists()]
+        self.assertEqual(remaining, [0, 3])
+
+    def test_within_budget_keeps_everything(self):
+        self.add(0, age=10)
+        self.add(1, age=0)
+        self.assertEqual(self.cache.evict(), 0)
+        self.assertEqual(self.cache.usage(), (2, 200))
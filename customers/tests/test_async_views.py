@@ -0,0 +1,83 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from customers.cache import search_result_cache
+from customers.models import Customer
+
+from .utils import make_customers
+
+
+@override_settings(ROOT_URLCONF='customers.tests.async_urls')
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        search_result_cache.clear()
+        self.user = User.objects.create_user('staff', password='secret', first_name='Sam')
+        self.customers = make_customers(12, created_by=self.user)
+
+    async def login(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+    async def test_anonymous_redirected_to_login(self):
+        for name in ('dashboard', 'customer_list', 'user_list'):
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(response['Location'].startswith(reverse('login')))
+
+    async def test_dashboard(self):
+        await self.login()
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['recent_customers']), 5)
+
+    async def test_list_pages_and_searches(self):
+        await self.login()
+        response = await self.async_client.get(reverse('customer_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertTrue(response.context['page_obj'].has_next)
+
+        next_page = await self.async_client.get(
+            reverse('customer_list'), {'cursor': response.context['page_obj'].next_cursor}
+        )
+        self.assertEqual(len(next_page.context['page_obj']), 2)
+
+        response = await self.async_client.get(reverse('customer_list'), {'search': 'First11'})
+        self.assertEqual([c.pk for c in response.context['page_obj']], [self.customers[11].pk])
+        self.assertEqual(response.context['total_count'], 1)
+
+    async def test_detail_and_missing(self):
+        await self.login()
+        response = await self.async_client.get(reverse('customer_detail', args=[self.customers[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['customer'], self.customers[0])
+
+        last_pk = await Customer.objects.order_by('-pk').values_list('pk', flat=True).afirst()
+        response = await self.async_client.get(reverse('customer_detail', args=[last_pk + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_user_list(self):
+        await self.login()
+        response = await self.async_client.get(reverse('user_list'), {'search': 'staff'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([u.username for u in response.context['page_obj']], ['staff'])
+
+    async def test_login_and_logout(self):
+        response = await self.async_client.get(reverse('login'))
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.post(reverse('login'), {'username': 'staff', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await self.async_client.get(reverse('dashboard'))).status_code, 302)
+
+        response = await self.async_client.post(reverse('login'), {'username': 'staff', 'password': 'secret'})
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual((await self.async_client.get(reverse('dashboard'))).status_code, 200)
+        self.assertRedirects(
+            await self.async_client.get(reverse('login')), reverse('dashboard'), fetch_redirect_response=False
+        )
+
+        response = await self.async_client.get(reverse('logout'))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        self.assertEqual((await self.async_client.get(reverse('dashboard'))).status_code, 302)
@@ -0,0 +1,102 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers.bulk_actions import DELETE, REASSIGN, SET_FIELDS, run_bulk_action
+from customers.models import Customer, CustomerTombstone, DashboardStat, DuplicateCluster
+from customers.stats import rebuild_stats
+
+from .utils import stat_rows
+
+
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.other = User.objects.create_user('other')
+        for i in range(12):
+            Customer.objects.create(
+                first_name='Ann' if i < 4 else 'Bob', last_name='Last', email=f'customer{i}@example.com',
+                city='Pune' if i % 2 else 'Goa', country='India', company='Acme', created_by=self.owner,
+            )
+
+    def assertCountersMatchRebuild(self):
+        incremental = stat_rows()
+        rebuild_stats()
+        self.assertEqual(incremental, stat_rows())
+
+    def test_delete_moves_counters(self):
+        self.assertEqual(run_bulk_action(DELETE, Customer.objects.filter(city='Pune')), 6)
+        self.assertEqual(Customer.objects.count(), 6)
+        self.assertEqual(DashboardStat.objects.get(dimension='city', key='Pune').count, 0)
+        self.assertEqual(DashboardStat.objects.get(dimension='customers', key='').count, 6)
+        self.assertCountersMatchRebuild()
+
+    def test_delete_leaves_tombstones_and_drops_memberships(self):
+        deleted = list(Customer.objects.filter(city='Pune').order_by('pk'))
+        cluster = DuplicateCluster.objects.create(fingerprint='x', size=2, score=1)
+        cluster.customers.add(deleted[0], Customer.objects.filter(city='Goa').first())
+        run_bulk_action(DELETE, Customer.objects.filter(city='Pune'))
+
+        tombstones = CustomerTombstone.objects.order_by('customer_id')
+        self.assertEqual(
+            list(tombstones.values_list('customer_id', 'email')),
+            [(customer.pk, customer.email) for customer in deleted],
+        )
+        self.assertEqual(len({tombstone.change_seq for tombstone in tombstones}), 1)
+        self.assertEqual(cluster.customers.count(), 1)
+
+    def test_delete_queries_do_not_grow_with_rows(self):
+        def delete_queries(queryset):
+            with CaptureQueriesContext(connection) as captured:
+                run_bulk_action(DELETE, queryset)
+            return len(captured)
+
+        self.assertEqual(delete_queries(Customer.objects.filter(first_name='Ann')),
+                         delete_queries(Customer.objects.filter(first_name='Bob')))
+
+    def test_updates_move_counters(self):
+        run_bulk_action(SET_FIELDS, Customer.objects.filter(city='Goa'), values={'city': 'Delhi', 'company': 'Initech'})
+        self.assertEqual(DashboardStat.objects.get(dimension='city', key='Delhi').count, 6)
+        self.assertEqual(DashboardStat.objects.get(dimension='company', key='Acme').count, 6)
+        self.assertCountersMatchRebuild()
+
+        run_bulk_action(REASSIGN, Customer.objects.all(), owner=self.other)
+        self.assertEqual(DashboardStat.objects.get(dimension='creator', key=str(self.other.pk)).count, 12)
+        self.assertCountersMatchRebuild()
+        run_bulk_action(REASSIGN, Customer.objects.all(), owner=None)
+        self.assertEqual(Customer.objects.filter(created_by=None).count(), 12)
+        self.assertCountersMatchRebuild()
+
+
+class BulkActionViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('staff')
+        User.objects.create_user('other')
+        self.client.force_login(self.user)
+        for i in range(12):
+            Customer.objects.create(
+                first_name='Ann' if i < 4 else 'Bob', last_name='Last', email=f'customer{i}@example.com',
+            )
+
+    def post(self, **data):
+        return self.client.post(reverse('customer_bulk_action'), data, follow=True)
+
+    def test_all_matching_a_search(self):
+        self.assertContains(self.post(action='delete', scope='all', search='Ann'), '4 customers deleted.')
+        self.assertEqual(Customer.objects.count(), 8)
+        self.assertContains(self.post(action='reassign', scope='all', owner='other'), '8 customers updated.')
+        self.assertEqual(Customer.objects.filter(created_by__username='other').count(), 8)
+
+    def test_selected(self):
+        ids = list(Customer.objects.values_list('pk', flat=True)[:3])
+        response = self.post(action='set_fields', scope='selected', selected=ids, city='Pune')
+        self.assertContains(response, '3 customers updated.')
+        self.assertEqual(set(Customer.objects.filter(city='Pune').values_list('pk', flat=True)), set(ids))
+
+    def test_errors(self):
+        self.assertContains(self.post(action='delete', scope='selected'), 'Select at least one customer.')
+        self.assertContains(self.post(action='reassign', scope='all', owner='nobody'), 'No user named nobody.')
+        self.assertContains(self.post(action='set_fields', scope='all'), 'Enter at least one value to set.')
+        self.assertEqual(Customer.objects.count(), 12)
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from customers import cache, changes
+from customers.cache import LRUCache, cached_search_ids, ranked_search_ids, search_result_cache
+from customers.models import Customer
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+        self.assertEqual((lru.hits, lru.misses), (3, 1))
+
+    def test_entries_expire(self):
+        lru = LRUCache(maxsize=2, ttl=60)
+        with mock.patch('customers.cache.time.monotonic', return_value=0):
+            lru.set('a', 1)
+        with mock.patch('customers.cache.time.monotonic', return_value=61):
+            self.assertIsNone(lru.get('a'))
+
+
+class SearchResultCacheTests(TestCase):
+    def setUp(self):
+        search_result_cache.clear()
+        self.customers = [
+            Customer.objects.create(first_name=f'First{i}', last_name='Smith', email=f'customer{i}@example.com')
+            for i in range(25)
+        ]
+
+    def test_ids_cached_in_list_order(self):
+        ids = cached_search_ids('Smith')
+        self.assertEqual(list(ids), list(Customer.objects.order_by('-created_at', '-id').values_list('pk', flat=True)))
+        # Only the version is read on a hit
+        with self.assertNumQueries(1):
+            self.assertEqual(cached_search_ids('  SMITH '), ids)
+
+    def test_list_pages_from_cache(self):
+        self.client.force_login(User.objects.create_user('staff'))
+        response = self.client.get(reverse('customer_list'), {'search': 'Smith'})
+        self.assertContains(response, '25 customers')
+        cursor = response.context['page_obj'].next_cursor
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('customer_list'), {'search': 'smith', 'cursor': cursor})
+        self.assertEqual(len(response.context['page_obj']), 10)
+
+    def test_any_write_invalidates(self):
+        self.assertEqual(len(cached_search_ids('smith')), 25)
+        # Written without signals, as another process's write looks to this one
+        new = Customer(first_name='New', last_name='Smith', email='new@example.com')
+        new.normalize_contacts()
+        changes.stamp([new])
+        Customer.objects.bulk_create([new])
+        self.assertEqual(cached_search_ids('smith')[0], new.pk)
+
+        Customer.objects.filter(pk=new.pk).delete()
+        self.assertNotIn(new.pk, cached_search_ids('smith'))
+        self.assertNotIn(new.pk, ranked_search_ids('smith')[0])
+
+    def test_oversized_search_is_remembered(self):
+        with mock.patch.object(cache, 'SEARCH_CACHE_MAX_IDS', 3):
+            self.assertIsNone(cached_search_ids('smith'))
+            with self.assertNumQueries(1):
+                self.assertIsNone(cached_search_ids('Smith'))
+
+            ids, complete = ranked_search_ids('smith')
+            self.assertEqual((len(ids), complete), (3, False))
@@ -0,0 +1,127 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from customers import changes
+from customers.bulk_actions import DELETE, SET_FIELDS, run_bulk_action
+from customers.importer import UPSERT, import_customers
+from customers.models import Customer
+
+from .utils import make_customers, make_workbook
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        self.assertEqual(changes.parse_cursor(changes.format_cursor(12, 34)), (12, 34))
+        self.assertEqual(changes.parse_cursor(None), (0, 0))
+
+    def test_malformed(self):
+        for cursor in ['x', '12', '12-', '-3', '1-2-3', '1.5-2']:
+            self.assertIsNone(changes.parse_cursor(cursor), cursor)
+
+
+class IterChangesTests(TestCase):
+    def ops(self, cursor=(0, 0), limit=100):
+        return [(change['op'], change['id']) for change in changes.iter_changes(cursor, ['email'], limit)]
+
+    def test_upserts_and_deletes_in_sequence_order(self):
+        legacy, first, second = make_customers(3)
+        Customer.objects.filter(pk=legacy.pk).update(change_seq=0)
+        first.city = 'Pune'
+        first.save()
+        second_pk = second.pk
+        second.delete()
+
+        self.assertEqual(
+            self.ops(), [('upsert', legacy.pk), ('upsert', first.pk), ('delete', second_pk)],
+        )
+        delete = list(changes.iter_changes((0, 0), ['email'], 100))[-1]
+        self.assertEqual(delete['email'], 'customer2@example.com')
+
+    def test_resume_after_limit(self):
+        customers = make_customers(3)
+        # One write shares its sequence number across every row it touches
+        run_bulk_action(SET_FIELDS, Customer.objects.all(), values={'city': 'Goa'})
+        run_bulk_action(DELETE, Customer.objects.filter(pk=customers[0].pk))
+        everything = list(changes.iter_changes((0, 0), ['email'], 100))
+
+        seen, cursor = [], (0, 0)
+        while True:
+            page = list(changes.iter_changes(cursor, ['email'], 1))
+            seen += page
+            if not page:
+                break
+            cursor = (page[-1]['seq'], page[-1]['id'])
+        self.assertEqual(seen, everything)
+        self.assertEqual(
+            [(change['op'], change['id']) for change in everything],
+            [('upsert', customers[1].pk), ('upsert', customers[2].pk), ('delete', customers[0].pk)],
+        )
+
+    def test_user_delete_reports_orphaned_customers(self):
+        owner = User.objects.create_user('owner')
+        owned = Customer.objects.create(first_name='A', last_name='B', email='a@example.com', created_by=owner)
+        other = Customer.objects.create(first_name='C', last_name='D', email='c@example.com')
+        owner.delete()
+        rows = list(changes.iter_changes((other.change_seq, other.pk), ['created_by'], 100))
+        self.assertEqual([(row['id'], row['data']['created_by']) for row in rows], [(owned.pk, None)])
+
+
+class ChangeFeedViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('staff')
+        self.client.force_login(self.user)
+
+    def feed(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get(reverse('api_customer_changes'), params)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        return lines[:-1], lines[-1]
+
+    def test_fields_and_cursor(self):
+        customer = Customer.objects.create(first_name='A', last_name='B', email='a@example.com', city='Pune')
+        items, tail = self.feed(fields='id,email,city')
+        self.assertEqual(items, [{
+            'op': 'upsert', 'seq': customer.change_seq, 'id': customer.pk,
+            'data': {'id': customer.pk, 'email': 'a@example.com', 'city': 'Pune'},
+        }])
+        self.assertFalse(tail['more'])
+
+        self.assertEqual(self.feed(tail['cursor']), ([], tail))
+
+    def test_every_write_path_appears(self):
+        kept, deleted = make_customers(2)
+        cursor = self.feed()[1]['cursor']
+
+        response = self.client.post(reverse('api_customer_batch'), json.dumps({
+            'create': [{'first_name': 'New', 'last_name': 'Person', 'email': 'new@example.com'}],
+            'update': [{'id': kept.pk, 'city': 'Agra'}],
+            'delete': [deleted.pk],
+        }), content_type='application/json')
+        created = response.json()['created'][0]
+        items, tail = self.feed(cursor)
+        self.assertCountEqual(
+            [(item['op'], item['id']) for item in items],
+            [('upsert', kept.pk), ('delete', deleted.pk), ('upsert', created)],
+        )
+
+        import_customers(
+            make_workbook([['Kept', 'Last', kept.email, '', '', 'Mysore'], ['F', 'G', 'f@example.com', '', '', '']]),
+            self.user, mode=UPSERT,
+        )
+        items, _ = self.feed(tail['cursor'], fields='email')
+        self.assertEqual(
+            sorted(item['data']['email'] for item in items), ['customer0@example.com', 'f@example.com'],
+        )
+
+    def test_bad_requests(self):
+        response = self.client.get(reverse('api_customer_changes'), {'since': 'x'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('api_customer_changes'), {'fields': 'nope'})
+        self.assertEqual(response.status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api_customer_changes')).status_code, 401)
@@ -0,0 +1,132 @@
+import tempfile
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from customers.images import generate_variants
+from customers.models import Customer
+
+from .utils import make_customers
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('staff', first_name='Sam')
+        self.client.force_login(self.user)
+        self.customer = make_customers(1, created_by=self.user)[0]
+
+    def assertRevalidates(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        return response['ETag']
+
+    def test_customer_detail(self):
+        url = reverse('customer_detail', args=[self.customer.pk])
+        etag = self.assertRevalidates(url)
+        self.customer.notes = 'Changed'
+        self.customer.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(reverse('customer_detail', args=[999])).status_code, 404)
+
+    def test_customer_list(self):
+        url = reverse('customer_list')
+        etag = self.assertRevalidates(url)
+        self.assertEqual(self.client.get(url, {'search': 'first'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        other = Customer.objects.create(first_name='Other', last_name='Last', email='other@example.com')
+        etag = self.assertRevalidates(url)
+        other.delete()
+        # A delete leaves max(updated_at) alone, and the list has no Last-Modified to fall back on
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_user_detail(self):
+        url = reverse('user_detail', args=[self.user.pk])
+        etag = self.assertRevalidates(url)
+        make_customers(1, start=1, created_by=self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_is_per_user(self):
+        url = reverse('customer_list')
+        etag = self.assertRevalidates(url)
+        self.client.force_login(User.objects.create_user('other'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_flash_messages_bypass_validation(self):
+        url = reverse('customer_detail', args=[self.customer.pk])
+        etag = self.assertRevalidates(url)
+        # An invalid bulk action leaves an error message for the next page
+        self.client.post(reverse('customer_bulk_action'), {})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertTrue(list(response.context['messages']))
+        # Shown once; the page validates again afterwards
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+def png_upload(name='photo.png'):
+    image = BytesIO()
+    Image.new('RGB', (600, 600), 'blue').save(image, 'PNG')
+    return SimpleUploadedFile(name, image.getvalue())
+
+
+class VariantValidatorTests(TestCase):
+    def setUp(self):
+        # Blobs are named by content, so every test needs its own media root
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = self.settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.user = User.objects.create_user('staff')
+        self.client.force_login(self.user)
+        self.customer = Customer.objects.create(
+            first_name='First', last_name='Last', email='customer@example.com',
+            created_by=self.user, image=png_upload(),
+        )
+
+    def test_no_validators_until_variants_exist(self):
+        for url in (reverse('customer_list'), reverse('customer_detail', args=[self.customer.pk])):
+            response = self.client.get(url)
+            self.assertContains(response, self.customer.image.url)
+            self.assertFalse(response.has_header('ETag'), url)
+            self.assertFalse(response.has_header('Last-Modified'), url)
+
+        generate_variants(self.customer.image.name, self.customer.image.storage)
+        for url in (reverse('customer_list'), reverse('customer_detail', args=[self.customer.pk])):
+            response = self.client.get(url)
+            self.assertNotContains(response, f'src="{self.customer.image.url}"')
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_user_detail(self):
+        profile = self.user.profile
+        profile.profile_image = png_upload('avatar.png')
+        profile.save()
+        url = reverse('user_detail', args=[self.user.pk])
+        self.assertFalse(self.client.get(url).has_header('ETag'))
+        generate_variants(profile.profile_image.name, profile.profile_image.storage)
+        self.assertTrue(self.client.get(url).has_header('ETag'))
+
+    @override_settings(ROOT_URLCONF='customers.tests.async_urls')
+    async def test_async_views(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        url = reverse('customer_detail', args=[self.customer.pk])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        await sync_to_async(generate_variants)(self.customer.image.name, self.customer.image.storage)
+        response = await self.async_client.get(url)
+        self.assertEqual(
+            (await self.async_client.get(url, headers={'If-None-Match': response['ETag']})).status_code, 304,
+        )
@@ -0,0 +1,105 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers import duplicates
+from customers.models import Customer, DuplicateCluster
+from customers.normalization import normalize_name, soundex
+
+
+class NameKeyTests(SimpleTestCase):
+    def test_soundex(self):
+        for name, code in [('Robert', 'R163'), ('Rupert', 'R163'), ('Ashcraft', 'A261'),
+                           ('Tymczak', 'T522'), ('Pfister', 'P236'), ('', '')]:
+            self.assertEqual(soundex(name), code, name)
+
+    def test_name_key_ignores_order_and_spelling(self):
+        self.assertEqual(normalize_name('Meera', 'Sharma'), normalize_name('Sharma', 'Mira'))
+        self.assertEqual(normalize_name('Meera', ''), 'M600')
+
+
+class FindDuplicatesTests(TestCase):
+    def customer(self, first_name, last_name, email, **fields):
+        return Customer.objects.create(first_name=first_name, last_name=last_name, email=email, **fields)
+
+    def test_name_key_kept_on_save(self):
+        customer = self.customer('Meera', 'Sharma', 'meera@example.com')
+        self.assertEqual(customer.name_key, 'M600-S650')
+        customer.last_name = 'Iyer'
+        customer.save(update_fields=['last_name'])
+        customer.refresh_from_db()
+        self.assertEqual(customer.name_key, 'I600-M600')
+
+    def test_pairs_from_each_block_kind(self):
+        meera = self.customer('Meera', 'Sharma', 'meera@example.com', phone='9876500001')
+        mira = self.customer('Mira', 'Sharma', 'meera.s@example.org', phone='+919876500001')
+        acme = self.customer('Ravi', 'Nair', 'ravi@acme.com', company='Acme', city='Pune')
+        acme_again = self.customer('Ravi', 'Nair', 'rnair@acme.com', company='ACME', city='pune')
+        owner = self.customer('Zed', 'Quinn', 'zed@example.com')
+        legacy = self.customer('Zed', 'Quinn', 'other@example.com')
+        Customer.objects.filter(pk=legacy.pk).update(email='ZED@example.com', email_normalized=None)
+        self.customer('Unrelated', 'Person', 'someone@example.com')
+
+        pairs = duplicates.find_duplicate_pairs()
+        self.assertEqual(set(pairs), {
+            (meera.pk, mira.pk), (acme.pk, acme_again.pk), (owner.pk, legacy.pk),
+        })
+        self.assertIn('same phone', pairs[meera.pk, mira.pk][1])
+        self.assertIn('same company and city', pairs[acme.pk, acme_again.pk][1])
+        self.assertIn('same email', pairs[owner.pk, legacy.pk][1])
+
+    def test_pair_scored_in_first_shared_block_only(self):
+        # Same phone, company and city, and name: three blocks, one comparison
+        for i in range(2):
+            self.customer('Meera', 'Sharma', f'meera{i}@example.com', phone='9876500001', company='Acme', city='Pune')
+        progress = []
+        pairs = duplicates.find_duplicate_pairs(progress=lambda *counts: progress.append(counts))
+        self.assertEqual(len(pairs), 1)
+        blocks, compared, matches = progress[-1]
+        self.assertEqual((blocks, compared, matches), (3, 1, 1))
+
+    def test_name_blocks_read_in_key_order(self):
+        self.customer('Meera', 'Sharma', 'meera@example.com')
+        self.customer('Mira', 'Sharma', 'mira@example.com')
+        with CaptureQueriesContext(connection) as queries:
+            list(duplicates.iter_blocks())
+        self.assertTrue(any('ORDER BY "customers_customer"."name_key"' in q['sql'] for q in queries))
+
+    def test_large_block_compares_a_window(self):
+        for i in range(120):
+            self.customer('Rahul', 'Kumar', f'rahul{i}@example.com', company='Infosys', city='Pune')
+        progress = []
+        pairs = duplicates.find_duplicate_pairs(progress=lambda *counts: progress.append(counts))
+        self.assertGreater(len(pairs), 0)
+        self.assertLess(progress[-1][1], 120 * duplicates.WINDOW)
+
+
+class DuplicateReviewTests(TestCase):
+    def setUp(self):
+        self.owner = Customer.objects.create(first_name='Zed', last_name='Quinn', email='zed@example.com')
+        self.legacy = Customer.objects.create(first_name='Zed', last_name='Quinn', email='other@example.com')
+        Customer.objects.filter(pk=self.legacy.pk).update(email='ZED@example.com', email_normalized=None)
+        duplicates.detect_duplicates()
+        self.cluster = DuplicateCluster.objects.get()
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user('clerk'))
+        self.assertEqual(self.client.get(reverse('duplicate_review')).status_code, 302)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertContains(self.client.get(reverse('duplicate_review')), 'Quinn')
+
+    def test_dismissal_survives_rerun(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        response = self.client.post(reverse('duplicate_dismiss', args=[self.cluster.pk]), {'page': '1'})
+        self.assertRedirects(response, reverse('duplicate_review') + '?page=1')
+
+        call_command('find_duplicates', stdout=StringIO())
+        self.assertEqual(
+            list(DuplicateCluster.objects.values_list('status', 'fingerprint')),
+            [(DuplicateCluster.DISMISSED, self.cluster.fingerprint)],
+        )
@@ -0,0 +1,85 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers import facets
+from customers.models import Customer
+
+from .utils import make_customers
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        facets.facet_cache.clear()
+        self.user = User.objects.create_user('staff')
+        self.client.force_login(self.user)
+        make_customers(5, country='India', state='Maharashtra', city='Pune', company='Acme')
+        make_customers(3, start=5, country='India', state='Karnataka', city='Bangalore', company='Infosys')
+        make_customers(1, start=8, country='USA', state='CA', city='SF', company='Acme')
+        make_customers(1, start=9)
+
+    def test_counts(self):
+        counts = facets.facet_counts('', {})
+        self.assertEqual(counts['country'], (('India', 8), ('USA', 1)))
+        self.assertEqual(counts['company'], (('Acme', 6), ('Infosys', 3)))
+
+    def test_selection_narrows_the_other_facets(self):
+        counts = facets.facet_counts('', {'country': 'India'})
+        # A facet's own selection does not narrow it, so the other choices stay visible
+        self.assertEqual(counts['country'], (('India', 8), ('USA', 1)))
+        self.assertEqual(counts['city'], (('Pune', 5), ('Bangalore', 3)))
+        self.assertEqual(counts['company'], (('Acme', 5), ('Infosys', 3)))
+
+    def test_selected_value_without_customers_is_listed(self):
+        self.assertIn(('Nowhere', 0), facets.facet_counts('', {'city': 'Nowhere'})['city'])
+
+    def test_unfiltered_counts_read_the_counters(self):
+        with CaptureQueriesContext(connection) as queries:
+            facets.facet_counts('', {})
+        self.assertFalse(any('GROUP BY' in query['sql'] for query in queries))
+
+    def test_cache_keyed_on_change_version(self):
+        facets.facet_counts('', {'country': 'India'})
+        with self.assertNumQueries(1):
+            facets.facet_counts('', {'country': 'India'})
+        # Any customer write moves the change version
+        Customer.objects.create(first_name='New', last_name='Last', email='new@example.com',
+                                country='India', city='Pune')
+        self.assertEqual(dict(facets.facet_counts('', {'country': 'India'})['city'])['Pune'], 6)
+
+    def test_list_filters(self):
+        response = self.client.get(reverse('customer_list'), {'city': 'Bangalore'})
+        self.assertEqual(len(response.context['page_obj']), 3)
+        self.assertContains(response, 'Pune (5)')
+        self.assertContains(response, 'name="filter_city" value="Bangalore"')
+        self.assertIn('city=Bangalore', response.context['list_query'])
+
+        response = self.client.get(reverse('customer_list'), {'search': 'First1', 'company': 'Acme'})
+        self.assertEqual([c.first_name for c in response.context['page_obj']], ['First1'])
+
+    def test_bulk_action_on_filtered_list(self):
+        response = self.client.post(reverse('customer_bulk_action'), {
+            'action': 'set_fields', 'scope': 'all', 'search': '', 'filter_city': 'Bangalore', 'company': 'Wipro',
+        })
+        self.assertRedirects(response, reverse('customer_list') + '?city=Bangalore')
+        self.assertEqual(Customer.objects.filter(company='Wipro').count(), 3)
+
+    def test_export_filtered(self):
+        response = self.client.get(reverse('export_csv'), {'country': 'USA'})
+        rows = b''.join(response.streaming_content).decode().strip().splitlines()
+        self.assertEqual(len(rows), 2)
+
+    def test_filtered_page_uses_index(self):
+        plan = Customer.objects.filter(city='Pune')[:10].explain()
+        self.assertIn('customer_city_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    @override_settings(ROOT_URLCONF='customers.tests.async_urls')
+    async def test_async_list_filters(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse('customer_list'), {'city': 'Bangalore'})
+        self.assertEqual(len(response.context['page_obj']), 3)
+        self.assertContains(response, 'Pune (5)')
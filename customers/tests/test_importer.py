@@ -0,0 +1,106 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from customers.importer import INSERT, UPSERT, import_customers, validate_row
+from customers.models import Customer
+
+from .utils import make_workbook
+
+
+def import_rows(count):
+    return [[f'First{i}', 'Last', f'row{i}@example.com', '9876543210', '', 'Pune'] for i in range(count)]
+
+
+class InsertImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('importer')
+
+    def test_counts(self):
+        Customer.objects.create(first_name='Taken', last_name='Email', email='taken@example.com')
+        rows = import_rows(8)
+        rows[2][0] = ''                       # skipped: no first name
+        rows[4][2] = 'Taken@Example.com'      # already a customer
+        rows[7][2] = 'row0@example.com'       # repeats the first row
+        result = import_customers(make_workbook(rows), self.user, mode=INSERT, chunk_size=3, processes=1)
+
+        self.assertEqual((result.created, result.failed, result.skipped), (5, 2, 1))
+        self.assertEqual(result.processed, 8)
+        self.assertEqual(result.chunks, 3)
+        self.assertEqual(Customer.objects.filter(email__startswith='row').count(), 5)
+        customer = Customer.objects.get(email='row0@example.com')
+        self.assertEqual((customer.created_by, customer.phone, customer.city), (self.user, '9876543210', 'Pune'))
+
+    def test_progress_per_chunk(self):
+        processed = []
+        import_customers(
+            make_workbook(import_rows(7)), self.user, chunk_size=3, processes=1,
+            progress=lambda result: processed.append(result.processed),
+        )
+        self.assertEqual(processed, [3, 6, 7])
+
+
+class UpsertImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('importer')
+
+    def test_counts(self):
+        Customer.objects.create(first_name='Old', last_name='Last', email='row0@example.com')
+        Customer.objects.create(
+            first_name='First1', last_name='Last', email='row1@example.com', phone='9876543210', city='Pune',
+        )
+        rows = import_rows(4)
+        # Matched on the normalized email
+        rows[0][2] = 'ROW0@Example.com'
+        result = import_customers(make_workbook(rows), self.user, mode=UPSERT, processes=1)
+
+        self.assertEqual((result.created, result.updated, result.unchanged, result.failed), (2, 1, 1, 0))
+        self.assertEqual(Customer.objects.get(email_normalized='row0@example.com').first_name, 'First0')
+        self.assertEqual(Customer.objects.count(), 4)
+
+    def test_unchanged_rows_are_not_written(self):
+        customer = Customer.objects.create(
+            first_name='First0', last_name='Last', email='row0@example.com', phone='9876543210', city='Pune',
+        )
+        import_customers(make_workbook(import_rows(1)), self.user, mode=UPSERT, processes=1)
+        self.assertEqual(Customer.objects.get().updated_at, customer.updated_at)
+
+
+class FailedRowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('importer')
+
+    def rows_failing(self, count, bad):
+        rows = import_rows(count)
+        for row_num in bad:
+            # Row 1 is the header
+            rows[row_num - 2][2] = 'not-an-email'
+        return make_workbook(rows)
+
+    def test_validate_row(self):
+        data = dict.fromkeys(['address', 'city', 'state', 'country', 'postal_code', 'company', 'notes'], '')
+        data.update(first_name='x' * 101, last_name='Last', email='nope', phone='123')
+        self.assertEqual(set(validate_row(data)), {'first_name', 'email', 'phone'})
+
+    def test_ranges(self):
+        result = import_customers(self.rows_failing(9, {3, 5, 6, 9}), self.user, chunk_size=3, processes=1)
+        self.assertEqual(result.failed_rows, '3, 5-6, 9')
+        self.assertEqual(result.failed, 4)
+        self.assertTrue(result.errors[0].startswith('Row 3: email: '))
+
+    def test_range_across_chunks(self):
+        result = import_customers(self.rows_failing(9, {3, 7, 8, 9}), self.user, chunk_size=3, processes=1)
+        self.assertEqual(result.failed_rows, '3, 7-9')
+
+    def test_pool_matches_inline(self):
+        bad = {5, 6, 7, 25, 39}
+        inline = import_customers(self.rows_failing(40, bad), self.user, chunk_size=8, processes=1)
+        Customer.objects.all().delete()
+        pooled = import_customers(self.rows_failing(40, bad), self.user, chunk_size=8, processes=2)
+
+        self.assertEqual((pooled.created, pooled.failed), (inline.created, inline.failed))
+        self.assertEqual(pooled.failed_rows, inline.failed_rows)
+        self.assertEqual(pooled.failed_rows, '5-7, 25, 39')
+        self.assertEqual(pooled.errors, inline.errors)
+        # Rows are inserted in file order
+        emails = Customer.objects.order_by('id').values_list('email', flat=True)
+        self.assertEqual(list(emails[:5]), [f'row{i}@example.com' for i in range(40) if i + 2 not in bad][:5])
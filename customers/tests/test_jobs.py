@@ -0,0 +1,77 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from customers.jobs import claim_next_job, requeue_stale_jobs
+from customers.models import Customer, ImportJob
+
+from .utils import make_workbook
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImportJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('importer')
+
+    def make_job(self, **fields):
+        return ImportJob.objects.create(file='imports/rows.xlsx', created_by=self.user, **fields)
+
+    def test_claimed_once(self):
+        first, second = self.make_job(), self.make_job()
+        self.assertEqual(claim_next_job('a').pk, first.pk)
+        self.assertEqual(claim_next_job('b').pk, second.pk)
+        self.assertIsNone(claim_next_job('c'))
+        self.assertEqual(
+            list(ImportJob.objects.order_by('pk').values_list('state', 'worker')),
+            [(ImportJob.RUNNING, 'a'), (ImportJob.RUNNING, 'b')],
+        )
+
+    def test_claim_race(self):
+        first, second = self.make_job(), self.make_job()
+        raced = []
+
+        def other_worker_claims(execute, sql, params, many, context):
+            # Another worker claims the oldest job between our SELECT and UPDATE
+            rows = execute(sql, params, many, context)
+            if sql.startswith('SELECT') and not raced:
+                raced.append(True)
+                ImportJob.objects.filter(pk=first.pk).update(state=ImportJob.RUNNING, worker='other')
+            return rows
+
+        with connection.execute_wrapper(other_worker_claims):
+            job = claim_next_job('me')
+        self.assertEqual(job.pk, second.pk)
+        first.refresh_from_db()
+        self.assertEqual(first.worker, 'other')
+
+    def test_requeue_stale_jobs(self):
+        stale = self.make_job(state=ImportJob.RUNNING, worker='gone', rows_processed=10, rows_per_second=5)
+        ImportJob.objects.filter(pk=stale.pk).update(started_at=timezone.now() - timedelta(hours=2))
+        fresh = self.make_job(state=ImportJob.RUNNING, worker='busy', started_at=timezone.now())
+        self.assertEqual(requeue_stale_jobs(timedelta(hours=1)), 1)
+        stale.refresh_from_db()
+        self.assertEqual((stale.state, stale.worker, stale.rows_processed, stale.rows_per_second), (ImportJob.PENDING, '', 0, 0))
+        self.assertEqual(ImportJob.objects.get(pk=fresh.pk).state, ImportJob.RUNNING)
+
+    def test_upload_runs_in_worker(self):
+        self.client.force_login(self.user)
+        rows = [[f'First{i}', 'Last', f'row{i}@example.com', '9876543210', '', 'Pune'] for i in range(5)]
+        upload = SimpleUploadedFile('rows.xlsx', make_workbook(rows).read())
+        response = self.client.post(reverse('bulk_upload'), {'mode': 'insert', 'excel_file': upload})
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, f"{reverse('bulk_upload')}?job={job.pk}")
+        self.assertEqual(Customer.objects.count(), 0)
+
+        call_command('run_import_worker', '--once', stdout=StringIO())
+        status = self.client.get(reverse('import_job_status', args=[job.pk])).json()
+        self.assertEqual((status['state'], status['rows_created']), (ImportJob.DONE, 5))
+        self.assertGreater(status['rows_per_second'], 0)
+        self.assertEqual(Customer.objects.count(), 5)
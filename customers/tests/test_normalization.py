@@ -0,0 +1,81 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from customers.forms import CustomerForm
+from customers.models import Customer
+from customers.normalization import is_email, is_phone, normalize_email, normalize_phone
+from customers.search import search_customers
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_phone_forms(self):
+        for raw in ['9876543210', '+919876543210', '+91 98765 43210', '09876543210',
+                    '919876543210', '0091 9876543210', '98765-43210']:
+            self.assertEqual(normalize_phone(raw), '+919876543210', raw)
+        self.assertEqual(normalize_phone('+44 20 7946 0958'), '+442079460958')
+
+    def test_not_a_phone(self):
+        for raw in ['', None, '12345', 'call me']:
+            self.assertEqual(normalize_phone(raw), '', raw)
+        self.assertFalse(is_phone('98765 abc'))
+        self.assertTrue(is_phone('(98765) 43210'))
+
+    def test_email(self):
+        self.assertEqual(normalize_email('  Ann@Example.COM '), 'ann@example.com')
+        self.assertEqual(normalize_email(None), '')
+        self.assertTrue(is_email('ann@example.com'))
+        self.assertFalse(is_email('ann'))
+
+
+class ContactKeyTests(TestCase):
+    def setUp(self):
+        self.ann = Customer.objects.create(
+            first_name='Ann', last_name='Lee', email='Ann@Example.com', phone='+919876543210'
+        )
+        Customer.objects.create(first_name='Bob', last_name='Ray', email='bob@example.com', phone='9123456789')
+
+    def test_keys_kept_on_save(self):
+        self.assertEqual(
+            (self.ann.email_normalized, self.ann.phone_normalized), ('ann@example.com', '+919876543210')
+        )
+        self.ann.phone = '9000000000'
+        self.ann.save(update_fields=['phone'])
+        self.ann.refresh_from_db()
+        self.assertEqual(self.ann.phone_normalized, '+919000000000')
+
+    def test_exact_contact_search(self):
+        self.assertEqual(list(search_customers('98765 43210')), [self.ann])
+        self.assertEqual(list(search_customers('ANN@example.com')), [self.ann])
+        self.assertEqual(list(search_customers('Ann')), [self.ann])
+
+    def test_phone_search_uses_index(self):
+        sql, params = search_customers('9876543210').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('phone_normalized', plan)
+
+    def test_form_email_unique_ignoring_case(self):
+        data = {'first_name': 'Other', 'last_name': 'Person', 'email': 'ANN@example.com'}
+        form = CustomerForm(data)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['email'], ['Customer with this Email already exists.'])
+        self.assertTrue(CustomerForm(data, instance=self.ann).is_valid())
+
+    def test_api_email_unique_ignoring_case(self):
+        self.client.force_login(User.objects.create_user('staff'))
+        url = reverse('api_customer_batch')
+
+        def create(**fields):
+            body = {'create': [{'first_name': 'New', 'last_name': 'Person', **fields}]}
+            return self.client.post(url, json.dumps(body), content_type='application/json')
+
+        self.assertEqual(create(email='ANN@EXAMPLE.COM').status_code, 400)
+        self.assertEqual(create(email='New@Example.com', phone='9876500000').status_code, 200)
+        self.assertEqual(
+            Customer.objects.get(email_normalized='new@example.com').phone_normalized, '+919876500000'
+        )
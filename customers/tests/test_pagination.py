@@ -0,0 +1,74 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from customers import pagination
+from customers.models import Customer
+from customers.pagination import AT_LEAST, EXACT, approximate_count, keyset_page
+
+from .utils import make_customers
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        # Shared timestamps, so the id tiebreak has to hold the order
+        created_at = timezone.now()
+        for i, customer in enumerate(make_customers(25)):
+            Customer.objects.filter(pk=customer.pk).update(created_at=created_at - timedelta(minutes=i // 4))
+        self.expected = list(Customer.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def test_walks_forward_and_back(self):
+        pages = [keyset_page(Customer.objects.all(), None, per_page=10)]
+        while pages[-1].has_next:
+            pages.append(keyset_page(Customer.objects.all(), pages[-1].next_cursor, per_page=10))
+        self.assertEqual([customer.pk for page in pages for customer in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertFalse(pages[0].has_previous)
+
+        back = keyset_page(Customer.objects.all(), pages[-1].previous_cursor, per_page=10)
+        self.assertEqual([customer.pk for customer in back], self.expected[10:20])
+        self.assertTrue(back.has_next)
+        self.assertTrue(back.has_previous)
+        back = keyset_page(Customer.objects.all(), back.previous_cursor, per_page=10)
+        self.assertEqual([customer.pk for customer in back], self.expected[:10])
+        self.assertFalse(back.has_previous)
+
+    def test_bad_cursor_starts_over(self):
+        page = keyset_page(Customer.objects.all(), 'not-a-cursor', per_page=10)
+        self.assertEqual([customer.pk for customer in page], self.expected[:10])
+
+    def test_approximate_count(self):
+        self.assertEqual(approximate_count(Customer.objects.all(), limit=20), (20, AT_LEAST))
+        self.assertEqual(approximate_count(Customer.objects.all()), (25, EXACT))
+
+    def test_customer_list(self):
+        self.client.force_login(User.objects.create_user('staff'))
+        first = self.client.get(reverse('customer_list'))
+        response = self.client.get(reverse('customer_list'), {'cursor': first.context['page_obj'].next_cursor})
+        self.assertEqual([customer.pk for customer in response.context['page_obj']], self.expected[10:20])
+        self.assertContains(response, 'Previous')
+        self.assertContains(response, '25 customers')
+
+
+class CountLabelTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('staff'))
+        make_customers(3)
+
+    def test_planner_estimate_is_labelled(self):
+        with mock.patch.object(pagination.connection, 'vendor', 'postgresql'), \
+                mock.patch.object(pagination, '_planner_estimate', return_value=1234):
+            response = self.client.get(reverse('customer_list'))
+        self.assertContains(response, 'About 1234 customers')
+        self.assertContains(response, 'All about 1234')
+
+    def test_capped_count_is_labelled(self):
+        with mock.patch('customers.views.approximate_count', lambda queryset: approximate_count(queryset, limit=2)):
+            response = self.client.get(reverse('customer_list'))
+        self.assertEqual(response.context['total_accuracy'], AT_LEAST)
+        self.assertContains(response, 'More than 2 customers')
+        self.assertContains(response, 'All 2+')
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from crm_system.profiling import recent_profiles
+from crm_system.testing import query_budget
+from customers.cache import search_result_cache
+
+from .utils import make_customers
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        search_result_cache.clear()
+        self.user = User.objects.create_user('staff', password='password', first_name='Sam')
+        self.client.force_login(self.user)
+
+    def test_customer_detail(self):
+        customer = make_customers(1, created_by=self.user)[0]
+        with query_budget(5):
+            response = self.client.get(reverse('customer_detail', args=[customer.pk]))
+        self.assertContains(response, customer.email)
+
+    def test_customer_list_does_not_grow_with_rows(self):
+        make_customers(3, created_by=self.user)
+        with query_budget(11):
+            self.client.get(reverse('customer_list'))
+
+        make_customers(30, start=3, created_by=self.user, city='Pune')
+        with query_budget(11):
+            response = self.client.get(reverse('customer_list'))
+        self.assertEqual(len(response.context['page_obj'].object_list), 10)
+
+    def test_budget_reports_queries(self):
+        with self.assertRaisesMessage(AssertionError, '2 queries executed, budget is 1.'):
+            with query_budget(1):
+                list(User.objects.all())
+                list(User.objects.all())
+
+
+@override_settings(
+    MIDDLEWARE=['crm_system.profiling.RequestProfilerMiddleware'] + settings.MIDDLEWARE,
+    REQUEST_PROFILING=True,
+)
+class RequestProfilerTests(TestCase):
+    def test_profile_is_reported_and_logged(self):
+        staff = User.objects.create_user('staff', is_staff=True)
+        self.client.force_login(staff)
+        customer = make_customers(1)[0]
+        response = self.client.get(reverse('customer_detail', args=[customer.pk]))
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        response = self.client.get(reverse('profiling_log'))
+        self.assertContains(response, reverse('customer_detail', args=[customer.pk]))
+        self.assertGreater(recent_profiles()[1]['template_ms'], 0)
+
+    def test_log_is_staff_only(self):
+        self.client.force_login(User.objects.create_user('clerk'))
+        self.assertEqual(self.client.get(reverse('profiling_log')).status_code, 302)
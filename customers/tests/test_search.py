@@ -0,0 +1,97 @@
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from customers.cache import search_result_cache
+from customers.models import Customer
+from customers.search import SQLITE_TRIGGERS, search_customers
+
+
+def found(search_query, **kwargs):
+    return list(search_customers(search_query, **kwargs).values_list('first_name', flat=True))
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.john = Customer.objects.create(
+            first_name='John', last_name='Doe', email='john@example.com', phone='9876543210', company='Abc Corp',
+        )
+        Customer.objects.create(first_name='Jane', last_name='Johnson', email='jane@example.org', company='Xyz')
+
+    def test_prefix_match(self):
+        self.assertCountEqual(found('jo'), ['John', 'Jane'])
+        self.assertEqual(found('JOHN DO'), ['John'])
+        self.assertEqual(found('98765'), ['John'])
+        self.assertEqual(found('corp'), ['John'])
+        self.assertEqual(found('ohn'), [])
+        self.assertEqual(found('@@'), [])
+
+    def test_triggers_follow_writes(self):
+        self.john.company = 'Zeta'
+        self.john.save()
+        self.assertEqual(found('abc'), [])
+        self.assertEqual(found('zeta'), ['John'])
+        self.john.delete()
+        self.assertEqual(found('zeta'), [])
+
+        # bulk writes skip signals but not triggers
+        Customer.objects.filter(first_name='Jane').update(last_name='Smith')
+        self.assertEqual(found('smith'), ['Jane'])
+
+    def test_ranking(self):
+        Customer.objects.create(first_name='Anna', last_name='Smith', email='anna@example.com', company='Smith Co')
+        Customer.objects.create(first_name='Ben', last_name='Other', email='ben@example.com', company='Smith Co')
+        self.assertEqual(found('smith'), ['Ben', 'Anna'])
+        self.assertEqual(found('smith', ranked=True), ['Anna', 'Ben'])
+
+    def test_index_restored_after_migrate(self):
+        # What SQLite does to the triggers when a migration rebuilds the table
+        with connection.cursor() as cursor:
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {name}')
+        Customer.objects.create(first_name='Missed', last_name='Write', email='missed@example.com')
+        self.assertEqual(found('missed'), [])
+
+        call_command('migrate', verbosity=0)
+        self.assertEqual(found('missed'), ['Missed'])
+        Customer.objects.create(first_name='Later', last_name='Write', email='later@example.com')
+        self.assertEqual(found('later'), ['Later'])
+
+
+class RelevanceSortTests(TestCase):
+    def setUp(self):
+        search_result_cache.clear()
+        self.client.force_login(User.objects.create_user('staff'))
+        # Newest first puts the best match last
+        self.best = Customer.objects.create(
+            first_name='Anna', last_name='Smith', email='anna@example.com', company='Smith Co',
+        )
+        for i in range(12):
+            Customer.objects.create(
+                first_name=f'First{i}', last_name='Other', email=f'customer{i}@example.com', company='Smith Co',
+                city='Pune' if i % 2 else '',
+            )
+
+    def test_customer_list(self):
+        url = reverse('customer_list')
+        response = self.client.get(url, {'search': 'smith'})
+        self.assertNotEqual(response.context['page_obj'].object_list[0], self.best)
+
+        response = self.client.get(url, {'search': 'smith', 'sort': 'relevance'})
+        page = response.context['page_obj']
+        self.assertEqual(page.object_list[0], self.best)
+        self.assertIn('sort=relevance', response.context['list_query'])
+        response = self.client.get(url, {'search': 'smith', 'sort': 'relevance', 'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['page_obj'].object_list), 3)
+
+        response = self.client.get(url, {'search': 'smith', 'sort': 'relevance', 'city': 'Pune'})
+        self.assertEqual(len(response.context['page_obj'].object_list), 6)
+
+    def test_api(self):
+        params = {'search': 'smith', 'sort': 'relevance', 'fields': 'id', 'limit': 5}
+        data = self.client.get('/api/customers/', params).json()
+        self.assertEqual(data['results'][0]['id'], self.best.pk)
+        data = self.client.get('/api/customers/', {**params, 'cursor': data['next']}).json()
+        self.assertEqual(len(data['results']), 5)
@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from customers.management.commands.benchmark import SCENARIOS
+from customers.models import Customer
+from customers.seeding import SEED_DOMAIN, clear_seeded_data, seed_customers, seed_users
+from customers.stats import rebuild_stats
+
+from .utils import make_customers, stat_rows
+
+
+def seeded_rows():
+    return list(
+        Customer.objects.filter(email__endswith=f'@{SEED_DOMAIN}')
+        .order_by('email').values_list('first_name', 'last_name', 'email', 'city', 'company')
+    )
+
+
+class SeedingTests(TestCase):
+    def test_same_seed_same_rows(self):
+        seed_customers(50, seed=1, creators=seed_users(3, seed=1))
+        first = seeded_rows()
+        self.assertEqual(len(first), 50)
+        clear_seeded_data()
+        seed_customers(50, seed=1, creators=seed_users(3, seed=1))
+        self.assertEqual(seeded_rows(), first)
+
+    def test_clear_keeps_counters_without_a_rebuild(self):
+        kept = make_customers(2)
+        seed_customers(300, seed=0, creators=seed_users(3, seed=0))
+        with CaptureQueriesContext(connection) as captured:
+            customers, _ = clear_seeded_data()
+        self.assertEqual(customers, 300)
+        # Per distinct key and per batch, not per row
+        self.assertLess(len(captured), 150)
+        self.assertEqual(list(Customer.objects.order_by('pk')), kept)
+
+        incremental = stat_rows()
+        rebuild_stats()
+        self.assertEqual(incremental, stat_rows())
+
+
+class BenchmarkSmokeTests(SimpleTestCase):
+    def test_benchmark_runs(self):
+        # The command sets up its own test database, so it runs in a fresh process
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'benchmark.json')
+            subprocess.run(
+                [sys.executable, 'manage.py', 'benchmark', '--sizes', '100', '--repeat', '1', '--output', output],
+                cwd=settings.BASE_DIR, check=True, capture_output=True,
+            )
+            with open(output) as results:
+                results = json.load(results)
+        self.assertEqual(sorted(results['100']), sorted(SCENARIOS))
+        for row in results['100'].values():
+            self.assertGreater(row['queries'], 0)
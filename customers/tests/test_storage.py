@@ -0,0 +1,95 @@
+import os
+import tempfile
+import time
+from io import BytesIO, StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from customers.models import Customer
+from customers.storage import BLOB_DIR, ContentAddressedStorage
+
+
+def png_bytes(color='blue'):
+    image = BytesIO()
+    Image.new('RGB', (20, 20), color).save(image, 'PNG')
+    return image.getvalue()
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.storage = ContentAddressedStorage(location=self.directory.name)
+
+    def age(self, name):
+        os.utime(self.storage.path(name), (1, 1))
+
+    def test_identical_content_shares_a_blob(self):
+        name = self.storage.save('customer_images/a.PNG', ContentFile(b'same bytes'))
+        self.assertTrue(name.startswith(f'{BLOB_DIR}/'))
+        self.assertTrue(name.endswith('.png'))
+        self.assertEqual(self.storage.save('profile_images/b.png', ContentFile(b'same bytes')), name)
+        self.assertNotEqual(self.storage.save('c.png', ContentFile(b'other bytes')), name)
+        self.assertEqual(len(os.listdir(os.path.dirname(self.storage.path(name)))), 1)
+
+    def test_dedup_refreshes_mtime(self):
+        name = self.storage.save('a.png', ContentFile(b'abc'))
+        self.age(name)
+        self.storage.save('b.png', ContentFile(b'abc'))
+        self.assertGreater(os.path.getmtime(self.storage.path(name)), time.time() - 60)
+
+    def test_losing_the_exists_race(self):
+        name = self.storage.save('a.png', ContentFile(b'abc'))
+        self.age(name)
+        # Another request wrote the blob between exists() and open()
+        self.storage.exists = lambda name: False
+        self.assertEqual(self.storage.save('b.png', ContentFile(b'abc')), name)
+        self.assertGreater(os.path.getmtime(self.storage.path(name)), time.time() - 60)
+        with open(self.storage.path(name), 'rb') as blob:
+            self.assertEqual(blob.read(), b'abc')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MediaGarbageTests(TestCase):
+    def test_unreferenced_blobs_are_collected(self):
+        user = User.objects.create_user('owner')
+        customer = Customer.objects.create(
+            first_name='First', last_name='Last', email='customer@example.com',
+            image=SimpleUploadedFile('photo.png', png_bytes()),
+        )
+        profile = user.profile
+        profile.profile_image = SimpleUploadedFile('avatar.png', png_bytes())
+        profile.save()
+        self.assertEqual(customer.image.name, profile.profile_image.name)
+        kept = Customer.objects.create(
+            first_name='Other', last_name='Last', email='other@example.com',
+            image=SimpleUploadedFile('other.png', png_bytes('red')),
+        )
+
+        customer.delete()
+        call_command('collect_media_garbage', '--grace-hours', '0', stdout=StringIO())
+        # Still the profile's image
+        self.assertTrue(profile.profile_image.storage.exists(profile.profile_image.name))
+
+        profile.profile_image = None
+        profile.save()
+        call_command('collect_media_garbage', '--dry-run', '--grace-hours', '0', stdout=StringIO())
+        self.assertTrue(kept.image.storage.exists(customer.image.name))
+        call_command('collect_media_garbage', '--grace-hours', '0', stdout=StringIO())
+        self.assertFalse(kept.image.storage.exists(customer.image.name))
+        self.assertTrue(kept.image.storage.exists(kept.image.name))
+
+    def test_grace_period_keeps_new_blobs(self):
+        customer = Customer.objects.create(
+            first_name='First', last_name='Last', email='customer@example.com',
+            image=SimpleUploadedFile('photo.png', png_bytes()),
+        )
+        name = customer.image.name
+        customer.delete()
+        call_command('collect_media_garbage', stdout=StringIO())
+        self.assertTrue(customer.image.storage.exists(name))
@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from crm_system.testing import query_budget
+from customers.models import UserProfile
+
+from .utils import make_customers
+
+
+class UserDirectoryTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin)
+        self.users = [User.objects.create_user(f'user{i}', f'user{i}@example.com') for i in range(60)]
+        make_customers(5, created_by=self.users[0])
+
+    def test_profiles_are_created_with_users(self):
+        self.assertEqual(UserProfile.objects.count(), 61)
+
+    def test_pages_with_a_keyset_cursor(self):
+        # Session, user and one query for the page, whatever its size
+        with query_budget(3):
+            response = self.client.get(reverse('user_list'))
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 25)
+        seen = [user.pk for user in page]
+        while page.has_next:
+            page = self.client.get(reverse('user_list'), {'cursor': page.next_cursor}).context['page_obj']
+            seen += [user.pk for user in page]
+        self.assertEqual(len(seen), 61)
+        self.assertEqual(len(set(seen)), 61)
+
+        page = self.client.get(reverse('user_list'), {'cursor': page.previous_cursor}).context['page_obj']
+        self.assertEqual(len(page), 25)
+
+    def test_customer_counts_and_search(self):
+        response = self.client.get(reverse('user_list'), {'search': 'user0@'})
+        users = list(response.context['page_obj'])
+        self.assertEqual([user.username for user in users], ['user0'])
+        self.assertEqual(users[0].customer_count, 5)
+        self.assertContains(response, '<td>5</td>')
+
+    def test_pages_never_write_a_profile(self):
+        user = self.users[1]
+        UserProfile.objects.filter(user=user).delete()
+        self.assertEqual(self.client.get(reverse('user_detail', args=[user.pk])).status_code, 200)
+        self.client.force_login(user)
+        self.client.get(reverse('edit_profile'))
+        self.assertFalse(UserProfile.objects.filter(user=user).exists())
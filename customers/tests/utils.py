@@ -0,0 +1,30 @@
+from io import BytesIO
+
+import openpyxl
+
+from customers.models import Customer, DashboardStat
+
+
+def make_customers(count, start=0, **fields):
+    return [
+        Customer.objects.create(
+            first_name=f'First{i}', last_name='Last', email=f'customer{i}@example.com', **fields
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def make_workbook(rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['First Name', 'Last Name', 'Email', 'Phone', 'Address', 'City'])
+    for row in rows:
+        ws.append(row)
+    workbook = BytesIO()
+    wb.save(workbook)
+    workbook.seek(0)
+    return workbook
+
+
+def stat_rows():
+    return sorted(DashboardStat.objects.filter(count__gt=0).values_list('dimension', 'key', 'count'))
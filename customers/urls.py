@@ -1,28 +1,47 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, async_views, views
+
+# Under ASGI the read-heavy pages and login/logout are served by their async versions
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     # Dashboard
-    path('', views.dashboard, name='dashboard'),
+    path('', read_views.dashboard, name='dashboard'),
     
     # Customer URLs
-    path('customers/', views.customer_list, name='customer_list'),
+    path('customers/', read_views.customer_list, name='customer_list'),
     path('customers/add/', views.customer_add, name='customer_add'),
     path('customers/<int:pk>/edit/', views.customer_edit, name='customer_edit'),
-    path('customers/<int:pk>/', views.customer_detail, name='customer_detail'),
+    path('customers/<int:pk>/', read_views.customer_detail, name='customer_detail'),
     path('customers/<int:pk>/delete/', views.customer_delete, name='customer_delete'),
+    path('customers/bulk-action/', views.customer_bulk_action, name='customer_bulk_action'),
     path('customers/bulk-upload/', views.bulk_upload, name='bulk_upload'),
+    path('customers/import-jobs/<int:pk>/', views.import_job_status, name='import_job_status'),
     path('customers/download-sample/', views.download_sample_excel, name='download_sample_excel'),
     path('customers/export-pdf/', views.export_pdf, name='export_pdf'),
+    path('customers/export-csv/', views.export_csv, name='export_csv'),
+    path('customers/export-xlsx/', views.export_xlsx, name='export_xlsx'),
+    
+    # JSON API
+    path('api/customers/', api.customer_collection, name='api_customer_collection'),
+    path('api/customers/batch/', api.customer_batch, name='api_customer_batch'),
+    path('api/customers/changes/', api.customer_changes, name='api_customer_changes'),
+    path('api/customers/<int:pk>/', api.customer_item, name='api_customer_item'),
     
     # User URLs
-    path('users/', views.user_list, name='user_list'),
+    path('users/', read_views.user_list, name='user_list'),
     path('users/add/', views.user_add, name='user_add'),
     path('users/<int:pk>/edit/', views.user_edit, name='user_edit'),
     path('users/<int:pk>/', views.user_detail, name='user_detail'),
     
+    # Diagnostics
+    path('profiling/', views.profiling_log, name='profiling_log'),
+    path('duplicates/', views.duplicate_review, name='duplicate_review'),
+    path('duplicates/<int:pk>/dismiss/', views.duplicate_dismiss, name='duplicate_dismiss'),
+    
     # Profile & Authentication
     path('profile/edit/', views.edit_profile, name='edit_profile'),
-    path('login/', views.login_view, name='login'),
-    path('logout/', views.logout_view, name='logout'),
+    path('login/', read_views.login_view, name='login'),
+    path('logout/', read_views.logout_view, name='logout'),
 ]
\ No newline at end of file
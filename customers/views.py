@@ -1,63 +1,86 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import HttpResponse, FileResponse
-from django.db.models import Q
-from django.core.paginator import Paginator
-from .models import Customer, UserProfile
-from .forms import CustomerForm, BulkUploadForm, UserRegistrationForm, UserEditForm, UserProfileForm
-import openpyxl
-from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
+from django.http import FileResponse, JsonResponse
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.conf import settings
+from django.db.models import Count, Max, Prefetch
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from django.views.static import serve
+from crm_system.profiling import recent_profiles
+from .models import ArtifactCacheStat, Customer, DuplicateCluster, UserProfile, ImportJob
+from .forms import CustomerForm, BulkUploadForm, BulkActionForm, UserRegistrationForm, UserEditForm, UserProfileForm
+from .bulk_actions import DELETE, run_bulk_action
+from .artifacts import artifact_cache, data_version
+from .cache import RELEVANCE, cached_search_ids, change_version, normalize_query, ranked_search_ids
+from .conditional import (
+    customer_etag, customer_last_modified, customer_list_etag, drop_validators_on_variant_fallback, user_etag,
+)
+from .facets import facet_context, facet_counts, filter_customers, list_query, selected_facets
+from .exports import (
+    EXPORT_VERSION, SAMPLE_VERSION, XLSX_CONTENT_TYPE,
+    build_customer_pdf, build_customer_xlsx, build_sample_xlsx, iter_customer_csv,
+)
+from .jobs import enqueue_import
+from .pagination import AT_LEAST, EXACT, approximate_count, id_list_page, keyset_page
+from .search import search_customers, search_users
+from .stats import get_dashboard_stats
+from .streaming import stream_response
 from datetime import datetime
-from openpyxl.styles import Font, PatternFill
+
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
 
 
 # Dashboard View
 @login_required(login_url='login')
 def dashboard(request):
-    total_customers = Customer.objects.count()
-    total_users = User.objects.count()
-    recent_customers = Customer.objects.all()[:5]
-    
-    context = {
-        'total_customers': total_customers,
-        'total_users': total_users,
-        'recent_customers': recent_customers,
-    }
+    context = get_dashboard_stats()
+    context['recent_customers'] = Customer.objects.all()[:5]
     return render(request, 'customers/dashboard.html', context)
 
 
 # Customer List View
 @login_required(login_url='login')
+@cache_control(private=True, no_cache=True)
+@drop_validators_on_variant_fallback
+@condition(etag_func=customer_list_etag)
 def customer_list(request):
     search_query = request.GET.get('search', '')
+    cursor = request.GET.get('cursor')
+    selected = selected_facets(request.GET)
+    sort = RELEVANCE if search_query and request.GET.get('sort') == RELEVANCE else ''
+    # Read once: the search and facet caches are both keyed on it
+    version = change_version()
     
-    if search_query:
-        customers = Customer.objects.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(phone__icontains=search_query) |
-            Q(company__icontains=search_query)
-        )
+    ids = cached_search_ids(search_query, version) if search_query and not selected and not sort else None
+    if sort:
+        ids, complete = ranked_search_ids(search_query, selected, version)
+        page_obj = id_list_page(Customer.objects.all(), ids, cursor, per_page=10)
+        total_count, total_accuracy = len(ids), EXACT if complete else AT_LEAST
+    elif ids is not None:
+        page_obj = id_list_page(Customer.objects.all(), ids, cursor, per_page=10)
+        total_count, total_accuracy = len(ids), EXACT
     else:
-        customers = Customer.objects.all()
-    
-    paginator = Paginator(customers, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        customers = filter_customers(search_customers(search_query), selected)
+        page_obj = keyset_page(customers, cursor, per_page=10)
+        total_count, total_accuracy = approximate_count(customers)
     
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
+        'facets': facet_context(selected, facet_counts(search_query, selected, version)),
+        'selected_facets': selected,
+        'sort': sort,
+        'list_query': list_query(search_query, selected, sort),
+        'total_count': total_count,
+        'total_accuracy': total_accuracy,
     }
     return render(request, 'customers/customer_list.html', context)
 
@@ -100,8 +123,11 @@ def customer_edit(request, pk):
 
 # Customer Detail View
 @login_required(login_url='login')
+@cache_control(private=True, no_cache=True)
+@drop_validators_on_variant_fallback
+@condition(etag_func=customer_etag, last_modified_func=customer_last_modified)
 def customer_detail(request, pk):
-    customer = get_object_or_404(Customer, pk=pk)
+    customer = get_object_or_404(Customer.objects.select_related('created_by'), pk=pk)
     context = {'customer': customer}
     return render(request, 'customers/customer_detail.html', context)
 
@@ -120,196 +146,206 @@ def customer_delete(request, pk):
     return render(request, 'customers/customer_confirm_delete.html', context)
 
 
+# Customer Bulk Action View
+@login_required(login_url='login')
+@require_POST
+def customer_bulk_action(request):
+    form = BulkActionForm(request.POST)
+    search_query = request.POST.get('search', '')
+    # The list's facet filters come along as filter_<field>, apart from the set_fields inputs
+    selected = selected_facets(request.POST, prefix='filter_')
+    list_url = reverse('customer_list')
+    query = list_query(search_query, selected)
+    if query:
+        list_url += '?' + query
+    
+    if not form.is_valid():
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, error)
+        return redirect(list_url)
+    
+    data = form.cleaned_data
+    if data['scope'] == 'all':
+        customers = filter_customers(search_customers(data['search']), selected)
+    else:
+        customers = Customer.objects.filter(pk__in=data['selected'])
+    count = run_bulk_action(data['action'], customers, owner=data.get('owner'), values=data.get('values'))
+    
+    verb = 'deleted' if data['action'] == DELETE else 'updated'
+    messages.success(request, f'{count} customer{"" if count == 1 else "s"} {verb}.')
+    return redirect(list_url)
+
+
 # Bulk Upload View
 @login_required(login_url='login')
 def bulk_upload(request):
     if request.method == 'POST':
         form = BulkUploadForm(request.POST, request.FILES)
         if form.is_valid():
-            excel_file = request.FILES['excel_file']
-            
-            try:
-                wb = openpyxl.load_workbook(excel_file)
-                ws = wb.active
-                
-                success_count = 0
-                error_count = 0
-                errors = []
-                
-                for row_num, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                    try:
-                        if not row[0] or not row[1] or not row[2]:  # Check required fields
-                            continue
-                            
-                        customer = Customer(
-                            first_name=row[0],
-                            last_name=row[1],
-                            email=row[2],
-                            phone=row[3] if len(row) > 3 and row[3] else '',
-                            address=row[4] if len(row) > 4 and row[4] else '',
-                            city=row[5] if len(row) > 5 and row[5] else '',
-                            state=row[6] if len(row) > 6 and row[6] else '',
-                            country=row[7] if len(row) > 7 and row[7] else '',
-                            postal_code=row[8] if len(row) > 8 and row[8] else '',
-                            company=row[9] if len(row) > 9 and row[9] else '',
-                            notes=row[10] if len(row) > 10 and row[10] else '',
-                            created_by=request.user
-                        )
-                        customer.save()
-                        success_count += 1
-                    except Exception as e:
-                        error_count += 1
-                        errors.append(f"Row {row_num}: {str(e)}")
-                
-                if success_count > 0:
-                    messages.success(request, f'Successfully imported {success_count} customers!')
-                if error_count > 0:
-                    messages.warning(request, f'Failed to import {error_count} customers. Errors: {", ".join(errors[:5])}')
-                
-                return redirect('customer_list')
-                
-            except Exception as e:
-                messages.error(request, f'Error processing file: {str(e)}')
+            job = enqueue_import(
+                request.FILES['excel_file'], request.user, mode=form.cleaned_data['mode']
+            )
+            messages.info(request, f'Import #{job.pk} queued. Progress is shown below.')
+            return redirect(f"{reverse('bulk_upload')}?job={job.pk}")
     else:
         form = BulkUploadForm()
     
-    context = {'form': form}
+    job = None
+    job_id = request.GET.get('job')
+    if job_id and job_id.isdigit():
+        job = ImportJob.objects.filter(pk=job_id, created_by=request.user).first()
+    
+    context = {'form': form, 'job': job}
     return render(request, 'customers/bulk_upload.html', context)
 
 
+# Import Job Progress
+@login_required(login_url='login')
+def import_job_status(request, pk):
+    job = get_object_or_404(ImportJob, pk=pk, created_by=request.user)
+    return JsonResponse({
+        'id': job.pk,
+        'state': job.state,
+        'finished': job.is_finished,
+        'rows_processed': job.rows_processed,
+        'rows_created': job.rows_created,
+        'rows_updated': job.rows_updated,
+        'rows_unchanged': job.rows_unchanged,
+        'rows_failed': job.rows_failed,
+        'rows_per_second': round(job.rows_per_second),
+        'errors': job.error_sample[:5],
+        'failed_rows': job.failed_rows,
+    })
+
+
+# Exports and the sample workbook are served from the artifact cache; the
+# key carries the filters and their data version, see customers.artifacts
+def _export_filters(search_query, selected):
+    return [normalize_query(search_query), sorted(selected.items())]
+
+
+def _artifact_response(artifact, hit, filename, content_type):
+    response = FileResponse(artifact, as_attachment=True, filename=filename, content_type=content_type)
+    response['X-Artifact-Cache'] = 'hit' if hit else 'miss'
+    return response
+
+
 # Download Sample Excel
 @login_required(login_url='login')
 def download_sample_excel(request):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Customers"
-    
-    # Headers
-    headers = [
-        'First Name', 'Last Name', 'Email', 'Phone', 'Address',
-        'City', 'State', 'Country', 'Postal Code', 'Company', 'Notes'
-    ]
-    ws.append(headers)
-
-    # ✅ 15 Sample customer records
-    sample_customers = [
-        ['John', 'Doe', 'john@example.com', '9876543210', '123 Main St', 'New York', 'NY', 'USA', '10001', 'ABC Corp', 'Regular customer'],
-        ['Jane', 'Smith', 'jane@example.com', '9876543211', '45 Park Ave', 'Los Angeles', 'CA', 'USA', '90001', 'XYZ Ltd', 'Premium customer'],
-        ['Robert', 'Brown', 'robert@example.com', '9876543212', '78 Elm St', 'Chicago', 'IL', 'USA', '60601', 'TechSoft', 'Follow up required'],
-        ['Emily', 'Clark', 'emily@example.com', '9876543213', '9 Pine Rd', 'Houston', 'TX', 'USA', '77001', 'CloudNet', 'New lead'],
-        ['Michael', 'Johnson', 'michael@example.com', '9876543214', '56 Oak St', 'Phoenix', 'AZ', 'USA', '85001', 'InnoWorks', 'Important client'],
-        ['Sophia', 'Williams', 'sophia@example.com', '9876543215', '89 Maple Dr', 'Dallas', 'TX', 'USA', '75201', 'BrightTech', 'High priority'],
-        ['David', 'Miller', 'david@example.com', '9876543216', '10 River Rd', 'San Jose', 'CA', 'USA', '95101', 'NextGen', 'Repeat customer'],
-        ['Olivia', 'Davis', 'olivia@example.com', '9876543217', '34 Lake View', 'Austin', 'TX', 'USA', '73301', 'SoftLabs', 'Corporate account'],
-        ['James', 'Wilson', 'james@example.com', '9876543218', '77 Hill St', 'Seattle', 'WA', 'USA', '98101', 'CodeBase', 'Requested demo'],
-        ['Ava', 'Moore', 'ava@example.com', '9876543219', '21 Sunset Blvd', 'Miami', 'FL', 'USA', '33101', 'MediaX', 'Seasonal client'],
-        ['Daniel', 'Taylor', 'daniel@example.com', '9876543220', '90 Cedar St', 'Denver', 'CO', 'USA', '80201', 'SkyTech', 'Cold lead'],
-        ['Mia', 'Anderson', 'mia@example.com', '9876543221', '63 Birch Rd', 'Boston', 'MA', 'USA', '02101', 'DataWave', 'Warm lead'],
-        ['Matthew', 'Thomas', 'matthew@example.com', '9876543222', '88 Broadway', 'Newark', 'NJ', 'USA', '07101', 'WebWorks', 'Contract pending'],
-        ['Isabella', 'Jackson', 'isabella@example.com', '9876543223', '12 Market St', 'San Diego', 'CA', 'USA', '92101', 'DesignPro', 'Design client'],
-        ['Ethan', 'White', 'ethan@example.com', '9876543224', '5 Cross Rd', 'Portland', 'OR', 'USA', '97201', 'AI Labs', 'Startup client'],
-    ]
-
-    # Add rows to sheet
-    for customer in sample_customers:
-        ws.append(customer)
-
-    # Style header row
-    for cell in ws[1]:
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(
-            start_color="CCCCCC",
-            end_color="CCCCCC",
-            fill_type="solid"
-        )
-
-    # Write to memory
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    response = HttpResponse(
-        output.read(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=customer_sample.xlsx'
-    return response
+    sample_file, hit = artifact_cache.open('sample', [SAMPLE_VERSION], build_sample_xlsx, '.xlsx')
+    return _artifact_response(sample_file, hit, 'customer_sample.xlsx', XLSX_CONTENT_TYPE)
 
 
 # Export to PDF
 @login_required(login_url='login')
 def export_pdf(request):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    elements = []
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#4e73df'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Title
-    title = Paragraph("Customer Data Report", title_style)
-    elements.append(title)
-    elements.append(Spacer(1, 12))
-    
-    # Date
-    date_str = datetime.now().strftime('%B %d, %Y')
-    date_para = Paragraph(f"Generated on: {date_str}", styles['Normal'])
-    elements.append(date_para)
-    elements.append(Spacer(1, 20))
-    
-    # Table data
-    customers = Customer.objects.all()
-    data = [['Name', 'Email', 'Phone', 'Company', 'City']]
-    
-    for customer in customers:
-        data.append([
-            customer.get_full_name(),
-            customer.email,
-            customer.phone or 'N/A',
-            customer.company or 'N/A',
-            customer.city or 'N/A'
-        ])
-    
-    # Create table
-    table = Table(data, colWidths=[1.5*inch, 2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4e73df')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-    ]))
+    search_query = request.GET.get('search', '')
+    selected = selected_facets(request.GET)
+    customers = filter_customers(search_customers(search_query), selected)
     
-    elements.append(table)
+    # The report prints the day it was generated, so it is rebuilt daily
+    today = datetime.now().strftime("%Y%m%d")
+    key = [EXPORT_VERSION, today, _export_filters(search_query, selected), data_version(customers)]
+    pdf_file, hit = artifact_cache.open('pdf', key, lambda: build_customer_pdf(customers), '.pdf')
+    return _artifact_response(pdf_file, hit, f'customers_{today}.pdf', 'application/pdf')
+
+
+# Export to CSV
+@login_required(login_url='login')
+def export_csv(request):
+    search_query = request.GET.get('search', '')
+    customers = filter_customers(search_customers(search_query), selected_facets(request.GET))
     
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
+    response = stream_response(request, iter_customer_csv(customers), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename=customers_{datetime.now().strftime("%Y%m%d")}.csv'
+    return response
+
+
+# Export to Excel
+@login_required(login_url='login')
+def export_xlsx(request):
+    search_query = request.GET.get('search', '')
+    selected = selected_facets(request.GET)
+    customers = filter_customers(search_customers(search_query), selected)
     
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=customers_{datetime.now().strftime("%Y%m%d")}.pdf'
+    key = [EXPORT_VERSION, _export_filters(search_query, selected), data_version(customers)]
+    xlsx_file, hit = artifact_cache.open('xlsx', key, lambda: build_customer_xlsx(customers), '.xlsx')
+    filename = f'customers_{datetime.now().strftime("%Y%m%d")}.xlsx'
+    return _artifact_response(xlsx_file, hit, filename, XLSX_CONTENT_TYPE)
+
+
+# Content-addressed media, served with far-future cache headers. Only routed
+# in DEBUG; in production the web server should send the same headers.
+def immutable_media(request, path):
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
     return response
 
 
+# Request Profiling Log (staff only)
+@login_required(login_url='login')
+@user_passes_test(lambda user: user.is_staff, login_url='login')
+def profiling_log(request):
+    context = {
+        'profiles': recent_profiles(),
+        'profiling_enabled': settings.REQUEST_PROFILING,
+        'artifact_stats': ArtifactCacheStat.objects.order_by('kind'),
+        'artifact_usage': artifact_cache.usage(),
+        'artifact_max_bytes': settings.ARTIFACT_CACHE_MAX_BYTES,
+    }
+    return render(request, 'customers/profiling_log.html', context)
+
+
+# Duplicate Review View (staff only)
+@login_required(login_url='login')
+@user_passes_test(lambda user: user.is_staff, login_url='login')
+def duplicate_review(request):
+    clusters = (
+        DuplicateCluster.objects.filter(status=DuplicateCluster.OPEN)
+        # Members deleted since the last pass can leave a cluster of one
+        .annotate(members=Count('customers')).filter(members__gt=1)
+        # GROUP BY drops Meta.ordering, and the paginator needs a stable order
+        .order_by('-score', 'id')
+        .prefetch_related(Prefetch('customers', queryset=Customer.objects.order_by('created_at', 'id')))
+    )
+    page_obj = Paginator(clusters, 20).get_page(request.GET.get('page'))
+    context = {
+        'page_obj': page_obj,
+        'last_run': DuplicateCluster.objects.aggregate(last_run=Max('created_at'))['last_run'],
+    }
+    return render(request, 'customers/duplicate_review.html', context)
+
+
+# Dismiss Duplicate Cluster View (staff only)
+@login_required(login_url='login')
+@user_passes_test(lambda user: user.is_staff, login_url='login')
+@require_POST
+def duplicate_dismiss(request, pk):
+    cluster = get_object_or_404(DuplicateCluster, pk=pk, status=DuplicateCluster.OPEN)
+    cluster.status = DuplicateCluster.DISMISSED
+    cluster.reviewed_by = request.user
+    cluster.reviewed_at = timezone.now()
+    cluster.save(update_fields=['status', 'reviewed_by', 'reviewed_at'])
+    messages.success(request, 'Cluster marked as not duplicates.')
+    review_url = reverse('duplicate_review')
+    page = request.POST.get('page', '')
+    if page.isdigit():
+        review_url += '?' + urlencode({'page': page})
+    return redirect(review_url)
+
+
 # User List View
 @login_required(login_url='login')
 def user_list(request):
-    users = User.objects.all().order_by('-date_joined')
-    context = {'users': users}
+    search_query = request.GET.get('search', '')
+    cursor = request.GET.get('cursor')
+    
+    users = search_users(search_query)
+    page_obj = keyset_page(users, cursor, per_page=25, field='date_joined')
+    
+    context = {'page_obj': page_obj, 'search_query': search_query}
     return render(request, 'customers/user_list.html', context)
 
 
@@ -319,8 +355,7 @@ def user_add(request):
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
         if form.is_valid():
-            user = form.save()
-            UserProfile.objects.create(user=user)
+            form.save()
             messages.success(request, 'User created successfully!')
             return redirect('user_list')
     else:
@@ -350,12 +385,13 @@ def user_edit(request, pk):
 
 # User Detail View
 @login_required(login_url='login')
+@cache_control(private=True, no_cache=True)
+@drop_validators_on_variant_fallback
+@condition(etag_func=user_etag)
 def user_detail(request, pk):
-    user = get_object_or_404(User, pk=pk)
-    try:
-        profile = user.profile
-    except UserProfile.DoesNotExist:
-        profile = UserProfile.objects.create(user=user)
+    user = get_object_or_404(User.objects.select_related('profile'), pk=pk)
+    # Profiles are created with the user; render users that predate that as empty
+    profile = getattr(user, 'profile', None) or UserProfile(user=user)
     
     context = {'user': user, 'profile': profile}
     return render(request, 'customers/user_detail.html', context)
@@ -365,10 +401,7 @@ def user_detail(request, pk):
 @login_required(login_url='login')
 def edit_profile(request):
     user = request.user
-    try:
-        profile = user.profile
-    except UserProfile.DoesNotExist:
-        profile = UserProfile.objects.create(user=user)
+    profile = getattr(user, 'profile', None) or UserProfile(user=user)
     
     if request.method == 'POST':
         user_form = UserEditForm(request.POST, instance=user)